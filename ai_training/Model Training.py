@@ -63,6 +63,20 @@ with open("mean_values.txt", "w", encoding="utf-8") as f:
 
 print("Mean values saved to mean_values.txt")
 
+"""Same encodings as a binary, memory-mapped store (backend/services/encoding_store.py).
+The backend prefers encodings.npz over mean_values.txt when both are in a model version directory.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+from services.encoding_store import export_encodings
+from services.model_registry import MeanEncodings
+
+export_encodings(MeanEncodings(global_mean, state_mean, town_mean, district_mean, type_mean), "encodings.npz")
+
+print("Mean values saved to encodings.npz")
+
 features = ['size', 'bed', 'bath', 'type_mean', 'town_mean', 'district_mean', 'state_mean']
 target = 'price'
 
@@ -0,0 +1,170 @@
+"""
+Data cleaning benchmark: the per-row apply() logic of Data Cleaning.py vs
+the vectorized pipeline in data_cleaning.py.
+
+Generates --rows synthetic listings in the scraper's format (a few percent
+malformed), cleans them both ways and reports:
+  * whether both produce the same rows and values,
+  * time and rows/s for each, at each --rows size,
+  * throughput of the chunked CSV CLI path (read, clean, write).
+
+Example:
+    python benchmark/clean_listings.py --rows 2000 200000 1000000
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Ensure ai_training directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import data_cleaning
+
+TOWNS = [("Ampang", "Hulu Langat", "Selangor"), ("Bandar Johor Bahru", "Johor Bahru", "Johor"),
+         ("Cheras", None, "Kuala Lumpur"), ("Bayan Lepas", "Barat Daya", "Pulau Pinang"),
+         ("Mont Kiara", None, "Kuala Lumpur"), ("Kajang", "Hulu Langat", "Selangor")]
+TYPES = ["Condominium", "Apartment", "Service Residence", "Terrace House", " Flat ", "Studio"]
+
+
+def synthetic_listings(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    size = rng.integers(300, 3000, rows)
+    price = (size * rng.uniform(0.5, 4, rows)).astype(int)
+    town = rng.integers(0, len(TOWNS), rows)
+    beds = rng.integers(0, 6, rows).astype(str)
+    beds[beds == "0"] = "Studio"
+
+    addresses = [", ".join(part for part in TOWNS[t] if part) + ", Malaysia" for t in town]
+    df = pd.DataFrame({
+        "bed": beds,
+        "size": [f"{s:,} sqft" for s in size],
+        "price": [f"RM{p:,} /mo" for p in price],
+        "address": addresses,
+        "type": rng.choice(TYPES, rows),
+        "update_date": rng.choice(["2025-09-01", None], rows),
+    })
+
+    noisy = rng.random(rows) < 0.03
+    df.loc[noisy, "price"] = "Price on request"
+    df.loc[rng.random(rows) < 0.01, "size"] = None
+    return df
+
+
+# ---- the per-row logic of Data Cleaning.py (without its error prints) ------
+
+def normalize_bedrooms(value):
+    if str(value).lower() == "studio":
+        return 0
+    try:
+        return float(value)
+    except:
+        return None
+
+
+def normalize_size(value):
+    value = value.lower().replace("sqft", "").replace(",", "").strip()
+    try:
+        return float(value)
+    except:
+        return None
+
+
+def normalize_price(value):
+    match = re.search(r'RM([\d,]+)\s*/mo', value)
+    if match:
+        try:
+            return float(match.group(1).replace(',', ''))
+        except:
+            return None
+    return None
+
+
+def split_address(addr):
+    if pd.isna(addr):
+        return pd.Series([None, None, None])
+    town, district, state = None, None, None
+    parts = [p.strip() for p in addr.split(",")]
+    if len(parts) == 4:
+        town, district, state, _ = parts
+    elif len(parts) == 3:
+        town, state, _ = parts
+        district = town
+    return pd.Series([town, district, state])
+
+
+def normalize(value):
+    return str(value).strip().lower()
+
+
+def notebook_clean(df):
+    df = df[df['size'].notna()].copy()
+    df['update_date'] = df['update_date'].fillna('unknown')
+    df["bed"] = df["bed"].apply(normalize_bedrooms)
+    df["size"] = df["size"].apply(normalize_size)
+    df["price"] = df["price"].apply(normalize_price)
+    df["p/s"] = (df["price"] / df["size"]).round(2)
+    df = df[(df["p/s"] >= 0.8) & (df["p/s"] <= 10)].copy()
+    df[["town", "district", "state"]] = df["address"].apply(split_address)
+    for column in ("state", "town", "district", "type"):
+        df[column] = df[column].apply(normalize)
+    return df
+
+
+# ---------------------------------------------------------------------------
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def same_result(expected, actual):
+    if not expected.index.equals(actual.index):
+        return False
+    columns = ["bed", "size", "price", "p/s", "town", "district", "state", "type"]
+    left = expected[columns].astype(object).where(expected[columns].notna(), None)
+    right = actual[columns].astype(object).where(actual[columns].notna(), None)
+    return left.equals(right)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[2000, 50000, 200000])
+    parser.add_argument("--notebook-max-rows", type=int, default=200000,
+                        help="skip the per-row version above this size (it is slow)")
+    parser.add_argument("--chunksize", type=int, default=data_cleaning.DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'notebook s':>11} {'vectorized s':>13} {'speedup':>8} {'vectorized rows/s':>18} same")
+    for rows in args.rows:
+        df = synthetic_listings(rows)
+        vectorized, vec_s = timed(data_cleaning.clean, df)
+
+        if rows <= args.notebook_max_rows:
+            notebook, nb_s = timed(notebook_clean, df)
+            same = same_result(notebook, vectorized)
+            print(f"{rows:>9} {nb_s:>11.3f} {vec_s:>13.3f} {nb_s / vec_s:>7.1f}x {rows / vec_s:>18,.0f} {same}")
+        else:
+            print(f"{rows:>9} {'-':>11} {vec_s:>13.3f} {'-':>8} {rows / vec_s:>18,.0f} -")
+
+    rows = max(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "listings.csv")
+        synthetic_listings(rows).to_csv(source, index=False)
+        (rows_in, rows_out), seconds = timed(
+            data_cleaning.clean_csv, source, os.path.join(tmp, "clean.csv"), args.chunksize)
+        size_mb = os.path.getsize(source) / 1e6
+        print(f"\nCSV CLI path, {rows_in} rows ({size_mb:.0f} MB) in chunks of {args.chunksize}: "
+              f"{seconds:.2f}s, {rows_in / seconds:,.0f} rows/s, {rows_out} rows kept")
+
+
+if __name__ == "__main__":
+    main()
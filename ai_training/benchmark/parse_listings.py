@@ -0,0 +1,85 @@
+"""
+Listing parser benchmark: offline replay of saved result pages.
+
+Builds --pages synthetic result pages of --cards listing cards each (cards
+copied from the saved pages under test/pages, so the markup matches the
+site), or uses a directory of pages saved with `scraper.py scrape
+--save-html`, and reports:
+  * parse-only throughput (pages/s, listings/s),
+  * end-to-end replay throughput (read, parse, append to JSON Lines with a
+    checkpoint after every page).
+
+The old notebook needed a Selenium round trip per field per card plus a
+fixed 3 s sleep per page; the fetch side is now bounded by --rate in
+scraper.py, not by parsing.
+
+Example:
+    python benchmark/parse_listings.py --pages 200 --cards 30
+    python benchmark/parse_listings.py --dir pages/
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+# Ensure ai_training directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import scraper
+
+FIXTURE_PAGE = os.path.join(parent_dir, "test", "pages", "page_00001.html")
+CARD = re.compile(r'(<div class="result-search__item.*?)(?=<div class="result-search__item|\s*</div>\s*</body>)', re.S)
+
+
+def synthetic_pages(directory, pages, cards):
+    with open(FIXTURE_PAGE, "r", encoding="utf-8") as f:
+        html = f.read()
+    templates = CARD.findall(html)
+    head, tail = html[:html.index(templates[0])], html[html.index(templates[-1]) + len(templates[-1]):]
+
+    for page in range(1, pages + 1):
+        body = "".join(templates[i % len(templates)] for i in range(cards))
+        with open(os.path.join(directory, scraper.PAGE_FILE.format(page)), "w", encoding="utf-8") as f:
+            f.write(head + body + tail)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--cards", type=int, default=30, help="listing cards per synthetic page")
+    parser.add_argument("--dir", help="replay these saved pages instead of synthetic ones")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.dir
+        if directory is None:
+            directory = os.path.join(tmp, "pages")
+            os.makedirs(directory)
+            synthetic_pages(directory, args.pages, args.cards)
+
+        pages = scraper.saved_pages(directory)
+        html = []
+        for _, path in pages:
+            with open(path, "r", encoding="utf-8") as f:
+                html.append(f.read())
+        size_mb = sum(len(page) for page in html) / 1e6
+
+        started = time.perf_counter()
+        listings = sum(len(scraper.parse_listings(page)) for page in html)
+        parse_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        scraper.replay(directory, os.path.join(tmp, "listings.jsonl"))
+        replay_s = time.perf_counter() - started
+
+    print(f"{len(pages)} pages ({size_mb:.1f} MB), {listings} listings")
+    print(f"parse only : {parse_s:6.2f}s  {len(pages) / parse_s:8.1f} pages/s  {listings / parse_s:9.0f} listings/s")
+    print(f"replay     : {replay_s:6.2f}s  {len(pages) / replay_s:8.1f} pages/s  {listings / replay_s:9.0f} listings/s")
+
+
+if __name__ == "__main__":
+    main()
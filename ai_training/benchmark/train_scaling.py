@@ -0,0 +1,60 @@
+"""
+Training benchmark: wall time of the cross-validated search per job count.
+
+Cleans --rows synthetic listings, caches the folds once, then runs the same
+search (--candidates x --folds fits) with each --jobs value and reports
+wall time and speedup over one job. Scores are checked to be identical for
+every job count (each fit is seeded, so the job count only changes speed).
+
+Example:
+    python benchmark/train_scaling.py --rows 20000 --jobs 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Ensure ai_training directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from joblib import cpu_count
+import data_cleaning
+import train
+from clean_listings import synthetic_listings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--candidates", type=int, default=4)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seed", type=int, default=train.DEFAULT_SEED)
+    args = parser.parse_args()
+
+    df = data_cleaning.clean(synthetic_listings(args.rows, args.seed))
+    df["bath"] = df["bed"].clip(lower=1)
+    candidates = train.sample_candidates(args.candidates, args.seed)
+    print(f"{len(df)} rows, {args.candidates} candidates x {args.folds} folds, {cpu_count()} cores\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        folds = train.build_folds(df, args.folds, args.seed, tmp)
+        print(f"fold features built and cached once: {time.perf_counter() - started:.2f}s\n")
+
+        print(f"{'jobs':>5} {'search s':>9} {'speedup':>8} same")
+        baseline = reference = None
+        for jobs in args.jobs:
+            started = time.perf_counter()
+            results = train.search(candidates, folds, args.seed, jobs)
+            seconds = time.perf_counter() - started
+            baseline = baseline or seconds
+            reference = reference or results
+            print(f"{jobs:>5} {seconds:>9.2f} {baseline / seconds:>7.2f}x {results == reference}")
+
+
+if __name__ == "__main__":
+    main()
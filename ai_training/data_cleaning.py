@@ -0,0 +1,210 @@
+"""
+Cleaning pipeline for scraped rental listings (the steps of Data Cleaning.py).
+
+Every step works on whole columns with pandas string methods instead of a
+Python call per row. Listings repeat the same addresses, types, sizes and
+prices over and over, so each column is factorized first and the string
+work runs once per distinct value; the result is broadcast back by code.
+Input is read in chunks, so a CSV far larger than memory can be cleaned:
+
+    python data_cleaning.py properties.csv processed_data.csv
+    python data_cleaning.py properties.csv processed_data.xlsx --chunksize 50000
+    python data_cleaning.py properties.csv encoded.csv --encode encoder_data.txt
+
+Text columns are normalized like the backend normalizes the values it
+looks up in the mean encodings (services/encoding_store.normalize_key):
+stripped, then lower-cased. Missing values stay missing.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Rows outside this price per square foot (RM/sqft) are treated as noise
+MIN_PRICE_PER_SQFT = 0.8
+MAX_PRICE_PER_SQFT = 10
+
+TEXT_COLUMNS = ("state", "town", "district", "type")
+ENCODER_SECTIONS = {"town": "towns", "district": "districts", "state": "states", "type": "types"}
+
+
+def by_distinct(transform):
+    """
+    Make a column transform run on the distinct non-missing values only.
+    `transform` takes a string Series and returns a Series or DataFrame
+    with one row per value; missing input gives missing output.
+    """
+    def apply(values):
+        codes, uniques = pd.factorize(values)
+        result = transform(pd.Series(uniques, dtype="string"))
+        # Code -1 (missing) picks the all-missing row appended at the end
+        result = pd.concat([result, result.iloc[:0].reindex([len(result)])])
+        result = result.iloc[codes]
+        result.index = values.index
+        return result
+
+    apply.__doc__ = transform.__doc__
+    return apply
+
+
+@by_distinct
+def normalize_text(values):
+    """Vectorized normalize_key: strip, then lower-case."""
+    return values.str.strip().str.lower()
+
+
+@by_distinct
+def normalize_bedrooms(values):
+    """Bedroom count as float; "studio" is 0, anything unparsable is NaN."""
+    text = values.str.strip().str.lower()
+    bedrooms = pd.to_numeric(text, errors="coerce")
+    return bedrooms.mask(text == "studio", 0).astype("float64")
+
+
+@by_distinct
+def normalize_size(values):
+    """Size in sqft from text like "1,200 sqft"."""
+    text = values.str.lower().str.replace("sqft", "", regex=False).str.replace(",", "", regex=False)
+    return pd.to_numeric(text.str.strip(), errors="coerce").astype("float64")
+
+
+@by_distinct
+def normalize_price(values):
+    """Monthly rent from text like "RM1,500 /mo"; NaN if there is no such amount."""
+    amount = values.str.extract(r"RM([\d,]+)\s*/mo", expand=False)
+    return pd.to_numeric(amount.str.replace(",", "", regex=False), errors="coerce").astype("float64")
+
+
+@by_distinct
+def split_address(address):
+    """
+    (town, district, state) columns from "town, district, state, Malaysia".
+    An address with only "town, state, Malaysia" repeats the town as the
+    district; any other shape gives missing values.
+    """
+    parts = address.str.split(",", expand=True).reindex(columns=range(4))
+    parts = parts.apply(lambda column: column.astype("string").str.strip())
+    count = address.str.count(",").add(1)
+
+    four = (count == 4).fillna(False)
+    three = (count == 3).fillna(False)
+    missing = pd.Series(pd.NA, index=address.index, dtype="string")
+
+    town = parts[0].where(four | three, missing)
+    district = parts[1].where(four, parts[0].where(three, missing))
+    state = parts[2].where(four, parts[1].where(three, missing))
+    return pd.DataFrame({"town": town, "district": district, "state": state})
+
+
+def clean(df):
+    """Cleaned copy of one chunk of scraped listings."""
+    df = df[df["size"].notna()].copy()
+    if "update_date" in df:
+        df["update_date"] = df["update_date"].fillna("unknown")
+
+    df["bed"] = normalize_bedrooms(df["bed"])
+    df["size"] = normalize_size(df["size"])
+    df["price"] = normalize_price(df["price"])
+    df["p/s"] = (df["price"] / df["size"]).round(2)
+
+    df = df[(df["p/s"] >= MIN_PRICE_PER_SQFT) & (df["p/s"] <= MAX_PRICE_PER_SQFT)].copy()
+
+    df[["town", "district", "state"]] = split_address(df["address"])
+    for column in TEXT_COLUMNS:
+        df[column] = normalize_text(df[column])
+    return df
+
+
+def encode_categories(values, vocabulary):
+    """
+    Codes (float) of each value's position in `vocabulary`, appending
+    values not seen before in order of appearance. `vocabulary` is a list
+    and is extended in place, so codes stay stable across chunks.
+    """
+    known = set(vocabulary)
+    vocabulary.extend(value for value in pd.unique(values.dropna()) if value not in known)
+    codes = pd.Categorical(values, categories=vocabulary).codes.astype("float64")
+    codes[codes < 0] = np.nan
+    return pd.Series(codes, index=values.index)
+
+
+def load_encoder(path):
+    """Vocabularies per column from an encoder_data.txt; empty if there is none."""
+    vocabularies = {column: [] for column in ENCODER_SECTIONS}
+    sections = {section: column for column, section in ENCODER_SECTIONS.items()}
+    if not os.path.exists(path):
+        return vocabularies
+
+    current = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("#"):
+                current = sections.get(line.lstrip("#").strip())
+            elif current:
+                vocabularies[current].append(line)
+    return vocabularies
+
+
+def save_encoder(path, vocabularies):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(
+            f"# {section}\n" + "".join(value + "\n" for value in vocabularies[column])
+            for column, section in ENCODER_SECTIONS.items()
+        ))
+
+
+def clean_csv(source, destination, chunksize=DEFAULT_CHUNKSIZE, encoder=None):
+    """
+    Clean `source` chunk by chunk into `destination` (.csv streams each
+    chunk out; .xlsx is written once at the end). With `encoder`, the text
+    columns are replaced by codes from that encoder file, which is updated.
+    Returns (rows read, rows written).
+    """
+    vocabularies = load_encoder(encoder) if encoder else None
+    excel = destination.lower().endswith(".xlsx")
+    pieces = []
+    rows_in = rows_out = 0
+
+    for i, chunk in enumerate(pd.read_csv(source, chunksize=chunksize, dtype=str)):
+        rows_in += len(chunk)
+        cleaned = clean(chunk)
+        if vocabularies is not None:
+            for column, vocabulary in vocabularies.items():
+                cleaned[column] = encode_categories(cleaned[column], vocabulary)
+        rows_out += len(cleaned)
+
+        if excel:
+            pieces.append(cleaned)
+        else:
+            cleaned.to_csv(destination, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+    if excel:
+        pd.concat(pieces, ignore_index=True).to_excel(destination, index=False)
+    if vocabularies is not None:
+        save_encoder(encoder, vocabularies)
+    return rows_in, rows_out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="scraped listings CSV")
+    parser.add_argument("destination", help="cleaned output, .csv or .xlsx")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="rows read at a time")
+    parser.add_argument("--encode", metavar="ENCODER_FILE",
+                        help="replace town/district/state/type by integer codes kept in this file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rows_in, rows_out = clean_csv(args.source, args.destination, args.chunksize, args.encode)
+    print(f"Cleaned {rows_in} rows into {rows_out} in {time.perf_counter() - started:.1f}s -> {args.destination}")
+
+
+if __name__ == "__main__":
+    main()
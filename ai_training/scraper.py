@@ -0,0 +1,447 @@
+"""
+Rental listing scraper (the job of web_scraper.py), split into fetching and
+parsing.
+
+Fetching: `workers` threads download result pages concurrently, all behind
+one shared rate limit (`rate` requests per second across every thread),
+retrying failed pages with backoff and honouring Retry-After. Pages are
+plain HTTP GETs by default; SeleniumFetcher renders them in headless
+Chrome instead, one browser per thread.
+
+Parsing: each page's HTML is parsed in one pass with the standard library
+HTMLParser, instead of a Selenium element lookup per field per card.
+
+Output: listings are appended to a JSON Lines file page by page as pages
+complete. After every page a checkpoint (<output>.checkpoint.json) records
+the finished pages and the file length, so a rerun resumes where the last
+one stopped and drops any half-written tail. With --save-html every fetched
+page is also kept, and `replay` parses a directory of saved pages offline.
+
+    python scraper.py scrape listings.jsonl --workers 4 --rate 1 --save-html pages/
+    python scraper.py replay pages/ listings.jsonl
+    python scraper.py export listings.jsonl properties.csv   # for data_cleaning.py
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from html.parser import HTMLParser
+
+BASE_URL = "https://www.fazwaz.my/property-for-rent/malaysia?page="
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) rental-price-research"
+
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 1.0          # requests per second, across all workers
+DEFAULT_RETRIES = 3
+DEFAULT_MAX_ROWS = 2000
+REQUEST_TIMEOUT = 30        # seconds
+
+COLUMNS = ["title", "address", "price", "size", "bed", "bath", "type", "update_date"]
+PAGE_FILE = "page_{:05d}.html"
+
+# Class names on the listing site
+CARD_CLASS = "result-search__item"
+FIELD_CLASSES = {"unit-name": "title", "location-unit": "address", "price-tag": "price"}
+INFO_CLASS = "wrap-icon-info"
+TAG_CLASS = "manage-tag__item"
+LAST_UPDATED_CLASS = "last-updated-message"
+
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+                 "param", "source", "track", "wbr"}
+
+
+# ---- parsing ----------------------------------------------------------------
+
+def _collapse(chunks):
+    return " ".join("".join(chunks).split())
+
+
+def info_fields(parts):
+    """(bed, bath, size, type) from the lines of a card's icon info block."""
+    if len(parts) == 6:  # Studio: no bedroom count
+        return "Studio", parts[1], parts[3], parts[5]
+    if len(parts) == 7:
+        return parts[0], parts[2], parts[4], parts[6]
+    return None, None, None, None
+
+
+class ListingParser(HTMLParser):
+    """
+    Collects one dict per listing card. Text is taken as Selenium's .text
+    would show it: fields with whitespace collapsed, the icon info block as
+    one line per text node.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.listings = []
+        self._stack = []     # (tag, roles it opened)
+        self._card = None
+        self._open = {}      # role -> list of text chunks while inside that element
+        self._tag_is_update = False
+
+    def handle_starttag(self, tag, attrs):
+        classes = set()
+        for name, value in attrs:
+            if name == "class" and value:
+                classes.update(value.split())
+
+        roles = []
+        if CARD_CLASS in classes and self._card is None:
+            self._card = {column: "" for column in ("title", "address", "price")}
+            self._card["update_date"] = None
+            roles.append("card")
+        elif self._card is not None:
+            for cls in classes & FIELD_CLASSES.keys():
+                roles.append(FIELD_CLASSES[cls])
+            if INFO_CLASS in classes:
+                roles.append("info")
+            if TAG_CLASS in classes and tag == "div":
+                roles.append("tag")
+            if LAST_UPDATED_CLASS in classes and tag == "i" and "tag" in self._open:
+                self._tag_is_update = True
+
+        roles = [role for role in roles if role not in self._open]
+        for role in roles:
+            if role != "card":
+                self._open[role] = []
+            if role == "tag":
+                self._tag_is_update = False
+
+        if tag not in VOID_ELEMENTS:
+            self._stack.append((tag, roles))
+        else:
+            for role in roles:
+                self._close(role)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # Unclosed elements inside (e.g. <li>, <p>) end with their parent
+        if not any(open_tag == tag for open_tag, _ in self._stack):
+            return
+        while self._stack:
+            open_tag, roles = self._stack.pop()
+            for role in roles:
+                self._close(role)
+            if open_tag == tag:
+                return
+
+    def handle_data(self, data):
+        for chunks in self._open.values():
+            chunks.append(data)
+
+    def _close(self, role):
+        if role == "card":
+            for open_role in list(self._open):
+                self._close(open_role)
+            self.listings.append({column: self._card.get(column) for column in COLUMNS})
+            self._card = None
+            return
+
+        chunks = self._open.pop(role)
+        if role == "info":
+            parts = [line.strip() for line in "\n".join(chunks).split("\n") if line.strip()]
+            self._card["bed"], self._card["bath"], self._card["size"], self._card["type"] = info_fields(parts)
+        elif role == "tag":
+            if self._tag_is_update:
+                self._card["update_date"] = _collapse(chunks)
+        elif not self._card[role]:
+            self._card[role] = _collapse(chunks)
+
+
+def parse_listings(html):
+    """Listing dicts (COLUMNS keys) of one result page."""
+    parser = ListingParser()
+    parser.feed(html)
+    parser.close()
+    return parser.listings
+
+
+# ---- fetching ---------------------------------------------------------------
+
+class RateLimiter:
+    """At most `rate` acquisitions per second, shared by all threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class FetchError(RuntimeError):
+    """A page could not be fetched after all retries."""
+
+
+class HttpFetcher:
+    """Fetches pages with a plain GET."""
+
+    def __init__(self, base_url=BASE_URL, timeout=REQUEST_TIMEOUT):
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def __call__(self, page):
+        request = urllib.request.Request(self.base_url + str(page), headers={"User-Agent": USER_AGENT})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            charset = response.headers.get_content_charset() or "utf-8"
+            return response.read().decode(charset, errors="replace")
+
+
+class SeleniumFetcher:
+    """Renders pages in headless Chrome, one browser per fetching thread (needs selenium)."""
+
+    def __init__(self, base_url=BASE_URL):
+        self.base_url = base_url
+        self._local = threading.local()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def _driver(self):
+        driver = getattr(self._local, "driver", None)
+        if driver is None:
+            from selenium import webdriver
+
+            options = webdriver.ChromeOptions()
+            for argument in ("--no-sandbox", "--headless", "--disable-gpu", "--window-size=1920,1200",
+                             "--disable-dev-shm-usage"):
+                options.add_argument(argument)
+            driver = self._local.driver = webdriver.Chrome(options=options)
+            with self._lock:
+                self._drivers.append(driver)
+        return driver
+
+    def __call__(self, page):
+        driver = self._driver()
+        driver.get(self.base_url + str(page))
+        return driver.page_source
+
+    def close(self):
+        with self._lock:
+            for driver in self._drivers:
+                driver.quit()
+            self._drivers.clear()
+
+
+def fetch_with_retries(fetch, page, limiter, retries=DEFAULT_RETRIES, backoff=2.0):
+    """HTML of `page`, waiting for the rate limit before every attempt."""
+    for attempt in range(retries + 1):
+        limiter.acquire()
+        try:
+            return fetch(page)
+        except Exception as e:
+            if attempt == retries:
+                raise FetchError(f"page {page}: {e}") from e
+            delay = backoff * 2 ** attempt
+            if isinstance(e, urllib.error.HTTPError) and e.headers.get("Retry-After", "").isdigit():
+                delay = max(delay, int(e.headers["Retry-After"]))
+            time.sleep(delay)
+
+
+# ---- output and checkpoint --------------------------------------------------
+
+class ListingWriter:
+    """
+    Appends listings to a JSON Lines file, one page at a time, and keeps the
+    checkpoint next to it. Not thread-safe: write from one thread.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.checkpoint_path = path + ".checkpoint.json"
+        self.done_pages = set()
+        self.rows = 0
+        offset = 0
+
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+            self.done_pages = set(checkpoint["pages"])
+            self.rows = checkpoint["rows"]
+            offset = checkpoint["offset"]
+            # truncate() would pad a missing or cut-short file with NUL bytes
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            if size < offset:
+                raise ValueError(f"{path} is shorter than its checkpoint records ({size} < {offset} bytes); "
+                                 f"restore it or delete {self.checkpoint_path} to start over")
+        elif os.path.exists(path) and os.path.getsize(path):
+            raise ValueError(f"{path} exists but has no checkpoint; write to a new file")
+
+        self._file = open(path, "ab")
+        # Lines written after the last checkpoint belong to an unfinished page
+        self._file.truncate(offset)
+        self._file.seek(offset)
+
+    def write_page(self, page, listings):
+        lines = "".join(json.dumps({"page": page, **listing}, ensure_ascii=False) + "\n" for listing in listings)
+        self._file.write(lines.encode("utf-8"))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self.done_pages.add(page)
+        self.rows += len(listings)
+        self._save_checkpoint()
+
+    def _save_checkpoint(self):
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"pages": sorted(self.done_pages), "rows": self.rows, "offset": self._file.tell()}, f)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def close(self):
+        self._file.close()
+
+
+# ---- drivers ----------------------------------------------------------------
+
+def scrape(output, fetch=None, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, max_rows=DEFAULT_MAX_ROWS,
+           max_pages=None, save_html=None, retries=DEFAULT_RETRIES, log=print):
+    """
+    Scrape result pages 1, 2, ... into `output` until `max_rows` listings
+    are stored, a page has no listings (end of results) or `max_pages` is
+    reached. Resumes from the checkpoint of an earlier run. Returns the
+    number of listings in `output`.
+    """
+    fetch = fetch or HttpFetcher()
+    limiter = RateLimiter(rate)
+    writer = ListingWriter(output)
+    if save_html:
+        os.makedirs(save_html, exist_ok=True)
+
+    def fetch_page(page):
+        html = fetch_with_retries(fetch, page, limiter, retries)
+        if save_html:
+            with open(os.path.join(save_html, PAGE_FILE.format(page)), "w", encoding="utf-8") as f:
+                f.write(html)
+        return parse_listings(html)
+
+    next_page = 1
+    last_page = max_pages
+    pending = {}
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                # Keep every worker busy, plus one page queued behind each
+                while writer.rows < max_rows and len(pending) < 2 * workers \
+                        and (last_page is None or next_page <= last_page):
+                    if next_page not in writer.done_pages:
+                        pending[pool.submit(fetch_page, next_page)] = next_page
+                    next_page += 1
+
+                if not pending:
+                    break
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    page = pending.pop(future)
+                    if future.cancelled():
+                        continue
+                    listings = future.result()
+                    if not listings:
+                        last_page = page - 1 if last_page is None else min(last_page, page - 1)
+                        continue
+                    writer.write_page(page, listings)
+                    log(f"Scraped page {page}: {len(listings)} listings, progress ({writer.rows}/{max_rows})")
+
+                if writer.rows >= max_rows:
+                    for future in pending:
+                        future.cancel()
+    finally:
+        writer.close()
+        if hasattr(fetch, "close"):
+            fetch.close()
+
+    return writer.rows
+
+
+def saved_pages(directory):
+    """(page number, path) of the pages saved in `directory`, in page order."""
+    pages = []
+    for name in os.listdir(directory):
+        stem, ext = os.path.splitext(name)
+        if ext == ".html" and stem.startswith("page_") and stem[5:].isdigit():
+            pages.append((int(stem[5:]), os.path.join(directory, name)))
+    return sorted(pages)
+
+
+def replay(directory, output):
+    """Parse the pages saved in `directory` into `output` as a scrape would. Returns the listings written."""
+    writer = ListingWriter(output)
+    try:
+        for page, path in saved_pages(directory):
+            if page in writer.done_pages:
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                writer.write_page(page, parse_listings(f.read()))
+    finally:
+        writer.close()
+    return writer.rows
+
+
+def export_csv(jsonl_path, csv_path):
+    """Write the listings as the CSV web_scraper.py produced (input of data_cleaning.py)."""
+    import pandas as pd
+
+    df = pd.read_json(jsonl_path, lines=True, dtype=False)
+    df.reindex(columns=COLUMNS).to_csv(csv_path, index=False, encoding="utf-8-sig")
+    return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scrape_cmd = commands.add_parser("scrape", help="fetch result pages into a JSON Lines file")
+    scrape_cmd.add_argument("output")
+    scrape_cmd.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    scrape_cmd.add_argument("--rate", type=float, default=DEFAULT_RATE, help="requests per second, all workers")
+    scrape_cmd.add_argument("--max-rows", type=int, default=DEFAULT_MAX_ROWS)
+    scrape_cmd.add_argument("--max-pages", type=int)
+    scrape_cmd.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    scrape_cmd.add_argument("--save-html", metavar="DIR", help="also keep every fetched page here")
+    scrape_cmd.add_argument("--selenium", action="store_true", help="render pages in headless Chrome")
+    scrape_cmd.add_argument("--base-url", default=BASE_URL)
+
+    replay_cmd = commands.add_parser("replay", help="parse saved pages into a JSON Lines file")
+    replay_cmd.add_argument("directory")
+    replay_cmd.add_argument("output")
+
+    export_cmd = commands.add_parser("export", help="convert a JSON Lines file to CSV")
+    export_cmd.add_argument("jsonl")
+    export_cmd.add_argument("csv")
+
+    args = parser.parse_args()
+    started = time.perf_counter()
+
+    if args.command == "scrape":
+        fetch = SeleniumFetcher(args.base_url) if args.selenium else HttpFetcher(args.base_url)
+        rows = scrape(args.output, fetch, args.workers, args.rate, args.max_rows, args.max_pages,
+                      args.save_html, args.retries)
+        print(f"{rows} listings in {args.output}")
+    elif args.command == "replay":
+        rows = replay(args.directory, args.output)
+        print(f"{rows} listings in {args.output}")
+    else:
+        rows = export_csv(args.jsonl, args.csv)
+        print(f"Exported {rows} listings to {args.csv}")
+
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
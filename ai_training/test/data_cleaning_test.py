@@ -0,0 +1,119 @@
+import unittest
+import tempfile
+import sys
+import os
+
+# Ensure ai_training and backend directories are in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+sys.path.insert(1, os.path.join(os.path.dirname(parent_dir), "backend"))
+
+import numpy as np
+import pandas as pd
+import data_cleaning
+from services.encoding_store import normalize_key
+
+
+def listings(**columns):
+    defaults = {
+        "bed": ["3"], "size": ["1,000 sqft"], "price": ["RM1,500 /mo"],
+        "address": ["Ampang, Hulu Langat, Selangor, Malaysia"], "type": ["Condominium"],
+        "update_date": ["2025-09-01"],
+    }
+    defaults.update(columns)
+    rows = max(len(v) for v in defaults.values())
+    return pd.DataFrame({k: v * rows if len(v) == 1 else v for k, v in defaults.items()})
+
+
+class TestDataCleaning(unittest.TestCase):
+
+    def test_numbers_parsed(self):
+        """Test bedrooms, size and price parse like the notebook, with unparsable values as NaN."""
+        bed = data_cleaning.normalize_bedrooms(pd.Series(["Studio", " 2 ", "3.0", "many", None]))
+        self.assertEqual(bed.tolist()[:3], [0.0, 2.0, 3.0])
+        self.assertTrue(bed.iloc[3:].isna().all())
+
+        size = data_cleaning.normalize_size(pd.Series(["1,200 sqft", " 850 SQFT", "n/a"]))
+        self.assertEqual(size.tolist()[:2], [1200.0, 850.0])
+        self.assertTrue(np.isnan(size.iloc[2]))
+
+        price = data_cleaning.normalize_price(pd.Series(["RM2,300 /mo", "RM900/mo", "Price on request"]))
+        self.assertEqual(price.tolist()[:2], [2300.0, 900.0])
+        self.assertTrue(np.isnan(price.iloc[2]))
+
+    def test_split_address(self):
+        """Test four-part addresses split in order, three-part ones repeat the town, others are missing."""
+        parts = data_cleaning.split_address(pd.Series([
+            "Ampang , Hulu Langat, Selangor, Malaysia",
+            "Cheras, Kuala Lumpur, Malaysia",
+            "Somewhere",
+            None,
+            "Ampang , Hulu Langat, Selangor, Malaysia",
+        ], index=[10, 11, 12, 13, 14]))
+
+        self.assertEqual(parts.loc[10].tolist(), ["Ampang", "Hulu Langat", "Selangor"])
+        self.assertEqual(parts.loc[11].tolist(), ["Cheras", "Cheras", "Kuala Lumpur"])
+        self.assertTrue(parts.loc[[12, 13]].isna().all().all())
+        self.assertEqual(parts.loc[14].tolist(), parts.loc[10].tolist())
+
+    def test_text_normalized_like_backend(self):
+        """Test text columns normalize exactly as the backend normalizes encoding lookups."""
+        values = [" Kuala Lumpur ", "SELANGOR", "Pulau\tPinang\n", "ÄLV", "johor"]
+        normalized = data_cleaning.normalize_text(pd.Series(values))
+        self.assertEqual(normalized.tolist(), [normalize_key(v) for v in values])
+        self.assertTrue(data_cleaning.normalize_text(pd.Series([None])).isna().all())
+
+    def test_clean_filters_noise(self):
+        """Test rows without size or with an implausible price per sqft are dropped."""
+        df = listings(
+            size=["1,000 sqft", None, "1,000 sqft", "1,000 sqft"],
+            price=["RM1,500 /mo", "RM1,500 /mo", "RM500 /mo", "Price on request"],
+            update_date=[None, "x", "x", "x"],
+        )
+        cleaned = data_cleaning.clean(df)
+
+        self.assertEqual(cleaned.index.tolist(), [0])
+        row = cleaned.iloc[0]
+        self.assertEqual((row["p/s"], row["update_date"]), (1.5, "unknown"))
+        self.assertEqual([row["town"], row["district"], row["state"], row["type"]],
+                         ["ampang", "hulu langat", "selangor", "condominium"])
+
+    def test_encode_categories_stable_across_chunks(self):
+        """Test codes keep earlier positions and new values are appended in order of appearance."""
+        vocabulary = ["selangor"]
+        first = data_cleaning.encode_categories(pd.Series(["johor", "selangor", None, "johor"]), vocabulary)
+        second = data_cleaning.encode_categories(pd.Series(["kedah", "johor"]), vocabulary)
+
+        self.assertEqual(vocabulary, ["selangor", "johor", "kedah"])
+        self.assertEqual(first.fillna(-1).tolist(), [1.0, 0.0, -1.0, 1.0])
+        self.assertEqual(second.tolist(), [2.0, 1.0])
+
+    def test_clean_csv_in_chunks(self):
+        """Test the CLI path gives the same rows whatever the chunk size, and keeps the encoder file."""
+        df = listings(
+            address=["Ampang, Hulu Langat, Selangor, Malaysia", "Cheras, Kuala Lumpur, Malaysia"] * 5,
+            price=["RM1,500 /mo", "RM9 /mo"] * 4 + ["RM2,000 /mo"] * 2,
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "listings.csv")
+            df.to_csv(source, index=False)
+
+            outputs = []
+            for chunksize in (3, 100):
+                destination = os.path.join(tmp, f"clean_{chunksize}.csv")
+                self.assertEqual(data_cleaning.clean_csv(source, destination, chunksize), (10, 6))
+                outputs.append(pd.read_csv(destination))
+            pd.testing.assert_frame_equal(outputs[0], outputs[1])
+
+            encoder = os.path.join(tmp, "encoder_data.txt")
+            data_cleaning.clean_csv(source, os.path.join(tmp, "encoded.csv"), 3, encoder)
+            vocabularies = data_cleaning.load_encoder(encoder)
+            self.assertEqual(vocabularies["state"], ["selangor", "kuala lumpur"])
+            self.assertEqual(vocabularies["district"], ["hulu langat", "cheras"])
+            encoded = pd.read_csv(os.path.join(tmp, "encoded.csv"))
+            self.assertEqual(sorted(encoded["state"].unique()), [0.0, 1.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
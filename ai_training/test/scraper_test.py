@@ -0,0 +1,173 @@
+import unittest
+import tempfile
+import threading
+import json
+import time
+import sys
+import os
+
+# Ensure ai_training directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import pandas as pd
+import data_cleaning
+import scraper
+
+PAGES_DIR = os.path.join(current_dir, "pages")
+
+
+def read_page(page):
+    with open(os.path.join(PAGES_DIR, scraper.PAGE_FILE.format(page)), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class FakeSite:
+    """Serves the saved pages as pages 1..n (cycling), then empty result pages."""
+
+    def __init__(self, pages, fail_on=()):
+        self.pages = pages
+        self.fail_on = set(fail_on)
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def __call__(self, page):
+        with self._lock:
+            self.requests.append(page)
+        if page in self.fail_on:
+            raise ConnectionError(f"page {page} unavailable")
+        if page > self.pages:
+            return "<html><body><div class='result-search'></div></body></html>"
+        return read_page(1 + (page - 1) % 2)
+
+
+def read_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestListingParser(unittest.TestCase):
+
+    def test_parse_saved_page(self):
+        """Test every field of a card, the studio layout and a card without an update tag."""
+        first, studio = scraper.parse_listings(read_page(1))
+
+        self.assertEqual(first, {
+            "title": "Residensi Ampang & Co",
+            "address": "Ampang, Hulu Langat, Selangor, Malaysia",
+            "price": "RM2,300 /mo",
+            "size": "1,200 SqFt",
+            "bed": "3",
+            "bath": "2",
+            "type": "Condominium",
+            "update_date": "Updated 2 days ago",
+        })
+        self.assertEqual((studio["bed"], studio["bath"], studio["size"], studio["type"]),
+                         ("Studio", "1", "550 SqFt", "Serviced Residence"))
+        self.assertIsNone(studio["update_date"])
+
+    def test_unexpected_info_layout(self):
+        """Test an info block with another number of lines leaves those fields empty, like the notebook."""
+        html = ("<div class='result-search__item'><div class='unit-name'>A</div>"
+                "<div class='wrap-icon-info'><span>3</span><span>Beds</span></div></div>")
+        [listing] = scraper.parse_listings(html)
+        self.assertEqual(listing["title"], "A")
+        self.assertEqual(listing["price"], "")
+        self.assertIsNone(listing["bed"])
+
+
+class TestScrape(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.output = os.path.join(self.tmp.name, "listings.jsonl")
+
+    def test_stops_at_end_of_results(self):
+        """Test pages are fetched concurrently until an empty page, and saved for replay."""
+        site = FakeSite(pages=5)
+        saved = os.path.join(self.tmp.name, "pages")
+        rows = scraper.scrape(self.output, site, workers=3, rate=0, max_rows=1000,
+                              save_html=saved, log=lambda _: None)
+
+        listings = read_jsonl(self.output)
+        self.assertEqual(rows, len(listings))
+        self.assertEqual(sorted({row["page"] for row in listings}), [1, 2, 3, 4, 5])
+        self.assertEqual(len(listings), 3 * 2 + 2 * 1)
+
+        replayed = os.path.join(self.tmp.name, "replayed.jsonl")
+        self.assertEqual(scraper.replay(saved, replayed), rows)
+        key = lambda row: (row["page"], row["title"])
+        self.assertEqual(sorted(read_jsonl(replayed), key=key), sorted(listings, key=key))
+
+    def test_max_rows(self):
+        """Test no new pages are started once enough rows are stored."""
+        site = FakeSite(pages=100)
+        rows = scraper.scrape(self.output, site, workers=2, rate=0, max_rows=5, log=lambda _: None)
+        self.assertGreaterEqual(rows, 5)
+        self.assertLess(max(site.requests), 20)
+
+    def test_resume_after_failure(self):
+        """Test a failed run keeps finished pages, and the rerun fetches only the rest."""
+        failing = FakeSite(pages=6, fail_on={4})
+        with self.assertRaises(scraper.FetchError):
+            scraper.scrape(self.output, failing, workers=1, rate=0, retries=1, log=lambda _: None)
+        done = {row["page"] for row in read_jsonl(self.output)}
+        self.assertTrue({1, 2, 3} <= done)  # page 5 may finish before page 4 gives up
+        self.assertNotIn(4, done)
+
+        # A half-written line after the checkpoint is dropped on resume
+        with open(self.output, "a", encoding="utf-8") as f:
+            f.write('{"page": 4, "title": "trunc')
+
+        site = FakeSite(pages=6)
+        scraper.scrape(self.output, site, workers=2, rate=0, log=lambda _: None)
+
+        pages = [row["page"] for row in read_jsonl(self.output)]
+        self.assertEqual(sorted(set(pages)), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(len(pages), 3 * 2 + 3 * 1)
+        self.assertNotIn(1, site.requests)
+
+    def test_existing_file_without_checkpoint_refused(self):
+        """Test output from elsewhere is never truncated."""
+        with open(self.output, "w", encoding="utf-8") as f:
+            f.write('{"title": "keep me"}\n')
+        with self.assertRaises(ValueError):
+            scraper.replay(PAGES_DIR, self.output)
+
+    def test_missing_output_with_checkpoint_refused(self):
+        """Test a checkpoint whose output was deleted or cut short is not resumed onto NUL padding."""
+        scraper.scrape(self.output, FakeSite(pages=2), workers=1, rate=0, log=lambda _: None)
+        os.remove(self.output)
+        with self.assertRaises(ValueError):
+            scraper.scrape(self.output, FakeSite(pages=2), workers=1, rate=0, log=lambda _: None)
+        self.assertFalse(os.path.exists(self.output))
+
+    def test_rate_limit_shared_by_workers(self):
+        """Test the request rate holds across all fetching threads."""
+        limiter = scraper.RateLimiter(rate=50)
+        started = time.monotonic()
+        threads = [threading.Thread(target=limiter.acquire) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertGreaterEqual(time.monotonic() - started, 5 / 50 - 0.01)
+
+    def test_export_feeds_data_cleaning(self):
+        """Test the CSV export has the notebook's columns and cleans into model features."""
+        scraper.replay(PAGES_DIR, self.output)
+        csv_path = os.path.join(self.tmp.name, "properties.csv")
+        self.assertEqual(scraper.export_csv(self.output, csv_path), 3)
+
+        df = pd.read_csv(csv_path, dtype=str)
+        self.assertEqual(list(df.columns), scraper.COLUMNS)
+        cleaned = data_cleaning.clean(df)
+        self.assertEqual(cleaned["size"].tolist(), [1200.0, 550.0, 1650.0])
+        self.assertEqual(cleaned["bed"].tolist(), [3.0, 0.0, 4.0])
+        self.assertEqual(cleaned["state"].tolist(), ["selangor", "kuala lumpur", "johor"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+import tempfile
+import importlib.util
+import json
+import sys
+import os
+
+# Ensure ai_training and backend directories are in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import joblib
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+import train
+from services.model_registry import ModelRegistry, DEFAULT_FEATURES, METADATA_FILE
+
+SMALL_GRID = {"n_estimators": [5, 10], "max_depth": [None, 4], "min_samples_leaf": [1], "max_features": [1.0]}
+
+
+def listings(rows=240, seed=0):
+    rng = np.random.default_rng(seed)
+    towns = np.array(["ampang", "cheras", "kajang", "bayan lepas"])
+    town = rng.integers(0, len(towns), rows)
+    size = rng.integers(400, 2500, rows).astype(float)
+    return pd.DataFrame({
+        "size": size,
+        "bed": rng.integers(0, 5, rows).astype(float),
+        "bath": rng.integers(1, 4, rows).astype(float),
+        "type": rng.choice(["condominium", "apartment"], rows),
+        "town": towns[town],
+        "district": towns[town],
+        "state": np.where(town < 3, "selangor", "pulau pinang"),
+        "price": size * 1.2 + town * 300 + rng.normal(0, 50, rows),
+    })
+
+
+class TestTraining(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.data = os.path.join(self.tmp.name, "processed_data.csv")
+        listings().to_csv(self.data, index=False)
+
+    def test_fold_encodings_use_training_rows_only(self):
+        """Test validation rows are encoded from their fold's training rows, unseen categories with its global mean."""
+        df = pd.DataFrame({
+            "size": [1.0] * 4, "bed": [1.0] * 4, "bath": [1.0] * 4, "type": ["a"] * 4,
+            "district": ["d"] * 4, "state": ["s"] * 4,
+            "town": ["x", "x", "y", "y"],
+            "price": [100.0, 300.0, 1000.0, 3000.0],
+        })
+        folds = train.build_folds(df, 2, 0, self.tmp.name)
+
+        for path in folds:
+            X_train, y_train, X_val, y_val = joblib.load(path)
+            town_mean = DEFAULT_FEATURES.index("town_mean")
+            state_mean = DEFAULT_FEATURES.index("state_mean")
+            # The validation prices never appear in their own features
+            np.testing.assert_allclose(X_val[:, state_mean], y_train.mean())
+            for row, price in zip(X_val, y_val):
+                self.assertNotEqual(row[town_mean], price)
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_platform_export_loaded(self):
+        """Test an export directory gives the latest lease rents, then asking rents of never-leased homes still listed."""
+        def part(dataset, month, rows):
+            directory = os.path.join(self.tmp.name, "exports", dataset, f"updated_month={month}")
+            os.makedirs(directory)
+            pd.DataFrame(rows).to_parquet(os.path.join(directory, "part-1.parquet"))
+
+        home = {"state": "Selangor", "city": "Ampang", "district": "Ampang", "residence_type": "Condominium",
+                "land_size": 900.0, "num_bedrooms": 3, "num_bathrooms": 2}
+        part("leases", "2026-01", [{"lease_id": 1, "property_id": 10, "monthly_rent": 1500.0,
+                                    "updated_at": pd.Timestamp("2026-01-05"), **home}])
+        part("leases", "2026-02", [{"lease_id": 1, "property_id": 10, "monthly_rent": 1600.0,
+                                    "updated_at": pd.Timestamp("2026-02-01"), **home}])
+        part("listings", "2026-01", [
+            {"property_id": 10, "status": "listed", "price": 1700.0, "updated_at": pd.Timestamp("2026-01-01"), **home},
+            {"property_id": 11, "status": "listed", "price": 1200.0, "updated_at": pd.Timestamp("2026-01-02"), **home},
+            {"property_id": 12, "status": "listed", "price": 1300.0, "updated_at": pd.Timestamp("2026-01-03"), **home},
+            {"property_id": 13, "status": "listed", "price": None, "updated_at": pd.Timestamp("2026-01-04"), **home},
+        ])
+        # Taken off the market since: its earlier listed snapshot must not be used
+        part("listings", "2026-02", [
+            {"property_id": 12, "status": "unlisted", "price": 1300.0, "updated_at": pd.Timestamp("2026-02-03"), **home},
+        ])
+
+        df = train.load_listings([self.data, os.path.join(self.tmp.name, "exports")])
+        platform = df.iloc[len(listings()):]
+        self.assertEqual(platform["price"].tolist(), [1600.0, 1200.0])
+        self.assertEqual(platform[["size", "bed", "bath", "type", "town", "state"]].iloc[0].tolist(),
+                         [900.0, 3.0, 2.0, "condominium", "ampang", "selangor"])
+
+    def test_candidates_reproducible(self):
+        """Test the same seed samples the same parameter sets."""
+        self.assertEqual(train.sample_candidates(5, 1), train.sample_candidates(5, 1))
+        self.assertEqual(len({json.dumps(c, sort_keys=True) for c in train.sample_candidates(5, 1)}), 5)
+        with patch.object(train, "PARAM_GRID", SMALL_GRID):
+            self.assertEqual(len(train.sample_candidates(100, 1)), 4)
+
+    def test_bundle_loads_in_backend(self):
+        """Test the exported version is complete, loads in the registry and reports its search."""
+        root = os.path.join(self.tmp.name, "models")
+        with patch.object(train, "PARAM_GRID", SMALL_GRID):
+            directory, metadata = train.train(self.data, root, "v1", folds=3, candidates=4, jobs=2,
+                                              log=lambda _: None)
+
+        self.assertEqual(set(metadata["timings"]), {"load", "folds", "search", "final", "export"})
+        self.assertEqual(len(metadata["search"]), 4)
+        self.assertEqual(metadata["params"], metadata["search"][0]["params"])
+
+        mtimes = {name: os.stat(os.path.join(directory, name)).st_mtime_ns for name in os.listdir(directory)}
+        self.assertEqual(max(mtimes, key=mtimes.get), METADATA_FILE)
+
+        bundle = ModelRegistry(root).get()
+        self.assertEqual(bundle.version, "v1")
+        self.assertEqual(bundle.features, DEFAULT_FEATURES)
+        self.assertAlmostEqual(bundle.encodings.town.get("Ampang"), pd.read_csv(self.data).query("town == 'ampang'")["price"].mean())
+        self.assertEqual(type(bundle.model).__name__, "ForestEngine")
+
+        X = np.array([[1000, 2, 2, 1500, 1500, 1500, 1500]], dtype=np.float64)
+        pickled = joblib.load(os.path.join(directory, "price_model.pkl"))
+        self.assertTrue(np.array_equal(bundle.model.predict(X), pickled.predict(pd.DataFrame(X, columns=DEFAULT_FEATURES))))
+
+    def test_rerun_reproducible(self):
+        """Test two runs with the same seed score and pick the same candidate, whatever the job count."""
+        root = os.path.join(self.tmp.name, "models")
+        with patch.object(train, "PARAM_GRID", SMALL_GRID):
+            _, first = train.train(self.data, root, "a", folds=3, candidates=2, jobs=1, log=lambda _: None)
+            _, second = train.train(self.data, root, "b", folds=3, candidates=2, jobs=2, log=lambda _: None)
+
+        self.assertEqual(first["search"], second["search"])
+
+
+if __name__ == '__main__':
+    unittest.main()
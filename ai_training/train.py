@@ -0,0 +1,329 @@
+"""
+Training pipeline for the rental price model (the job of Model Training.py).
+
+    python train.py processed_data.csv --output ../backend/ai_model
+    python train.py processed_data.xlsx --folds 5 --candidates 12 --jobs -1 --seed 42
+    python train.py processed_data.csv ../backend/exports --output ../backend/ai_model
+
+Steps, each timed and reported:
+  1. load      read the cleaned listings (data_cleaning.py output) and/or
+               Parquet exports of the app's own leases and listings
+               (backend/services/training_export.py), concatenated
+  2. folds     split into K folds; per fold, the mean target encodings are
+               computed from the training rows only and applied to the
+               validation rows, so no validation price leaks into its own
+               features. Each fold's matrices are built once and cached on
+               disk, memory-mapped by every search worker.
+  3. search    every (candidate, fold) pair is one task, spread over --jobs
+               processes (joblib); candidates are sampled from PARAM_GRID
+               with --seed, so a rerun picks and scores the same ones
+  4. final     the best candidate (lowest mean validation MAE) is refit on
+               all rows with encodings from all rows
+  5. export    a version directory loadable by the backend ModelRegistry:
+               price_model.pkl, forest.npz, mean_values.txt, encodings.npz,
+               and metadata.json last (it marks the version as complete)
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# Ensure the backend is importable (model bundle layout and exporters)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(current_dir), "backend"))
+
+import data_cleaning
+from services.encoding_store import ENCODINGS_FILE, export_encodings
+from services.forest_engine import FOREST_FILE, export_forest
+from services.model_registry import (
+    DEFAULT_FEATURES, MEAN_VALUES_FILE, METADATA_FILE, MODEL_FILE, MeanEncodings
+)
+
+DEFAULT_FOLDS = 5
+DEFAULT_CANDIDATES = 8
+DEFAULT_SEED = 42
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(current_dir), "backend", "ai_model")
+
+TARGET = "price"
+CATEGORY_COLUMNS = {"state": "state_mean", "town": "town_mean", "district": "district_mean", "type": "type_mean"}
+
+PARAM_GRID = {
+    "n_estimators": [100, 200, 400],
+    "max_depth": [None, 12, 20],
+    "min_samples_leaf": [1, 2, 5],
+    "max_features": [1.0, 0.6, "sqrt"],
+}
+
+
+# Platform export columns -> the cleaned listing columns (as ai_service.build_features maps them)
+PLATFORM_COLUMNS = {"land_size": "size", "num_bedrooms": "bed", "num_bathrooms": "bath",
+                    "residence_type": "type", "city": "town", "district": "district", "state": "state"}
+
+# Property statuses whose asking rent is a training target
+LISTED_STATUSES = ("listed", "rented")
+
+
+# ---- features -----------------------------------------------------------------
+
+def load_platform_export(directory):
+    """
+    Listings from a training_export directory: the agreed rent of every
+    signed lease, plus the asking rent of residences that never had one
+    and are listed or rented. Exports append a snapshot per change, so only
+    the latest row per lease and per property is kept, and the status is
+    checked on that row: a delisted residence drops out.
+    """
+    def latest(dataset, key):
+        path = os.path.join(directory, dataset)
+        if not os.path.isdir(path):
+            return pd.DataFrame(columns=[key, "property_id", "status", TARGET, *PLATFORM_COLUMNS])
+        df = pd.read_parquet(path)
+        return df.sort_values("updated_at", kind="stable").drop_duplicates(key, keep="last")
+
+    leases = latest("leases", "lease_id").rename(columns={"monthly_rent": TARGET})
+    listings = latest("listings", "property_id")
+    listings = listings[listings["status"].isin(LISTED_STATUSES) & listings[TARGET].notna()
+                        & ~listings["property_id"].isin(leases["property_id"])]
+
+    columns = [*PLATFORM_COLUMNS, TARGET]
+    df = pd.concat([leases[columns], listings[columns]], ignore_index=True)
+    return df.rename(columns=PLATFORM_COLUMNS).astype({"size": "float64", "bed": "float64", "bath": "float64",
+                                                       TARGET: "float64"})
+
+
+def load_listings(paths):
+    """
+    Cleaned listings with normalized category columns and a numeric price,
+    from one or more .csv/.xlsx files or platform export directories.
+    """
+    frames = []
+    for path in [paths] if isinstance(paths, str) else paths:
+        if os.path.isdir(path):
+            frames.append(load_platform_export(path))
+        elif path.lower().endswith(".xlsx"):
+            frames.append(pd.read_excel(path))
+        else:
+            frames.append(pd.read_csv(path))
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    df = df[df[TARGET].notna()].reset_index(drop=True)
+    for column in CATEGORY_COLUMNS:
+        df[column] = data_cleaning.normalize_text(df[column])
+    return df
+
+
+def fit_encodings(train):
+    """MeanEncodings (global mean, per-category mean price) from training rows only."""
+    return MeanEncodings(
+        float(train[TARGET].mean()),
+        *(train.groupby(column)[TARGET].mean().to_dict() for column in CATEGORY_COLUMNS)
+    )
+
+
+def feature_frame(df, encodings):
+    """Model features in DEFAULT_FEATURES order; unseen categories get the global mean."""
+    features = pd.DataFrame({"size": df["size"], "bed": df["bed"], "bath": df["bath"]}, index=df.index)
+    for column, feature in CATEGORY_COLUMNS.items():
+        features[feature] = df[column].map(getattr(encodings, column)).astype("float64").fillna(encodings.global_mean)
+    return features[DEFAULT_FEATURES].astype("float64")
+
+
+def build_folds(df, n_folds, seed, cache_dir):
+    """
+    Cache each fold's (X_train, y_train, X_val, y_val) in cache_dir, with
+    encodings fitted on that fold's training rows. Returns the file paths.
+    """
+    import joblib
+    from sklearn.model_selection import KFold
+
+    paths = []
+    for i, (train_idx, val_idx) in enumerate(KFold(n_folds, shuffle=True, random_state=seed).split(df)):
+        train, val = df.iloc[train_idx], df.iloc[val_idx]
+        encodings = fit_encodings(train)
+        fold = (feature_frame(train, encodings).to_numpy(), train[TARGET].to_numpy(dtype=np.float64),
+                feature_frame(val, encodings).to_numpy(), val[TARGET].to_numpy(dtype=np.float64))
+        path = os.path.join(cache_dir, f"fold_{i}.joblib")
+        joblib.dump(fold, path)
+        paths.append(path)
+    return paths
+
+
+# ---- search -------------------------------------------------------------------
+
+def sample_candidates(n, seed):
+    """`n` distinct parameter sets from PARAM_GRID (all of them if n covers the grid)."""
+    names = sorted(PARAM_GRID)
+    grid = [dict(zip(names, values)) for values in itertools.product(*(PARAM_GRID[name] for name in names))]
+    if n >= len(grid):
+        return grid
+    return random.Random(seed).sample(grid, n)
+
+
+def evaluate(params, fold_path, seed):
+    """(MAE, R²) of one candidate on one cached fold; runs in a worker process."""
+    import joblib
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    X_train, y_train, X_val, y_val = joblib.load(fold_path, mmap_mode="r")
+    model = RandomForestRegressor(random_state=seed, n_jobs=1, **params).fit(X_train, y_train)
+    predicted = model.predict(X_val)
+    return mean_absolute_error(y_val, predicted), r2_score(y_val, predicted)
+
+
+def search(candidates, fold_paths, seed, jobs):
+    """Mean cross-validation scores per candidate, best (lowest MAE) first."""
+    from joblib import Parallel, delayed
+
+    tasks = [(c, f) for c in range(len(candidates)) for f in range(len(fold_paths))]
+    scores = Parallel(n_jobs=jobs)(
+        delayed(evaluate)(candidates[c], fold_paths[f], seed) for c, f in tasks
+    )
+
+    results = []
+    for c, params in enumerate(candidates):
+        fold_scores = [score for (task_c, _), score in zip(tasks, scores) if task_c == c]
+        mae = [s[0] for s in fold_scores]
+        r2 = [s[1] for s in fold_scores]
+        results.append({
+            "params": params,
+            "mae": float(np.mean(mae)),
+            "mae_std": float(np.std(mae)),
+            "r2": float(np.mean(r2)),
+            "fold_mae": [float(m) for m in mae],
+        })
+    return sorted(results, key=lambda r: r["mae"])
+
+
+# ---- export -------------------------------------------------------------------
+
+def write_mean_values(path, encodings):
+    """mean_values.txt in the format ai_service has always read."""
+    sections = [("STATE", encodings.state), ("TOWN", encodings.town),
+                ("DISTRICT", encodings.district), ("TYPE", encodings.type)]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# GLOBAL MEAN\n")
+        f.write(f"{encodings.global_mean:.2f}\n")
+        for name, means in sections:
+            f.write(f"\n# {name} MEANS\n")
+            for key, value in means.items():
+                f.write(f"{key}: {value:.2f}\n")
+
+
+def export_bundle(directory, model, encodings, metadata):
+    """Write a model version directory; metadata.json goes last so the backend never sees half a version."""
+    import joblib
+
+    os.makedirs(directory, exist_ok=False)
+    joblib.dump(model, os.path.join(directory, MODEL_FILE))
+    export_forest(model, os.path.join(directory, FOREST_FILE))
+    write_mean_values(os.path.join(directory, MEAN_VALUES_FILE), encodings)
+    export_encodings(encodings, os.path.join(directory, ENCODINGS_FILE))
+
+    temp_path = os.path.join(directory, METADATA_FILE + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(temp_path, os.path.join(directory, METADATA_FILE))
+
+
+# ---- pipeline -----------------------------------------------------------------
+
+class StageTimer:
+    """Wall time per pipeline stage: `with timer("name"): ...`."""
+
+    def __init__(self, log):
+        self.log = log
+        self.timings = {}
+
+    @contextmanager
+    def __call__(self, name):
+        started = time.perf_counter()
+        yield
+        self.timings[name] = round(time.perf_counter() - started, 3)
+        self.log(f"[{name}] {self.timings[name]:.2f}s")
+
+
+def train(data_path, output=DEFAULT_OUTPUT, version=None, folds=DEFAULT_FOLDS,
+          candidates=DEFAULT_CANDIDATES, seed=DEFAULT_SEED, jobs=-1, log=print):
+    """Run the whole pipeline; returns (version directory, metadata)."""
+    from joblib import cpu_count
+    from sklearn import __version__ as sklearn_version
+    from sklearn.ensemble import RandomForestRegressor
+
+    stage = StageTimer(log)
+    version = version or datetime.now(timezone.utc).strftime("%Y-%m-%d-%H%M%S")
+
+    with stage("load"):
+        df = load_listings(data_path)
+    log(f"{len(df)} listings")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        with stage("folds"):
+            fold_paths = build_folds(df, folds, seed, cache_dir)
+
+        params = sample_candidates(candidates, seed)
+        with stage("search"):
+            results = search(params, fold_paths, seed, jobs)
+    best = results[0]
+    for result in results:
+        log(f"  MAE {result['mae']:9.2f} ± {result['mae_std']:7.2f}  R² {result['r2']:.3f}  {result['params']}")
+
+    with stage("final"):
+        encodings = fit_encodings(df)
+        model = RandomForestRegressor(random_state=seed, n_jobs=jobs, **best["params"])
+        model.fit(feature_frame(df, encodings), df[TARGET])
+        model.set_params(n_jobs=None)  # the backend predicts single-job
+
+    directory = os.path.join(output, version)
+    metadata = {
+        "version": version,
+        "features": list(DEFAULT_FEATURES),
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "rows": len(df),
+        "seed": seed,
+        "folds": folds,
+        "params": best["params"],
+        "cv_mae": best["mae"],
+        "cv_mae_std": best["mae_std"],
+        "cv_r2": best["r2"],
+        "search": results,
+        "timings": stage.timings,
+        "cpu_count": cpu_count(),
+        "jobs": jobs,
+        "sklearn": sklearn_version,
+        "python": platform.python_version(),
+    }
+    with stage("export"):
+        export_bundle(directory, model, encodings, metadata)
+    return directory, metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data", nargs="+", help="cleaned listings (.csv or .xlsx) and/or platform export directories")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="model root; a version directory is created in it")
+    parser.add_argument("--version", help="version directory name (default: UTC timestamp)")
+    parser.add_argument("--folds", type=int, default=DEFAULT_FOLDS)
+    parser.add_argument("--candidates", type=int, default=DEFAULT_CANDIDATES, help="parameter sets to try")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--jobs", type=int, default=-1, help="worker processes (-1: all cores)")
+    args = parser.parse_args()
+
+    directory, metadata = train(args.data, args.output, args.version, args.folds, args.candidates,
+                                args.seed, args.jobs)
+    print(f"\nBest {metadata['params']}: CV MAE {metadata['cv_mae']:.2f}, R² {metadata['cv_r2']:.3f}")
+    print("Stage timings: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in metadata["timings"].items()))
+    print(f"Model version written to {directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from database import db, init_db
+from migrations import upgrade
 from models.user import User
 from models.property import Property
 from models.message import Message
@@ -20,6 +21,8 @@ from flask_cors import CORS
 from flask import Flask, send_from_directory
 import os
 from scheduler import start_scheduler
+from services.ai_service import start_inference
+from services.storage import init_storage
 from datetime import datetime
 from extension import socketio, join_room
 
@@ -31,10 +34,11 @@ CORS(app, resources={r"/*": {"origins": "*"}})
 # Initialize DB
 init_db(app)
 with app.app_context():
-    db.create_all()
+    upgrade()
 
-# Upload folder
+# Upload folder (local storage) and storage driver
 app.config["UPLOAD_FOLDER"] = os.path.join(os.getcwd(), "uploads")
+init_storage(app)
 
 # Socket
 socketio.init_app(app)
@@ -60,6 +64,9 @@ def on_join(data):
 
 
 
+# Fork the inference workers before the scheduler starts its threads
+start_inference(app)
+
 with app.app_context():
     start_scheduler(app)
 
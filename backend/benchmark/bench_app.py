@@ -0,0 +1,50 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Builds a Flask app wired like app.py (database, socket, blueprints) but
+without the scheduler, so a benchmark can point it at any database URL.
+"""
+import os
+import sys
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from flask import Flask
+from database import init_db
+from extension import socketio
+from migrations import upgrade
+
+
+def create_bench_app(database_url, **config):
+    """Create an app bound to database_url with all migrations applied."""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    app.config["UPLOAD_FOLDER"] = os.path.join(os.getcwd(), "uploads")
+    app.config.update(config)
+
+    init_db(app)
+    with app.app_context():
+        upgrade()
+
+    socketio.init_app(app)
+    return app
+
+
+def register_blueprints(app, *names):
+    """Register only the route modules a benchmark needs."""
+    import importlib
+
+    for name in names:
+        module = importlib.import_module(f"routes.{name}_route")
+        app.register_blueprint(getattr(module, f"{name}_bp"))
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,104 @@
+"""
+Chat history paging benchmark: OFFSET vs. before_id cursors.
+
+Seeds one channel with a long history (1M messages by default) and times
+chat_service.get_messages for a page at increasing depths, once with
+offset paging and once with the before_id cursor of the previous page.
+
+Example:
+    python benchmark/chat_history.py --messages 1000000 --page-size 20
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bench_app import create_bench_app, percentile
+from database import db
+from sqlalchemy import insert, select
+
+CHANNEL_ID = 1
+DEPTHS = [0, 100, 1_000, 10_000, 45_000]   # page numbers
+
+
+def seed(app, count, batch=50_000):
+    from models.message import Message
+
+    start = datetime(2024, 1, 1)
+    with app.app_context():
+        for first in range(0, count, batch):
+            rows = [{
+                "sender_id": 1 + i % 2,
+                "channel_id": CHANNEL_ID,
+                "message_body": f"message {i}",
+                "type": "text",
+                "sent_at": start + timedelta(seconds=i),
+                "seq": i + 1,
+            } for i in range(first, min(first + batch, count))]
+            db.session.execute(insert(Message.__table__), rows)
+            db.session.commit()
+
+
+def run(app, page_size, depths, repeat):
+    from models.message import Message
+    from services import chat_service
+
+    results = {}
+    with app.app_context():
+        for page in depths:
+            # Cursor a client would hold after scrolling to this page
+            before_id = db.session.execute(
+                select(Message.id).where(Message.channel_id == CHANNEL_ID)
+                .order_by(Message.id.desc()).offset(page * page_size).limit(1)
+            ).scalar()
+            if before_id is None:
+                continue
+            before_id += 1
+
+            offset_samples, cursor_samples = [], []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                _, _, by_offset = chat_service.get_messages(CHANNEL_ID, limit=page_size, offset=page * page_size)
+                offset_samples.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                _, _, by_cursor = chat_service.get_messages(CHANNEL_ID, limit=page_size, before_id=before_id)
+                cursor_samples.append(time.perf_counter() - started)
+
+            assert [m.id for m in by_offset] == [m.id for m in by_cursor]
+            results[page] = (offset_samples, cursor_samples)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to a fresh SQLite file in a temp directory")
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app = create_bench_app(url)
+
+        print(f"Seeding {args.messages} messages in one channel ...")
+        started = time.perf_counter()
+        seed(app, args.messages)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s\n")
+
+        results = run(app, args.page_size, DEPTHS, args.repeat)
+
+        print(f"{'page':>8}{'OFFSET p50':>14}{'before_id p50':>16}{'speedup':>10}")
+        for page, (offset_samples, cursor_samples) in results.items():
+            offset_p50 = percentile(offset_samples, 50)
+            cursor_p50 = percentile(cursor_samples, 50)
+            print(f"{page:>8}{offset_p50 * 1000:>12.2f}ms{cursor_p50 * 1000:>14.2f}ms{offset_p50 / cursor_p50:>9.1f}x")
+
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
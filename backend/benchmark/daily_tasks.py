@@ -0,0 +1,160 @@
+"""
+Daily scheduler benchmark: process_daily_tasks over many active leases.
+
+Seeds active leases (100k by default) that started over the last two years
+and are one billing cycle behind, plus leases that ended fully paid, then
+times process_daily_tasks: the first run (every lease is scheduled for
+the first time, with records to create, overdue records and leases to
+complete) and a second run on the same day, which only looks at leases
+whose next event has come.
+
+With --legacy-leases N the old per-lease loop is timed on a separate
+database of N leases for comparison; it commits every record, so keep N
+small.
+
+Example:
+    python benchmark/daily_tasks.py --leases 100000 --legacy-leases 2000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from bench_app import create_bench_app
+from database import db
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import insert
+
+
+def seed(app, count, batch=5000):
+    from models.user import User
+    from models.property import Property, Residence
+    from models.lease import Lease
+    from models.tenant_record import TenantRecord
+
+    rng = random.Random(11)
+    today = datetime.now(timezone.utc).date()
+
+    with app.app_context():
+        owner = User(uid="bench-owner", email="owner@bench", username="owner")
+        tenant = User(uid="bench-tenant", email="tenant@bench", username="tenant")
+        db.session.add_all([owner, tenant])
+        db.session.commit()
+
+        for first in range(1, count + 1, batch):
+            properties, residences, leases, records = [], [], [], []
+            for lease_id in range(first, min(first + batch, count + 1)):
+                start = today - timedelta(days=rng.randint(60, 720))
+                ended = lease_id % 10 == 0   # 10% ended, fully paid
+                end = today - timedelta(days=1) if ended else start + relativedelta(years=3)
+
+                properties.append({"id": lease_id, "user_id": owner.id, "type": "residence",
+                                   "status": "rented", "name": f"Home {lease_id}"})
+                residences.append({"property_id": lease_id})
+                leases.append({"id": lease_id, "property_id": lease_id, "tenant_id": tenant.id,
+                               "start_date": start, "end_date": end, "gracePeriodDays": 3,
+                               "monthly_rent": 1000.0, "status": "active"})
+
+                # Paid up to the previous cycle; ended leases are paid in full
+                month = 0
+                while True:
+                    cycle = start + relativedelta(months=month)
+                    if cycle >= end or cycle > today or (not ended and cycle + relativedelta(months=1) > today):
+                        break
+                    records.append({"lease_id": lease_id, "month": cycle.strftime("%Y-%m"),
+                                    "start_date": cycle, "due_date": cycle + timedelta(days=3),
+                                    "paid_at": cycle, "amount_paid": 1000.0, "status": "paid"})
+                    month += 1
+
+            db.session.execute(insert(Property.__table__), properties)
+            db.session.execute(insert(Residence.__table__), residences)
+            db.session.execute(insert(Lease.__table__), leases)
+            db.session.execute(insert(TenantRecord.__table__), records)
+            db.session.commit()
+
+
+def legacy_process_daily_tasks():
+    """The per-lease loop process_daily_tasks used before the set-based rewrite."""
+    from models.lease import Lease
+    from models.request import Request
+    from models.tenant_record import TenantRecord
+    from services.tenant_record_service import generate_next_tenant_record
+
+    with db.session.no_autoflush:
+        active_leases = Lease.query.filter_by(status='active').all()
+        today = datetime.now(timezone.utc).date()
+
+        for lease in active_leases:
+            while True:
+                if not generate_next_tenant_record(lease.id):
+                    break
+
+            for record in TenantRecord.query.filter(TenantRecord.lease_id == lease.id,
+                                                    TenantRecord.status == 'unpaid').all():
+                if today > record.due_date:
+                    record.status = 'overdue'
+
+            if lease.end_date and today >= lease.end_date:
+                outstanding = TenantRecord.query.filter(
+                    TenantRecord.lease_id == lease.id,
+                    TenantRecord.status.in_(['unpaid', 'overdue'])
+                ).count()
+                if outstanding == 0:
+                    lease.status = 'completed'
+                    if lease.channel:
+                        lease.channel.status = 'closed'
+                    if lease.property:
+                        lease.property.status = 'unlisted'
+                    for req in Request.query.filter(
+                        Request.property_id == lease.property_id,
+                        Request.status.in_(['pending', 'rejected', 'terminated', 'completed'])
+                    ).all():
+                        req.status = 'archived'
+
+        db.session.commit()
+
+
+def timed(app, fn):
+    with app.app_context():
+        started = time.perf_counter()
+        result = fn()
+        return time.perf_counter() - started, result
+
+
+def bench(database_dir, name, leases, fn):
+    app = create_bench_app(f"sqlite:///{os.path.join(database_dir, name + '.db')}")
+
+    started = time.perf_counter()
+    seed(app, leases)
+    print(f"[{name}] seeded {leases} leases in {time.perf_counter() - started:.1f}s")
+
+    first, summary = timed(app, fn)
+    second, _ = timed(app, fn)
+    print(f"[{name}] first run {first:8.2f}s  second run {second:8.2f}s  {summary or ''}")
+
+    with app.app_context():
+        db.engine.dispose()
+    return first, second
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leases", type=int, default=100_000)
+    parser.add_argument("--legacy-leases", type=int, default=0)
+    args = parser.parse_args()
+
+    from services.tenant_record_service import process_daily_tasks
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench(tmp, "set_based", args.leases, process_daily_tasks)
+
+        if args.legacy_leases:
+            set_first, _ = bench(tmp, "set_based_small", args.legacy_leases, process_daily_tasks)
+            legacy_first, _ = bench(tmp, "legacy", args.legacy_leases, legacy_process_daily_tasks)
+            print(f"\nfirst run at {args.legacy_leases} leases: {legacy_first / set_first:.0f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Concurrent read/write throughput benchmark.
+
+Runs /property/search readers alongside /chat/send_text writers against
+one database configuration and reports requests per second and latency.
+
+Examples:
+    python benchmark/db_throughput.py
+    python benchmark/db_throughput.py --journal-mode DELETE --synchronous FULL
+    python benchmark/db_throughput.py --database-url postgresql://user:pw@localhost/rental_bench
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from bench_app import create_bench_app, register_blueprints, percentile
+from database import db
+
+STATES = ["johor", "selangor", "penang", "kuala lumpur", "melaka"]
+WORDS = ["cozy", "modern", "studio", "family", "condo", "garden", "view", "suite"]
+
+
+def seed(app, num_properties, num_channels):
+    from models.user import User
+    from models.property import Residence
+    from models.channel import Channel
+
+    with app.app_context():
+        owner = User(uid="bench-owner", email="owner@bench", username="owner")
+        tenant = User(uid="bench-tenant", email="tenant@bench", username="tenant")
+        db.session.add_all([owner, tenant])
+        db.session.flush()
+
+        rng = random.Random(42)
+        residences = []
+        for i in range(num_properties):
+            residences.append(Residence(
+                user_id=owner.id,
+                name=f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}",
+                title=f"{rng.choice(WORDS)} home",
+                description=" ".join(rng.choice(WORDS) for _ in range(12)),
+                type="residence",
+                state=rng.choice(STATES),
+                city="bandar",
+                district="district",
+                status="listed",
+                price=rng.randint(500, 4000),
+                num_bedrooms=rng.randint(0, 4),
+                num_bathrooms=rng.randint(1, 3),
+                land_size=rng.randint(400, 2500),
+                residence_type="condominium",
+            ))
+        db.session.add_all(residences)
+        db.session.flush()
+
+        channels = [
+            Channel(property_id=residences[i % len(residences)].id, tenant_id=tenant.id)
+            for i in range(num_channels)
+        ]
+        db.session.add_all(channels)
+        db.session.commit()
+        return owner.id, [c.id for c in channels]
+
+
+def reader(app, stop, results):
+    client = app.test_client()
+    rng = random.Random()
+    while not stop.is_set():
+        params = {"query": rng.choice(WORDS), "state": rng.choice(STATES), "page": rng.randint(1, 5)}
+        started = time.perf_counter()
+        response = client.get("/property/search", query_string=params)
+        results.append((time.perf_counter() - started, response.status_code == 200))
+
+
+def writer(app, stop, results, sender_id, channel_ids):
+    client = app.test_client()
+    rng = random.Random()
+    while not stop.is_set():
+        payload = {
+            "sender_id": sender_id,
+            "channel_id": rng.choice(channel_ids),
+            "message_body": "benchmark message",
+        }
+        started = time.perf_counter()
+        response = client.post("/chat/send_text", json=payload)
+        results.append((time.perf_counter() - started, response.status_code == 200))
+
+
+def report(label, results, duration):
+    latencies = [latency for latency, _ in results]
+    errors = sum(1 for _, ok in results if not ok)
+    print(
+        f"{label:<8} {len(results) / duration:>9.1f} req/s   "
+        f"p50 {percentile(latencies, 50) * 1000:>7.2f} ms   "
+        f"p95 {percentile(latencies, 95) * 1000:>7.2f} ms   "
+        f"errors {errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to a fresh SQLite file in a temp directory")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--properties", type=int, default=5000)
+    parser.add_argument("--channels", type=int, default=50)
+    parser.add_argument("--journal-mode", default="WAL", help="SQLite only, e.g. WAL or DELETE")
+    parser.add_argument("--synchronous", default="NORMAL", help="SQLite only, e.g. NORMAL or FULL")
+    parser.add_argument("--pool-size", type=int, default=10, help="server databases only")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    database_url = args.database_url
+    if not database_url:
+        tmp_dir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(tmp_dir.name, 'bench.db')}"
+
+    app = create_bench_app(
+        database_url,
+        SQLITE_JOURNAL_MODE=args.journal_mode,
+        SQLITE_SYNCHRONOUS=args.synchronous,
+        DB_POOL_SIZE=args.pool_size,
+    )
+    register_blueprints(app, "property", "chat")
+
+    print(f"Seeding {args.properties} residences and {args.channels} channels ...")
+    sender_id, channel_ids = seed(app, args.properties, args.channels)
+
+    stop = threading.Event()
+    read_results, write_results = [], []
+    threads = [threading.Thread(target=reader, args=(app, stop, read_results)) for _ in range(args.readers)]
+    threads += [
+        threading.Thread(target=writer, args=(app, stop, write_results, sender_id, channel_ids))
+        for _ in range(args.writers)
+    ]
+
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(f"\n{database_url}  journal={args.journal_mode} synchronous={args.synchronous}")
+    print(f"{args.readers} readers / {args.writers} writers for {args.duration:.0f}s")
+    report("search", read_results, args.duration)
+    report("send", write_results, args.duration)
+
+    if tmp_dir:
+        with app.app_context():
+            db.engine.dispose()
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Forest engine benchmark: scikit-learn RandomForestRegressor.predict vs the
+flattened NumPy engine (services/forest_engine.py).
+
+Uses the installed model (backend/ai_model/) if there is one, otherwise a
+synthetic forest of --trees trees, exports it to a temporary forest.npz and
+reports:
+  * whether predictions are bit-identical on --rows random rows,
+  * predict latency for one row and for batches (median of --repeat runs),
+    and the engine's latency when it also returns percentile bands,
+  * memory per worker process: each model is loaded in a fresh process,
+    which reports its private (RssAnon) and file-backed (RssFile) resident
+    memory growth. File-backed pages of the memory-mapped forest are shared
+    by every worker through the page cache.
+
+Example:
+    python benchmark/forest_engine.py --batch-sizes 1 50 500 --repeat 50
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bench_app import parent_dir  # noqa: F401 (puts the backend on sys.path)
+from services.forest_engine import export_forest, load_forest
+
+MEMORY_PROBE = """
+import json, sys
+sys.path.insert(0, {backend!r})
+
+def rss():
+    fields = {{}}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            fields[key] = int(value.split()[0]) if value.strip().endswith("kB") else 0
+    return fields.get("RssAnon", 0), fields.get("RssFile", 0)
+
+import numpy as np, joblib, sklearn.ensemble
+from services.forest_engine import load_forest
+before = rss()
+model = joblib.load({path!r}) if {pickle!r} else load_forest({path!r})
+model.predict(np.zeros((200, {features})))
+after = rss()
+print(json.dumps({{"anon_kb": after[0] - before[0], "file_kb": after[1] - before[1]}}))
+"""
+
+
+def installed_or_synthetic_model(trees, features=7):
+    import joblib
+    from services.model_registry import registry, MODEL_FILE
+
+    if registry.active_version() is not None:
+        pickle_path = os.path.join(registry._resolve()[1], MODEL_FILE)
+        if os.path.isfile(pickle_path):
+            return joblib.load(pickle_path), registry.active_version()
+
+    from sklearn.ensemble import RandomForestRegressor
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 3000, (5000, features))
+    y = X[:, 0] * 0.5 + X[:, -1] + rng.normal(0, 100, len(X))
+    return RandomForestRegressor(n_estimators=trees, random_state=0).fit(X, y), f"synthetic ({trees} trees)"
+
+
+def median_ms(fn, X, repeat):
+    fn(X)  # warm up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(X)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def memory(path, pickle, features):
+    code = MEMORY_PROBE.format(backend=parent_dir, path=path, pickle=pickle, features=features)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trees", type=int, default=100, help="trees in the synthetic forest")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    import joblib
+
+    model, name = installed_or_synthetic_model(args.trees)
+    model.set_params(n_jobs=None)  # single job: the summation order the engine reproduces
+    if hasattr(model, "feature_names_in_"):
+        del model.feature_names_in_  # compare on plain matrices, as ai_service passes them
+    n_features = model.n_features_in_
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = os.path.join(tmp, "price_model.pkl")
+        forest_path = os.path.join(tmp, "forest.npz")
+        joblib.dump(model, pickle_path)
+        export_forest(model, forest_path)
+        engine = load_forest(forest_path)
+
+        print(f"model {name}: {len(model.estimators_)} trees, {len(engine.value)} nodes, depth {engine.max_depth}")
+        print(f"pickle {os.path.getsize(pickle_path) / 1e6:.1f} MB, forest.npz {os.path.getsize(forest_path) / 1e6:.1f} MB\n")
+
+        rng = np.random.default_rng(2)
+        X = rng.uniform(0, 3000, (args.rows, n_features))
+        identical = np.array_equal(model.predict(X), engine.predict(X))
+        print(f"bit-identical on {args.rows} rows: {identical}\n")
+
+        def with_bands(batch):
+            return engine.predict_with_percentiles(batch, (10, 25, 75, 90))
+
+        print(f"{'rows':>6} {'sklearn ms':>11} {'engine ms':>10} {'speedup':>8} {'+bands ms':>10}")
+        for size in args.batch_sizes:
+            batch = X[:size]
+            sk = median_ms(model.predict, batch, args.repeat)
+            en = median_ms(engine.predict, batch, args.repeat)
+            bands = median_ms(with_bands, batch, args.repeat)
+            print(f"{size:>6} {sk:>11.3f} {en:>10.3f} {sk / en:>7.1f}x {bands:>10.3f}")
+
+        print("\nper worker process after load + one predict:")
+        for label, path, is_pickle in [("pickle", pickle_path, True), ("forest.npz", forest_path, False)]:
+            mem = memory(path, is_pickle, n_features)
+            print(f"{label:>12}: private {mem['anon_kb'] / 1024:7.1f} MB, shared file-backed {mem['file_kb'] / 1024:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Thumbnail serving benchmark: the old /uploads route vs. the cached one.
+
+Writes `--thumbnails` UUID-named images of `--size` bytes, then has
+`--clients` simulated app users open a search result page of
+`--page-size` thumbnails `--views` times each. Every client keeps an
+HTTP cache that honours Cache-Control, max-age and ETag like a browser
+or Flutter's image cache, so a response the server marks as fresh is
+not requested again and a stale one is revalidated with If-None-Match.
+
+Modes:
+    legacy      send_from_directory without caching headers (the old
+                route): every view revalidates every thumbnail (304)
+    immutable   services/storage.py: UUID names are fresh for a year,
+                repeated views are served from the client cache
+    x-accel     as immutable, and the first download is handed to nginx
+                (X-Accel-Redirect), so Python sends headers only
+
+Requests run in-process through the WSGI test client, so the numbers are
+Python worker time per thumbnail, without network or proxy costs.
+
+Example:
+    python benchmark/media_serving.py --thumbnails 2000 --clients 50 --views 10
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from bench_app import percentile
+from flask import Blueprint, Flask, current_app, send_from_directory
+from routes.file_route import file_bp
+
+legacy_bp = Blueprint("legacy_media", __name__, url_prefix="/uploads")
+
+
+@legacy_bp.route("/<path:filename>")
+def legacy_serve_file(filename):
+    # The route before services/storage.py, kept for comparison
+    return send_from_directory(current_app.config["UPLOAD_FOLDER"], filename)
+
+
+def create_app(mode, folder):
+    app = Flask(__name__)
+    app.config["UPLOAD_FOLDER"] = folder
+    if mode == "legacy":
+        app.register_blueprint(legacy_bp)
+    else:
+        app.config["MEDIA_SENDFILE"] = "x-accel-redirect" if mode == "x-accel" else ""
+        app.register_blueprint(file_bp)
+    return app
+
+
+def write_thumbnails(folder, count, size):
+    rng = random.Random(5)
+    urls = []
+    for i in range(count):
+        key = f"properties/{i % 500}/{uuid.UUID(int=rng.getrandbits(128), version=4)}.jpg"
+        path = os.path.join(folder, *key.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(rng.randbytes(size))
+        urls.append("/uploads/" + key)
+    return urls
+
+
+class ClientCache:
+    """The part of an HTTP client cache that decides whether to send a request."""
+
+    def __init__(self):
+        self.entries = {}  # url -> (fresh until, etag)
+
+    def request_headers(self, url, now):
+        """None if the cached copy is fresh, else the headers to send."""
+        entry = self.entries.get(url)
+        if entry is None:
+            return {}
+        fresh_until, etag = entry
+        if now < fresh_until:
+            return None
+        return {"If-None-Match": etag} if etag else {}
+
+    def store(self, url, response, now):
+        cache_control = response.cache_control
+        max_age = 0 if cache_control.no_cache or cache_control.max_age is None else cache_control.max_age
+        previous = self.entries.get(url, (0, None))[1]
+        self.entries[url] = (now + max_age, response.headers.get("ETag") or previous)
+
+
+def run(mode, folder, urls, clients, views, page_size):
+    app = create_app(mode, folder)
+    client = app.test_client()
+    rng = random.Random(11)
+    latencies = []
+    statuses = {}
+    bytes_sent = 0
+
+    started = time.perf_counter()
+    for _ in range(clients):
+        cache = ClientCache()
+        # Each user scrolls the same result page several times (back, refresh, tab switch)
+        page = rng.sample(urls, page_size)
+        for view in range(views):
+            now = view * 60
+            for url in page:
+                headers = cache.request_headers(url, now)
+                if headers is None:
+                    continue
+                request_started = time.perf_counter()
+                response = client.get(url, headers=headers)
+                body = response.get_data()
+                latencies.append(time.perf_counter() - request_started)
+                response.close()
+
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                bytes_sent += len(body)
+                cache.store(url, response, now)
+    elapsed = time.perf_counter() - started
+
+    shown = clients * views * page_size
+    return {
+        "mode": mode,
+        "thumbnails_per_s": shown / elapsed,
+        "requests": len(latencies),
+        "statuses": statuses,
+        "mb_from_python": bytes_sent / 1e6,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--thumbnails", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=30 * 1024, help="bytes per thumbnail")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--views", type=int, default=10, help="page views per client")
+    parser.add_argument("--page-size", type=int, default=20, help="thumbnails per result page")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        urls = write_thumbnails(folder, args.thumbnails, args.size)
+        shown = args.clients * args.views * args.page_size
+        print(f"{args.clients} clients x {args.views} views x {args.page_size} thumbnails "
+              f"= {shown} shown, {args.size // 1024} KB each\n")
+        print(f"{'mode':<10} {'thumbs/s':>10} {'requests':>9} {'200':>6} {'304':>6} "
+              f"{'MB via Python':>14} {'p50 ms':>7} {'p95 ms':>7}")
+        for mode in ("legacy", "immutable", "x-accel"):
+            r = run(mode, folder, urls, args.clients, args.views, args.page_size)
+            print(f"{r['mode']:<10} {r['thumbnails_per_s']:>10.0f} {r['requests']:>9} "
+                  f"{r['statuses'].get(200, 0):>6} {r['statuses'].get(304, 0):>6} "
+                  f"{r['mb_from_python']:>14.1f} {r['p50_ms']:>7.2f} {r['p95_ms']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
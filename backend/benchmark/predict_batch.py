@@ -0,0 +1,119 @@
+"""
+Price prediction benchmark: one predict() per property vs predict_batch().
+
+Seeds residences with random locations and sizes, then times predicting
+all of them one request at a time (the per-property endpoint) and in
+batches of increasing size (the batch endpoint). Both go through the
+service layer, so the timings include the database reads.
+
+The installed model (backend/ai_model/) is used if there is one; with
+--synthetic, or when none is installed, a RandomForest of --trees trees
+is fitted on random data in a temporary model directory.
+
+Example:
+    python benchmark/predict_batch.py --properties 2000 --batch-sizes 1 10 50 500
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bench_app import create_bench_app
+from database import db
+from sqlalchemy import insert
+
+STATES = ["selangor", "kuala lumpur", "johor", "penang", "perak", "sabah"]
+TYPES = ["condominium", "apartment", "terrace house", "flat", "semi-d"]
+
+
+def seed(app, count):
+    from models.user import User
+    from models.property import Property, Residence
+
+    rng = random.Random(13)
+    with app.app_context():
+        owner = User(uid="bench-owner", email="owner@bench", username="owner")
+        db.session.add(owner)
+        db.session.commit()
+
+        properties, residences = [], []
+        for pid in range(1, count + 1):
+            properties.append({"id": pid, "user_id": owner.id, "type": "residence", "status": "listed",
+                               "name": f"Home {pid}", "state": rng.choice(STATES).title()})
+            residences.append({"property_id": pid, "land_size": rng.randint(400, 3000),
+                               "num_bedrooms": rng.randint(1, 5), "num_bathrooms": rng.randint(1, 4),
+                               "residence_type": rng.choice(TYPES).title()})
+        db.session.execute(insert(Property.__table__), properties)
+        db.session.execute(insert(Residence.__table__), residences)
+        db.session.commit()
+
+
+def write_synthetic_model(directory, trees):
+    import json
+    import joblib
+    import numpy as np
+    import pandas as pd
+    from sklearn.ensemble import RandomForestRegressor
+    from services.model_registry import DEFAULT_FEATURES
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.uniform(0, 3000, (5000, len(DEFAULT_FEATURES))), columns=DEFAULT_FEATURES)
+    y = X["size"] * 0.5 + X["state_mean"] + rng.normal(0, 100, len(X))
+    model = RandomForestRegressor(n_estimators=trees, random_state=0, n_jobs=-1).fit(X, y)
+
+    os.makedirs(directory)
+    joblib.dump(model, os.path.join(directory, "price_model.pkl"))
+    with open(os.path.join(directory, "mean_values.txt"), "w", encoding="utf-8") as f:
+        f.write("# GLOBAL MEAN\n1286.88\n# STATE MEANS\n")
+        f.writelines(f"{state}: {800 + 200 * i}\n" for i, state in enumerate(STATES))
+        f.write("# TOWN MEANS\n# DISTRICT MEANS\n# TYPE MEANS\n")
+        f.writelines(f"{type_}: {900 + 150 * i}\n" for i, type_ in enumerate(TYPES))
+    with open(os.path.join(directory, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump({"features": DEFAULT_FEATURES, "trees": trees}, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 50, 500])
+    parser.add_argument("--synthetic", action="store_true", help="use a synthetic model even if one is installed")
+    parser.add_argument("--trees", type=int, default=100)
+    args = parser.parse_args()
+
+    from services import ai_service
+    from services.model_registry import ModelRegistry
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.synthetic or ai_service.registry.active_version() is None:
+            write_synthetic_model(os.path.join(tmp, "models", "synthetic"), args.trees)
+            ai_service.registry = ModelRegistry(os.path.join(tmp, "models"))
+
+        app = create_bench_app(f"sqlite:///{os.path.join(tmp, 'predict.db')}")
+        seed(app, args.properties)
+        ids = list(range(1, args.properties + 1))
+
+        with app.app_context():
+            bundle = ai_service.registry.get()
+            print(f"model {bundle.version}, {args.properties} residences\n")
+            ai_service.predict_batch(ids[:10])  # warm up
+
+            started = time.perf_counter()
+            for pid in ids:
+                ai_service.predict(pid)
+            per_row = time.perf_counter() - started
+            print(f"{'per property':>16} {per_row:8.2f}s  {len(ids) / per_row:10.0f} properties/s")
+
+            for size in args.batch_sizes:
+                started = time.perf_counter()
+                for first in range(0, len(ids), size):
+                    ai_service.predict_batch(ids[first:first + size])
+                elapsed = time.perf_counter() - started
+                print(f"{'batch of ' + str(size):>16} {elapsed:8.2f}s  {len(ids) / elapsed:10.0f} properties/s"
+                      f"  ({per_row / elapsed:.1f}x)")
+
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Text search benchmark: ILIKE scan vs. the full-text index.
+
+Seeds synthetic listed residences (200k by default) and times
+property_service.search_residences for a set of queries, once with
+FULL_TEXT_SEARCH disabled (the old ILIKE path) and once with the index.
+
+Example:
+    python benchmark/search_fts.py --residences 200000 --repeat 20
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bench_app import create_bench_app, percentile
+from database import db
+from sqlalchemy import insert
+
+# Listing vocabulary, most common first; text is drawn with a Zipf-like
+# skew so common words appear in many listings and rare ones in few.
+WORDS = [
+    "near", "unit", "room", "furnished", "condo", "pool", "gym", "parking", "mall", "mrt",
+    "modern", "family", "spacious", "balcony", "studio", "garden", "quiet", "corner",
+    "renovated", "serviced", "seaview", "terrace", "duplex", "penthouse", "bungalow",
+]
+QUERIES = ["pool", "seaview", "penthouse pool", "garden terrace", "furn", "quiet corner duplex"]
+
+
+def vocabulary(rng, size=20000):
+    """WORDS followed by `size` made-up words standing in for names and places."""
+    syllables = ["ba", "ka", "ri", "lu", "ma", "ng", "so", "te", "ya", "jo", "pe", "wi"]
+    made_up = {"".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(size)}
+    return WORDS + sorted(made_up)
+
+
+def words(rng, vocab, count):
+    """Half the words follow a Zipf-like rank distribution, half are uniform."""
+    picked = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            picked.append(vocab[min(int(rng.paretovariate(1.0)) - 1, len(vocab) - 1)])
+        else:
+            picked.append(rng.choice(vocab))
+    return " ".join(picked)
+
+
+def seed(app, count, batch=5000):
+    from models.user import User
+    from models.property import Property, Residence
+
+    rng = random.Random(7)
+    vocab = vocabulary(rng)
+    with app.app_context():
+        owner = User(uid="bench-owner", email="owner@bench", username="owner")
+        db.session.add(owner)
+        db.session.commit()
+
+        next_id = 1
+        while next_id <= count:
+            size = min(batch, count - next_id + 1)
+            properties, residences = [], []
+            for property_id in range(next_id, next_id + size):
+                properties.append({
+                    "id": property_id,
+                    "user_id": owner.id,
+                    "type": "residence",
+                    "status": "listed",
+                    "name": words(rng, vocab, 3),
+                    "title": words(rng, vocab, 6),
+                    "description": words(rng, vocab, 40),
+                    "state": "selangor",
+                    "price": rng.randint(500, 5000),
+                })
+                residences.append({"property_id": property_id, "num_bedrooms": rng.randint(0, 4)})
+
+            db.session.execute(insert(Property.__table__), properties)
+            db.session.execute(insert(Residence.__table__), residences)
+            db.session.commit()
+            next_id += size
+
+
+def run(app, full_text, repeat):
+    from services import property_service
+
+    app.config["FULL_TEXT_SEARCH"] = full_text
+    timings = {}
+    with app.app_context():
+        for query in QUERIES:
+            samples = []
+            total = 0
+            for _ in range(repeat):
+                started = time.perf_counter()
+                _, data = property_service.search_residences(query=query)
+                samples.append(time.perf_counter() - started)
+                total = data["total"]
+            timings[query] = (samples, total)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--residences", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_bench_app(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+
+        print(f"Seeding {args.residences} residences ...")
+        started = time.perf_counter()
+        seed(app, args.residences)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s\n")
+
+        ilike = run(app, full_text=False, repeat=args.repeat)
+        fts = run(app, full_text=True, repeat=args.repeat)
+
+        print(f"{'query':<22}{'ILIKE p50':>12}{'FTS p50':>12}{'speedup':>10}{'ILIKE hits':>12}{'FTS hits':>10}")
+        for query in QUERIES:
+            ilike_p50 = percentile(ilike[query][0], 50)
+            fts_p50 = percentile(fts[query][0], 50)
+            print(
+                f"{query:<22}{ilike_p50 * 1000:>10.1f}ms{fts_p50 * 1000:>10.1f}ms"
+                f"{ilike_p50 / fts_p50:>9.1f}x{ilike[query][1]:>12}{fts[query][1]:>10}"
+            )
+
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
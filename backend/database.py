@@ -1,10 +1,106 @@
+import os
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 
 db = SQLAlchemy()
 
+DEFAULT_DATABASE_URI = "sqlite:///app.db"
+
+# Defaults for every setting read by init_db. Each one can be overridden in
+# app.config before init_db is called, or through an environment variable
+# of the same name (DATABASE_URL for the URI).
+DEFAULT_DB_CONFIG = {
+    # Server databases (PostgreSQL)
+    "DB_POOL_SIZE": 10,
+    "DB_MAX_OVERFLOW": 20,
+    "DB_POOL_TIMEOUT": 30,        # seconds to wait for a free connection
+    "DB_POOL_RECYCLE": 1800,      # seconds before a connection is replaced
+    "DB_POOL_PRE_PING": True,
+
+    # SQLite
+    "SQLITE_JOURNAL_MODE": "WAL",
+    "SQLITE_SYNCHRONOUS": "NORMAL",
+    "SQLITE_BUSY_TIMEOUT_MS": 5000,
+    "SQLITE_MMAP_SIZE": 256 * 1024 * 1024,
+    "SQLITE_CACHE_SIZE_KB": 64 * 1024,
+}
+
+
+def _env_value(name, default):
+    """Read an environment variable, converted to the type of the default."""
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    if isinstance(default, bool):
+        return raw.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(raw)
+    if isinstance(default, float):
+        return float(raw)
+    return raw
+
+
+def _database_uri(app):
+    uri = app.config.get("SQLALCHEMY_DATABASE_URI") or os.environ.get("DATABASE_URL") or DEFAULT_DATABASE_URI
+
+    # Hosted providers still hand out the deprecated "postgres://" scheme
+    if uri.startswith("postgres://"):
+        uri = "postgresql://" + uri[len("postgres://"):]
+    return uri
+
+
+def engine_options(uri, config):
+    """Build the SQLAlchemy engine options for the given database URI."""
+    if uri.startswith("sqlite"):
+        return {
+            "connect_args": {
+                # sqlite3 waits this long on a locked database before raising
+                "timeout": config["SQLITE_BUSY_TIMEOUT_MS"] / 1000,
+                "check_same_thread": False,
+            }
+        }
+
+    return {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+
+
+def _register_sqlite_pragmas(engine, config):
+    """Apply the configured pragmas to every new SQLite connection."""
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # WAL lets readers keep going while a writer commits
+        cursor.execute(f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}")
+        cursor.execute(f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}")
+        cursor.execute(f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}")
+        cursor.execute(f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}")
+        cursor.execute(f"PRAGMA cache_size={-int(config['SQLITE_CACHE_SIZE_KB'])}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
 def init_db(app):
     """ Initialize the database with the given Flask app"""
-    
-    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///app.db"  # SQLite 
-    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False        
-    db.init_app(app)
\ No newline at end of file
+
+    for key, default in DEFAULT_DB_CONFIG.items():
+        app.config.setdefault(key, _env_value(key, default))
+
+    uri = _database_uri(app)
+    app.config["SQLALCHEMY_DATABASE_URI"] = uri
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+
+    options = engine_options(uri, app.config)
+    options.update(app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+    db.init_app(app)
+
+    if uri.startswith("sqlite"):
+        with app.app_context():
+            _register_sqlite_pragmas(db.engine, app.config)
@@ -0,0 +1,373 @@
+"""
+Versioned schema migrations.
+
+Each migration is a function registered with @migration(version, description)
+and receives an open connection inside its own transaction. Applied versions
+are recorded in the schema_migrations table, so upgrade() only runs what is
+pending. Migrations must be idempotent: on a fresh database the baseline
+create_all() already builds the latest schema, and later steps then find
+their tables, columns and indexes in place.
+
+Every web worker calls upgrade() at startup. Each step takes a database
+lock first (a transaction-scoped advisory lock on PostgreSQL, BEGIN
+IMMEDIATE on SQLite) and checks its version again under it, so workers
+starting together apply every step exactly once and the others wait.
+
+Run from the backend directory:
+    python migrations.py            # apply pending migrations
+    python migrations.py --status   # list applied / pending versions
+"""
+import logging
+import time
+from datetime import datetime, timezone
+from flask import current_app, has_app_context
+from sqlalchemy import Table, Column, Integer, String, DateTime, MetaData, inspect, select, insert, update, func, bindparam
+from sqlalchemy.exc import IntegrityError, OperationalError
+from database import db
+import search_index
+
+# Register every model on db.metadata before create_all()
+from models.user import User
+from models.property import Property, PropertyImage, Residence
+from models.message import Message
+from models.channel import Channel
+from models.favourite import Favourite
+from models.request import Request, RequestDocument
+from models.lease import Lease
+from models.tenant_record import TenantRecord
+from models.reported_issue import ReportedIssue, IssueImage
+from models.furniture import Furniture, FurnitureLog
+from models.scheduler_lock import SchedulerLock
+
+# Kept off db.metadata so create_all() never touches it
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+MIGRATIONS = []
+
+# pg_advisory_xact_lock key shared by every process running upgrade()
+MIGRATION_LOCK_ID = 0x6D696772
+# How long a worker waits for another one's migration on SQLite, beyond
+# the connection's busy timeout
+MIGRATION_LOCK_WAIT_SECONDS = 600
+
+
+class MigrationDeferred(Exception):
+    """Raised by a step that cannot run on this database yet; it stays pending."""
+
+
+def migration(version, description):
+    """Register a migration step."""
+    def decorator(fn):
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return decorator
+
+
+# ---- helpers -------------------------------------------------------------
+
+def create_index(conn, model, index_name):
+    """Create one of the indexes declared on a model, if it is missing."""
+    for index in model.__table__.indexes:
+        if index.name == index_name:
+            index.create(conn, checkfirst=True)
+            return
+    raise ValueError(f"{model.__name__} declares no index named {index_name}")
+
+
+def has_column(conn, table_name, column_name):
+    return any(col["name"] == column_name for col in inspect(conn).get_columns(table_name))
+
+
+def add_column(conn, model, column_name):
+    """Add a column declared on a model to an existing table, if it is missing."""
+    table = model.__table__
+    if has_column(conn, table.name, column_name):
+        return
+
+    column = table.c[column_name]
+    column_type = column.type.compile(dialect=conn.dialect)
+    ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+
+    default = column.server_default
+    if default is not None:
+        ddl += f" DEFAULT {default.arg}"
+
+    conn.exec_driver_sql(ddl)
+
+
+# ---- migrations ----------------------------------------------------------
+
+@migration(1, "baseline schema")
+def baseline(conn):
+    db.metadata.create_all(conn)
+
+
+@migration(2, "composite indexes for hot query predicates")
+def hot_path_indexes(conn):
+    create_index(conn, Property, "ix_properties_status_location")
+    create_index(conn, Property, "ix_properties_user_id")
+    create_index(conn, PropertyImage, "ix_property_image_property_id")
+    create_index(conn, Message, "ix_messages_channel_sent_at")
+    create_index(conn, Channel, "ix_channels_tenant_status")
+    create_index(conn, Channel, "ix_channels_property_tenant")
+    create_index(conn, TenantRecord, "ix_tenant_records_lease_status")
+    create_index(conn, Request, "ix_requests_property_status")
+    create_index(conn, Request, "ix_requests_tenant_id")
+    create_index(conn, RequestDocument, "ix_request_documents_request_step")
+    create_index(conn, Lease, "ix_leases_status")
+    create_index(conn, Lease, "ix_leases_property_status")
+    create_index(conn, Lease, "ix_leases_tenant_id")
+    create_index(conn, Favourite, "ix_favourites_property_id")
+    create_index(conn, Furniture, "ix_furnitures_property_id")
+    create_index(conn, FurnitureLog, "ix_furniture_logs_furniture_date")
+    create_index(conn, ReportedIssue, "ix_reported_issues_property_reported")
+    create_index(conn, ReportedIssue, "ix_reported_issues_tenant_reported")
+    create_index(conn, IssueImage, "ix_issue_images_issue_id")
+    create_index(conn, User, "ix_users_uid")
+
+
+@migration(3, "full-text index on property name, title and description")
+def property_full_text_index(conn):
+    if not search_index.install(conn) and conn.dialect.name == "sqlite":
+        # Retried on the next start, so a SQLite build with FTS5 gets the index
+        raise MigrationDeferred("SQLite has no FTS5; searching with ILIKE")
+
+
+@migration(4, "channel last-message summary and unread counters")
+def channel_summary_columns(conn):
+    for column in ("last_message_id", "last_message_at", "last_message_preview",
+                   "last_message_type", "tenant_unread_count", "owner_unread_count"):
+        add_column(conn, Channel, column)
+    create_index(conn, Channel, "ix_channels_tenant_last_message")
+    create_index(conn, Channel, "ix_channels_property_last_message")
+
+    channels = Channel.__table__
+    messages = Message.__table__
+
+    # Backfill from the latest message of each channel; history counts as read
+    latest_id = select(messages.c.id)\
+        .where(messages.c.channel_id == channels.c.id)\
+        .order_by(messages.c.sent_at.desc(), messages.c.id.desc())\
+        .limit(1)\
+        .scalar_subquery()
+    conn.execute(update(channels).where(channels.c.last_message_id.is_(None)).values(last_message_id=latest_id))
+
+    def latest(column):
+        return select(column).where(messages.c.id == channels.c.last_message_id).scalar_subquery()
+
+    conn.execute(
+        update(channels)
+        .where(channels.c.last_message_id.is_not(None), channels.c.last_message_at.is_(None))
+        .values(
+            last_message_at=latest(messages.c.sent_at),
+            last_message_preview=latest(func.substr(messages.c.message_body, 1, 255)),
+            last_message_type=latest(messages.c.type),
+        )
+    )
+
+
+@migration(5, "per-channel message sequence numbers")
+def message_sequence_numbers(conn):
+    add_column(conn, Message, "seq")
+    add_column(conn, Channel, "last_seq")
+
+    messages = Message.__table__
+    channels = Channel.__table__
+
+    # Number existing messages in sent order within each channel
+    rows = conn.execute(
+        select(messages.c.id, messages.c.channel_id)
+        .where(messages.c.seq.is_(None))
+        .order_by(messages.c.channel_id, messages.c.sent_at, messages.c.id)
+    ).all()
+    if rows:
+        last = dict(conn.execute(
+            select(messages.c.channel_id, func.max(messages.c.seq)).group_by(messages.c.channel_id)
+        ).all())
+        numbered = []
+        for message_id, channel_id in rows:
+            last[channel_id] = (last.get(channel_id) or 0) + 1
+            numbered.append({"message_id": message_id, "seq": last[channel_id]})
+        conn.execute(
+            update(messages).where(messages.c.id == bindparam("message_id")).values(seq=bindparam("seq")),
+            numbered,
+        )
+
+    max_seq = select(func.coalesce(func.max(messages.c.seq), 0))\
+        .where(messages.c.channel_id == channels.c.id)\
+        .scalar_subquery()
+    conn.execute(update(channels).values(last_seq=max_seq))
+
+    create_index(conn, Message, "ix_messages_channel_seq")
+
+
+@migration(6, "message id index for keyset paging")
+def message_id_index(conn):
+    create_index(conn, Message, "ix_messages_channel_id")
+
+
+@migration(7, "next event date per lease for the daily scheduler")
+def lease_next_event(conn):
+    add_column(conn, Lease, "next_event_at")
+    create_index(conn, Lease, "ix_leases_status_next_event")
+    # Existing leases keep NULL, so the next run schedules each of them once
+
+
+@migration(8, "scheduler lock table and one tenant record per lease month")
+def scheduler_lock_and_unique_records(conn):
+    SchedulerLock.__table__.create(conn, checkfirst=True)
+
+    records = TenantRecord.__table__
+
+    # Drop duplicate records left by concurrent schedulers, keeping the
+    # most settled one (paid, then overdue, then unpaid) and then the oldest
+    duplicated = select(records.c.lease_id, records.c.month)\
+        .group_by(records.c.lease_id, records.c.month)\
+        .having(func.count() > 1)\
+        .subquery()
+    rows = conn.execute(
+        select(records.c.id, records.c.lease_id, records.c.month, records.c.status)
+        .join(duplicated, (duplicated.c.lease_id == records.c.lease_id) & (duplicated.c.month == records.c.month))
+        .order_by(records.c.lease_id, records.c.month, records.c.id)
+    ).all()
+
+    rank = {"paid": 0, "overdue": 1, "unpaid": 2}
+    groups = {}
+    for row in rows:
+        groups.setdefault((row.lease_id, row.month), []).append(row)
+
+    to_delete = []
+    for group in groups.values():
+        keep = min(group, key=lambda r: (rank.get(r.status, 3), r.id))
+        to_delete.extend(r.id for r in group if r.id != keep.id)
+
+    for i in range(0, len(to_delete), 500):
+        conn.execute(records.delete().where(records.c.id.in_(to_delete[i:i + 500])))
+
+    create_index(conn, TenantRecord, "uq_tenant_records_lease_month")
+
+
+@migration(9, "precomputed suggested price per residence")
+def residence_suggested_price(conn):
+    for column in ("suggested_price", "suggested_price_model_version", "suggested_price_stale"):
+        add_column(conn, Residence, column)
+    create_index(conn, Residence, "ix_residences_suggested_price_stale")
+    create_index(conn, Residence, "ix_residences_suggested_price_version")
+    # Existing rows default to stale, so the first refresh prices all of them
+
+
+@migration(10, "last change time per property and lease for the incremental training export")
+def training_export_marks(conn):
+    # Existing rows count as changed now, so the first export takes all of them
+    now = datetime.now(timezone.utc)
+    for model, index_name in ((Property, "ix_properties_updated_at"), (Lease, "ix_leases_updated_at")):
+        add_column(conn, model, "updated_at")
+        table = model.__table__
+        conn.execute(update(table).where(table.c.updated_at.is_(None)).values(updated_at=now))
+        create_index(conn, model, index_name)
+
+
+# ---- runner --------------------------------------------------------------
+
+def applied_versions(engine):
+    with engine.begin() as conn:
+        _lock(conn)  # workers starting together would both create the table
+        schema_migrations.create(conn, checkfirst=True)
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def _logger():
+    return current_app.logger if has_app_context() else logging.getLogger(__name__)
+
+
+def _lock(conn):
+    """Hold the migration lock until the end of the connection's transaction."""
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(f"SELECT pg_advisory_xact_lock({MIGRATION_LOCK_ID})")
+    elif conn.dialect.name == "sqlite":
+        # Takes the write lock now, before the version check reads anything
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _apply(engine, version, description, fn):
+    """
+    Run one step under the lock. Returns False if another process applied
+    it first, or if the step deferred itself (it is retried next upgrade).
+    """
+    deadline = time.monotonic() + MIGRATION_LOCK_WAIT_SECONDS
+    while True:
+        try:
+            with engine.begin() as conn:
+                _lock(conn)
+                if conn.execute(select(schema_migrations.c.version)
+                                .where(schema_migrations.c.version == version)).first():
+                    return False
+
+                fn(conn)
+                conn.execute(insert(schema_migrations).values(
+                    version=version,
+                    description=description,
+                    applied_at=datetime.now(timezone.utc),
+                ))
+            return True
+        except MigrationDeferred as e:
+            _logger().warning("Migration %s deferred: %s", version, e)
+            return False
+        except IntegrityError:
+            # Databases without a lock above: another process recorded it first
+            return False
+        except OperationalError as e:
+            # SQLite: another worker's step outlasted the busy timeout
+            if "locked" not in str(e) or time.monotonic() > deadline:
+                raise
+
+
+def upgrade(engine=None):
+    """
+    Apply every pending migration in version order.
+    Must be called inside an app context when no engine is given.
+    Returns the list of versions applied by this call.
+    """
+    engine = engine or db.engine
+    done = applied_versions(engine)
+    applied = []
+
+    for version, description, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in done:
+            continue
+
+        if _apply(engine, version, description, fn):
+            applied.append(version)
+            _logger().info("Applied migration %s: %s", version, description)
+
+    return applied
+
+
+if __name__ == "__main__":
+    import argparse
+    from flask import Flask
+    from database import init_db
+
+    parser = argparse.ArgumentParser(description="Apply database migrations.")
+    parser.add_argument("--status", action="store_true", help="list migrations without applying them")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.logger.setLevel(logging.INFO)
+    init_db(app)
+
+    with app.app_context():
+        if args.status:
+            done = applied_versions(db.engine)
+            for version, description, _ in sorted(MIGRATIONS, key=lambda m: m[0]):
+                state = "applied" if version in done else "pending"
+                print(f"{version:>4}  {state:<8} {description}")
+        else:
+            if not upgrade():
+                print("Database is up to date.")
@@ -12,9 +12,31 @@ class Channel(db.Model):
     status = db.Column(db.String(50), nullable=False, default='open')  # e.g., 'open', 'closed'
     type = db.Column(db.String(50), nullable=False, default='query')
 
+    # Denormalized from the latest message, maintained by Message.create_message
+    last_message_id = db.Column(db.Integer, nullable=True)
+    last_message_at = db.Column(db.DateTime, nullable=True)
+    last_message_preview = db.Column(db.String(255), nullable=True)
+    last_message_type = db.Column(db.String(50), nullable=True)
+
+    # Sequence number of the latest message, allocated by record_message
+    last_seq = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    # Messages each participant has not read yet, reset by mark_read
+    tenant_unread_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    owner_unread_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     property = db.relationship("Property", backref=db.backref("channels", lazy=True))
     tenant = db.relationship("User", backref=db.backref("channels", lazy=True))
 
+    __table_args__ = (
+        db.Index("ix_channels_tenant_status", "tenant_id", "status"),
+        # initiate_channel looks up an open channel for a property/tenant pair
+        db.Index("ix_channels_property_tenant", "property_id", "tenant_id", "status", "type"),
+        # Inbox listing, newest conversation first, for each side of a channel
+        db.Index("ix_channels_tenant_last_message", "tenant_id", "last_message_at"),
+        db.Index("ix_channels_property_last_message", "property_id", "last_message_at"),
+    )
+
 
     @classmethod
     def create_channel(cls, property_id, tenant_id, status='open', type='query'):
@@ -29,3 +51,52 @@ class Channel(db.Model):
         db.session.add(channel)
         db.session.commit()
         return channel
+
+    @classmethod
+    def record_message(cls, msg, preview_length=255):
+        """
+        Point the channel at a new message, bump the unread counter of the
+        participant who did not send it and allocate the message's sequence
+        number. Runs as a single UPDATE in the caller's transaction, so
+        concurrent senders cannot lose increments or share a sequence number.
+        Returns the sequence number, or None if the channel does not exist.
+        """
+        sent_by_tenant = cls.tenant_id == msg.sender_id
+        result = db.session.execute(
+            db.update(cls)
+            .where(cls.id == msg.channel_id)
+            .values(
+                last_message_id=msg.id,
+                last_message_at=msg.sent_at,
+                last_message_preview=msg.message_body[:preview_length],
+                last_message_type=msg.type,
+                tenant_unread_count=cls.tenant_unread_count + db.case((sent_by_tenant, 0), else_=1),
+                owner_unread_count=cls.owner_unread_count + db.case((sent_by_tenant, 1), else_=0),
+                last_seq=cls.last_seq + 1,
+            )
+            .returning(cls.last_seq)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar()
+
+    @classmethod
+    def mark_read(cls, channel_id, user_id):
+        """
+        Reset the unread counter of `user_id` on a channel.
+        Returns False if the user is not a participant.
+        """
+        # Request bodies may carry ids as strings
+        user_id = int(user_id)
+        channel = db.session.get(cls, int(channel_id))
+        if not channel:
+            return False
+
+        if channel.tenant_id == user_id:
+            channel.tenant_unread_count = 0
+        elif channel.property and channel.property.user_id == user_id:
+            channel.owner_unread_count = 0
+        else:
+            return False
+
+        db.session.commit()
+        return True
@@ -10,6 +10,7 @@ class Favourite(db.Model):
     # Prevent duplicate favourite for same user + property
     __table_args__ = (
         db.UniqueConstraint('user_id', 'property_id', name='unique_user_property_fav'),
+        db.Index('ix_favourites_property_id', 'property_id'),
     )
 
     @classmethod
@@ -19,6 +19,10 @@ class Furniture(db.Model):
 
     property = db.relationship("Property", backref=db.backref("furnitures", lazy=True, cascade="all, delete-orphan"))
 
+    __table_args__ = (
+        db.Index("ix_furnitures_property_id", "property_id"),
+    )
+
     @classmethod
     def create(cls, property_id, name, status="Good", purchase_price=0.0, image_url=None, note=None):
         item = cls(
@@ -60,6 +64,10 @@ class FurnitureLog(db.Model):
     # Relationship to Furniture
     furniture = db.relationship("Furniture", backref=db.backref("logs", lazy=True, cascade="all, delete-orphan"))
 
+    __table_args__ = (
+        db.Index("ix_furniture_logs_furniture_date", "furniture_id", "date"),
+    )
+
     @classmethod
     def create(cls, furniture_id, description, log_type="Maintenance", image_url=None, date=None):
         if date is None:
@@ -1,3 +1,6 @@
+from datetime import datetime, timezone
+from sqlalchemy import event, inspect
+from sqlalchemy.orm.attributes import flag_modified
 from database import db
 
 class Lease(db.Model):
@@ -30,6 +33,27 @@ class Lease(db.Model):
 
     status = db.Column(db.String(50), default="pending")
 
+    # Earliest day the daily job has work for this lease: next billing
+    # cycle, next due date passing, or the lease end. NULL means unknown,
+    # so the next run recomputes it. Maintained by tenant_record_service.
+    next_event_at = db.Column(db.Date, nullable=True)
+
+    # Last change to the row; the high-water mark of the incremental
+    # training export (services/training_export.py). Writing only
+    # next_event_at leaves it unchanged, see _keep_updated_at
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.Index("ix_leases_status", "status"),
+        db.Index("ix_leases_property_status", "property_id", "status"),
+        db.Index("ix_leases_tenant_id", "tenant_id"),
+        # process_daily_tasks: active leases whose next event has come
+        db.Index("ix_leases_status_next_event", "status", "next_event_at"),
+        # training_export: leases changed since the last export
+        db.Index("ix_leases_updated_at", "updated_at", "id"),
+    )
+
     @classmethod
     def create(cls, *, property_id, tenant_id, start_date, end_date,
            request_id, monthly_rent, deposit_amount=None,
@@ -55,4 +79,17 @@ class Lease(db.Model):
 
     @classmethod
     def find_by_id(cls, lease_id):
-        return cls.query.get(lease_id)
\ No newline at end of file
+        return cls.query.get(lease_id)
+
+# Columns the daily job maintains for itself; none of them is exported
+SCHEDULE_COLUMNS = {"next_event_at"}
+
+
+@event.listens_for(Lease, "before_update")
+def _keep_updated_at(mapper, connection, target):
+    # A flush that only reschedules the lease (a paid record clearing
+    # next_event_at) writes updated_at back unchanged instead of letting
+    # onupdate move it, so the lease is not exported again
+    changed = {attr.key for attr in inspect(target).attrs if attr.history.has_changes()}
+    if changed and changed <= SCHEDULE_COLUMNS:
+        flag_modified(target, "updated_at")
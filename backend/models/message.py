@@ -1,5 +1,6 @@
 from datetime import datetime
 from database import db
+from models.channel import Channel
 
 class Message(db.Model):
     __tablename__ = "messages"
@@ -10,10 +11,20 @@ class Message(db.Model):
     message_body = db.Column(db.Text, nullable=False)
     type = db.Column(db.String(50), nullable=False)
     sent_at = db.Column(db.DateTime, default=datetime.utcnow)  # correct default
+    seq = db.Column(db.Integer, nullable=True)  # 1, 2, 3... within the channel
+
+    __table_args__ = (
+        # Latest-message lookups by time
+        db.Index("ix_messages_channel_sent_at", "channel_id", "sent_at"),
+        # get_messages_by_channel: newest-first pages and before/after id cursors
+        db.Index("ix_messages_channel_id", "channel_id", "id"),
+        # Gap fill after a missed socket event; also guards against duplicate sequence numbers
+        db.Index("ix_messages_channel_seq", "channel_id", "seq", unique=True),
+    )
 
     @classmethod
     def create_message(cls, sender_id, channel_id, message_body, type):
-        """Create and save a new message without receiver_id."""
+        """Create and save a new message without receiver_id and update its channel summary."""
         msg = cls(
             sender_id=sender_id,
             channel_id=channel_id,
@@ -21,16 +32,33 @@ class Message(db.Model):
             type=type
         )
         db.session.add(msg)
+        db.session.flush()
+
+        # Same transaction as the insert: the channel summary never points
+        # at a message that was rolled back
+        msg.seq = Channel.record_message(msg)
         db.session.commit()
         return msg
 
     @classmethod
-    def get_messages_by_channel(cls, channel_id, limit=None, offset=None):
+    def get_messages_by_channel(cls, channel_id, limit=None, offset=None, before_id=None, after_id=None):
         """
-        Retrieve messages for a channel sorted by time DESC.
-        Supports optional limit and offset.
+        Retrieve messages for a channel, newest first.
+        Supports optional limit and offset, or keyset cursors:
+        before_id returns the messages older than that id (newest first),
+        after_id returns the messages newer than that id (oldest first, so
+        a page never skips the messages right after the cursor).
+        Ids increase with insertion, so id order is a stable time order.
         """
-        query = cls.query.filter_by(channel_id=channel_id).order_by(cls.sent_at.desc())
+        query = cls.query.filter_by(channel_id=channel_id)
+
+        if before_id is not None:
+            query = query.filter(cls.id < before_id)
+
+        if after_id is not None:
+            query = query.filter(cls.id > after_id).order_by(cls.id.asc())
+        else:
+            query = query.order_by(cls.id.desc())
 
         if offset is not None:
             query = query.offset(offset)
@@ -39,3 +67,11 @@ class Message(db.Model):
             query = query.limit(limit)
 
         return query.all()
+
+    @classmethod
+    def get_messages_after_seq(cls, channel_id, after_seq, limit):
+        """Messages of a channel with a sequence number above `after_seq`, oldest first."""
+        return cls.query.filter(cls.channel_id == channel_id, cls.seq > after_seq)\
+            .order_by(cls.seq.asc())\
+            .limit(limit)\
+            .all()
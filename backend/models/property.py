@@ -1,5 +1,7 @@
-from sqlalchemy import case
+from datetime import datetime, timezone
+from sqlalchemy import case, event
 from database import db
+from pagination import seek_after
 from typing import Optional
 from sqlalchemy.ext.declarative import declared_attr
 
@@ -26,6 +28,10 @@ class Property(db.Model):
     price = db.Column(db.Float, nullable=True)
     deposit = db.Column(db.Float, nullable=True)
 
+    # Last change to the row (or its residence details); the high-water mark
+    # of the incremental training export (services/training_export.py)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc))
 
     user = db.relationship(
         "User",
@@ -37,6 +43,14 @@ class Property(db.Model):
         "polymorphic_on": type
     }
 
+    __table_args__ = (
+        # find_by_location / search_residences: status first, then location
+        db.Index("ix_properties_status_location", "status", "state", "city", "district"),
+        db.Index("ix_properties_user_id", "user_id"),
+        # training_export: listings changed since the last export
+        db.Index("ix_properties_updated_at", "updated_at", "id"),
+    )
+
     @classmethod
     def create(
         cls,
@@ -87,8 +101,8 @@ class Property(db.Model):
         return cls.query.filter_by(user_id=user_id).all()
 
     @classmethod
-    def find_by_location(cls, state=None, city=None, district=None, page = 1):
-        """Find properties filtered by any combination of state, city, or district."""
+    def listed_in_location(cls, state=None, city=None, district=None):
+        """Query for listed properties filtered by any combination of state, city, or district."""
         query = cls.query.filter_by(status="listed") 
 
         if state:
@@ -98,19 +112,50 @@ class Property(db.Model):
         if district:
             query = query.filter_by(district=district)
 
-        order_case = case(
+        return query
+
+    @classmethod
+    def location_rank(cls, state=None, city=None, district=None):
+        """
+        Sort rank of find_by_location, best match first. A location part
+        that is None compares as IS NULL, so rows missing it rank higher.
+        """
+        return case(
             (cls.district == district, 3),
             (cls.city == city, 2),
             (cls.state == state, 1),
             else_=0
         )
 
-        query = query.order_by(order_case.desc())
+    @classmethod
+    def find_by_location(cls, state=None, city=None, district=None, page = 1):
+        """Find properties filtered by any combination of state, city, or district."""
+        query = cls.listed_in_location(state=state, city=city, district=district)
+
+        order_case = cls.location_rank(state=state, city=city, district=district)
+
+        query = query.order_by(order_case.desc(), cls.id.desc())
         length = query.count()
         offset = (page - 1) * 10 # ten item per page
         query = query.limit(10).offset(offset)
 
         return query.all(), length
+
+    @classmethod
+    def find_by_location_after(cls, state=None, city=None, district=None, after=None, limit=10):
+        """
+        Keyset variant of find_by_location: the next `limit` (property, rank)
+        rows after the (rank, id) key `after`, in find_by_location order.
+        The rank is part of the key because it differs between rows when a
+        location part is None (see location_rank).
+        """
+        query = cls.listed_in_location(state=state, city=city, district=district)
+        rank = cls.location_rank(state=state, city=city, district=district)
+
+        if after is not None:
+            query = query.filter(seek_after([rank, cls.id], after))
+
+        return query.add_columns(rank).order_by(rank.desc(), cls.id.desc()).limit(limit).all()
     
     @classmethod
     def update(cls, property_id: int, **kwargs):
@@ -132,6 +177,15 @@ class Property(db.Model):
         db.session.commit()
         return prop
 
+@event.listens_for(Property, "before_update", propagate=True)
+def _touch_updated_at(mapper, connection, target):
+    # onupdate only fires when the properties row itself is written; a
+    # residence whose bedrooms changed must move past the export mark too
+    session = db.object_session(target)
+    if session is not None and session.is_modified(target, include_collections=False):
+        target.updated_at = datetime.now(timezone.utc)
+
+
 class PropertyImage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     property_id = db.Column(db.Integer, db.ForeignKey("properties.id"), nullable=False)
@@ -142,6 +196,10 @@ class PropertyImage(db.Model):
         backref=db.backref("images", lazy=True, cascade="all, delete-orphan")
     )
 
+    __table_args__ = (
+        db.Index("ix_property_image_property_id", "property_id"),
+    )
+
     @classmethod
     def add_image(cls, property_id, image_url):
         """Add image urls to the property"""
@@ -180,6 +238,17 @@ class Residence(Property):
     land_size = db.Column(db.Float, default = 0)  # sqft
     residence_type = db.Column(db.String(50), nullable=True)
 
+    # Model price kept up to date by the refresh_suggested_prices job
+    # (services/ai_service.py); stale marks rows whose features changed
+    suggested_price = db.Column(db.Float, nullable=True)
+    suggested_price_model_version = db.Column(db.String(50), nullable=True)
+    suggested_price_stale = db.Column(db.Boolean, nullable=False, default=True, server_default=db.true())
+
+    __table_args__ = (
+        # refresh_suggested_prices: rows to recompute
+        db.Index("ix_residences_suggested_price_stale", "suggested_price_stale"),
+        db.Index("ix_residences_suggested_price_version", "suggested_price_model_version"),
+    )
 
 
     @classmethod
@@ -24,6 +24,11 @@ class ReportedIssue(db.Model):
     tenant = db.relationship("User", backref=db.backref("reported_issues", lazy=True))
     images = db.relationship("IssueImage", backref="issue", lazy=True, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        db.Index("ix_reported_issues_property_reported", "property_id", "reported_at"),
+        db.Index("ix_reported_issues_tenant_reported", "tenant_id", "reported_at"),
+    )
+
     @classmethod
     def create(cls, property_id, tenant_id, title, description, priority="medium"):
         issue = cls(
@@ -50,6 +55,10 @@ class IssueImage(db.Model):
     issue_id = db.Column(db.Integer, db.ForeignKey("reported_issues.id"), nullable=False)
     image_url = db.Column(db.String(255), nullable=False)
 
+    __table_args__ = (
+        db.Index("ix_issue_images_issue_id", "issue_id"),
+    )
+
     @classmethod
     def create(cls, issue_id, image_url):
         img = cls(issue_id=issue_id, image_url=image_url)
@@ -30,6 +30,11 @@ class Request(db.Model):
     # Relationship to documents
     documents = db.relationship("RequestDocument", backref="request", lazy=True)
 
+    __table_args__ = (
+        db.Index("ix_requests_property_status", "property_id", "status"),
+        db.Index("ix_requests_tenant_id", "tenant_id"),
+    )
+
     @classmethod
     def create(cls, property_id, tenant_id, start_date, end_date):
         """Create a request record and store in DB."""
@@ -71,6 +76,9 @@ class RequestDocument(db.Model):
 
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
+    __table_args__ = (
+        db.Index("ix_request_documents_request_step", "request_id", "step_number"),
+    )
 
     @classmethod
     def create(cls, request_id, step_number, doc_type, file_url, original_filename, file_format, uploaded_by):
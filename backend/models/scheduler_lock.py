@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from database import db
+
+class SchedulerLock(db.Model):
+    """
+    A named lock held by one process until it expires.
+    The holder renews it on every run (heartbeat); if the holder dies,
+    another process takes it over once expires_at has passed.
+    """
+    __tablename__ = "scheduler_locks"
+
+    name = db.Column(db.String(100), primary_key=True)
+    owner = db.Column(db.String(255), nullable=False)
+    acquired_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    @classmethod
+    def acquire(cls, name, owner, ttl_seconds):
+        """
+        Take or renew the lock for `ttl_seconds`.
+        Returns True if `owner` holds the lock afterwards.
+        """
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=ttl_seconds)
+
+        # Renew our own lock or take over an expired one, in one statement
+        result = db.session.execute(
+            db.update(cls)
+            .where(cls.name == name, db.or_(cls.owner == owner, cls.expires_at < now))
+            .values(
+                owner=owner,
+                acquired_at=db.case((cls.owner == owner, cls.acquired_at), else_=now),
+                expires_at=expires_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            db.session.commit()
+            return True
+
+        # No row yet: the first process to insert it wins
+        try:
+            db.session.add(cls(name=name, owner=owner, acquired_at=now, expires_at=expires_at))
+            db.session.commit()
+            return True
+        except IntegrityError:
+            db.session.rollback()
+            return False
+
+    @classmethod
+    def release(cls, name, owner):
+        """Give up the lock if `owner` holds it."""
+        db.session.execute(
+            db.delete(cls).where(cls.name == name, cls.owner == owner)
+        )
+        db.session.commit()
@@ -16,6 +16,12 @@ class TenantRecord(db.Model):
     amount_paid = db.Column(db.Float, nullable=False, default=0.0)  
     status = db.Column(db.String(50), nullable=False, default="unpaid")  
 
+    __table_args__ = (
+        db.Index("ix_tenant_records_lease_status", "lease_id", "status"),
+        # One billing record per lease and month, even if two schedulers race
+        db.Index("uq_tenant_records_lease_month", "lease_id", "month", unique=True),
+    )
+
     @classmethod
     def create(cls, lease_id, month, start_date, due_date, amount_paid=0.0, paid_at=None, status="unpaid"):
         """
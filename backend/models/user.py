@@ -14,6 +14,10 @@ class User(db.Model):
     address = db.Column(db.String(255), nullable=True)
     profile_pic_url = db.Column(db.String(255), nullable=True)
 
+    __table_args__ = (
+        db.Index("ix_users_uid", "uid"),
+    )
+
     @classmethod
     def create(cls, uid, username, email, role="user"):
         new_user = cls(uid=uid, username=username,email = email, role=role)
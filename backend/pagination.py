@@ -0,0 +1,114 @@
+"""
+Helpers for keyset (cursor) pagination.
+
+A cursor is the sort key of the last row of a page, JSON encoded and then
+base64url encoded so clients treat it as an opaque string. The next page
+seeks past that key instead of using OFFSET, so its cost does not grow
+with the page number.
+"""
+import base64
+import binascii
+import json
+import math
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+COUNT_CACHE_TTL = 60        # seconds a cached total stays valid
+COUNT_CACHE_MAX_ENTRIES = 1024
+
+# What each value of a cursor key may be (see decode_cursor)
+CURSOR_ID = "id"                # a row id
+CURSOR_NUMBER = "number"        # a numeric sort value, such as a relevance score
+CURSOR_TIMESTAMP = "timestamp"  # an ISO 8601 timestamp, decoded to a datetime
+
+_count_cache = {}
+_count_cache_lock = threading.Lock()
+
+
+def encode_cursor(values):
+    """Encode the sort key values of a row into an opaque cursor string."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_value(value, kind):
+    # bool is an int subclass, but never a valid key value
+    if kind == CURSOR_ID:
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    elif kind == CURSOR_NUMBER:
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+            return value
+    elif kind == CURSOR_TIMESTAMP:
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                pass
+    else:
+        raise TypeError(f"Unknown cursor value kind: {kind}")
+    raise ValueError("Invalid cursor")
+
+
+def decode_cursor(cursor, kinds):
+    """
+    Decode a cursor produced by encode_cursor, whose key holds one value of
+    each of `kinds` (CURSOR_ID, CURSOR_NUMBER or CURSOR_TIMESTAMP) in order.
+    Returns None for an empty cursor (first page).
+    Raises ValueError if the cursor is malformed, has the wrong key size or
+    a value of the wrong type.
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != len(kinds):
+        raise ValueError("Invalid cursor")
+    return [_decode_value(value, kind) for value, kind in zip(values, kinds)]
+
+
+def seek_after(columns, values, descending=True):
+    """
+    Filter for rows that come after `values` in an ORDER BY over `columns`.
+    For (a, b) descending this is: a < va OR (a = va AND b < vb).
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        beyond = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, beyond))
+    return or_(*clauses)
+
+
+def cached_count(key, query, ttl=COUNT_CACHE_TTL):
+    """
+    Return query.count(), reusing a result computed for the same key
+    within the last `ttl` seconds.
+    """
+    now = time.monotonic()
+    with _count_cache_lock:
+        entry = _count_cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+
+    total = query.count()
+
+    with _count_cache_lock:
+        if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+            # Drop the entry closest to expiry to make room
+            oldest = min(_count_cache, key=lambda k: _count_cache[k][0])
+            del _count_cache[oldest]
+        _count_cache[key] = (now + ttl, total)
+    return total
+
+
+def clear_count_cache():
+    with _count_cache_lock:
+        _count_cache.clear()
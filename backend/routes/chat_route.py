@@ -31,14 +31,7 @@ def send_image_message():
         return jsonify({
             "success": True,
             "message": message,
-            "data": {
-                "id": msg_obj.id,
-                "sender_id": msg_obj.sender_id,
-                "channel_id": msg_obj.channel_id,
-                "message_body": msg_obj.message_body,
-                "type": msg_obj.type,
-                "sent_at": msg_obj.sent_at.isoformat()
-            }
+            "data": chat_service.serialize_message(msg_obj)
         })
 
     except Exception as e:
@@ -68,14 +61,7 @@ def send_text_message():
     return jsonify({
         "success": True,
         "message": message,
-        "data": {
-            "id": msg_obj.id,
-            "sender_id": msg_obj.sender_id,
-            "channel_id": msg_obj.channel_id,
-            "message_body": msg_obj.message_body,
-            "type": msg_obj.type,
-            "sent_at": msg_obj.sent_at.isoformat()
-        }
+        "data": chat_service.serialize_message(msg_obj)
     }), 200
 
 
@@ -84,6 +70,9 @@ def api_get_messages():
     channel_id = request.args.get("channel_id", type=int)
     limit = request.args.get("limit", type=int)
     offset = request.args.get("offset", type=int)
+    after_seq = request.args.get("after_seq", type=int)
+    before_id = request.args.get("before_id", type=int)
+    after_id = request.args.get("after_id", type=int)
 
     if channel_id is None:
         return jsonify({
@@ -95,23 +84,16 @@ def api_get_messages():
     success, message, messages = chat_service.get_messages(
         channel_id=channel_id,
         limit=limit,
-        offset=offset
+        offset=offset,
+        after_seq=after_seq,
+        before_id=before_id,
+        after_id=after_id
     )
 
     if not success:
         return jsonify({"success": False, "message": message}), 400
 
-    result = [
-        {
-            "id": m.id,
-            "sender_id": m.sender_id,
-            "channel_id": m.channel_id,
-            "message_body": m.message_body,
-            "type": m.type,
-            "sent_at": m.sent_at.isoformat(),
-        }
-        for m in messages
-    ]
+    result = [chat_service.serialize_message(m) for m in messages]
 
     return jsonify({
         "success": True,
@@ -145,13 +127,40 @@ def initiate_channel_route():
     
 @chat_bp.route("/list/<int:user_id>", methods=["GET"])
 def get_user_channels_route(user_id):
-    success, message, channels = chat_service.get_user_channels(user_id)
+    limit = request.args.get("limit", type=int)
+    cursor = request.args.get("cursor")
+
+    success, message, channels, next_cursor = chat_service.get_user_channels(user_id, limit=limit, cursor=cursor)
 
     if success:
-        return jsonify({"success": True, "channels": channels}), 200
+        return jsonify({"success": True, "channels": channels, "next_cursor": next_cursor}), 200
     else:
         return jsonify({"success": False, "message": message}), 400
     
+@chat_bp.route("/read", methods=["POST"])
+def mark_channel_read_route():
+    data = request.get_json()
+
+    channel_id = data.get("channel_id")
+    user_id = data.get("user_id")
+
+    if channel_id is None or user_id is None:
+        return jsonify({"success": False, "message": "Missing channel_id or user_id"}), 400
+    try:
+        channel_id, user_id = int(channel_id), int(user_id)
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "message": "channel_id and user_id must be integers"}), 400
+
+    try:
+        success, message = chat_service.mark_channel_read(channel_id, user_id)
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+    if success:
+        return jsonify({"success": True, "message": message}), 200
+    else:
+        return jsonify({"success": False, "message": message}), 404
+
 @chat_bp.route("/lease/<int:lease_id>", methods=["GET"])
 def get_channel_by_lease_route(lease_id):
     success, message, channel_data = chat_service.get_channel_by_lease_id(lease_id)
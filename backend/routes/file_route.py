@@ -1,18 +1,16 @@
-from flask import Blueprint, send_from_directory, current_app, request 
+from flask import Blueprint, request
+from services.storage import serve
 file_bp = Blueprint("media_bp", __name__, url_prefix="/uploads")
 
 @file_bp.route("/<path:filename>")
 def serve_file(filename):
     """
-    Serve static files.
+    Serve uploaded files from the configured storage (services/storage.py).
     - URL?download=true  -> Forces download (Attachment)
     - URL                -> Displays inline (Preview)
+    With an object store this redirects to it instead of sending the bytes.
     """
     # Check for the query parameter
     should_download = request.args.get('download', 'false').lower() == 'true'
 
-    return send_from_directory(
-        current_app.config["UPLOAD_FOLDER"], 
-        filename, 
-        as_attachment=should_download  # Dynamic switching
-    )
\ No newline at end of file
+    return serve(filename, download=should_download)
@@ -1,5 +1,7 @@
 from flask import Blueprint, json, request, jsonify
-from services.ai_service import predict
+from services.ai_service import (
+    predict, predict_batch, ModelUnavailableError, InferenceBusyError, InferenceTimeoutError, MAX_BATCH_PREDICT
+)
 from services import property_service
 
 property_bp = Blueprint("property_bp", __name__, url_prefix="/property")
@@ -84,11 +86,22 @@ def residences_summaries_route():
     user_id = request.args.get("id", type=int)
     page = request.args.get("page", type=int, default=1)
 
-    summaries, length = property_service.get_residence_summaries(
-        state=state, city=city, district=district, user_id=user_id, page=page
-    )
+    # Cursor mode when a cursor is passed at all (empty for the first page)
+    cursor = request.args.get("cursor")
+    include_total = request.args.get("include_total", "false").lower() == "true"
+
+    try:
+        summaries, length, next_cursor = property_service.get_residence_summaries(
+            state=state, city=city, district=district, user_id=user_id, page=page,
+            cursor=cursor, include_total=include_total
+        )
+    except ValueError as e:
+        return jsonify({"error_message": str(e)}), 400
 
-    return jsonify({"summaries": summaries, "length": length}), 200
+    if cursor is None:
+        return jsonify({"summaries": summaries, "length": length}), 200
+
+    return jsonify({"summaries": summaries, "length": length, "next_cursor": next_cursor}), 200
 
 
 @property_bp.route("/residences/owned", methods=["GET"])
@@ -191,14 +204,51 @@ def delete_gallery_image():
 
 @property_bp.route("/residence/predict/<int:property_id>", methods=["GET"])
 def predict_property(property_id):
-    success, result = predict(property_id)
+    try:
+        success, result = predict(property_id)
+    except ModelUnavailableError as e:
+        return jsonify({"error": str(e)}), 503
+    except InferenceBusyError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+    except InferenceTimeoutError as e:
+        return jsonify({"error": str(e)}), 504
 
     if not success:
         return jsonify({"error": result}), 404
 
     return jsonify({
         "property_id": property_id,
-        "predicted_price": result
+        "predicted_price": result["predicted_price"],
+        "price_band": result["price_band"],
+        "model_version": result["model_version"]
+    }), 200
+
+@property_bp.route("/residence/predict/batch", methods=["POST"])
+def predict_properties_batch():
+    """ Predict prices for many residences at once: {"property_ids": [1, 2, ...]} """
+    data = request.get_json(silent=True) or {}
+    property_ids = data.get("property_ids")
+
+    if (not isinstance(property_ids, list) or not property_ids
+            or not all(isinstance(i, int) and not isinstance(i, bool) for i in property_ids)):
+        return jsonify({"error": "property_ids must be a non-empty list of integers"}), 400
+    if len(property_ids) > MAX_BATCH_PREDICT:
+        return jsonify({"error": f"At most {MAX_BATCH_PREDICT} properties per request"}), 400
+
+    try:
+        _, result = predict_batch(property_ids)
+    except ModelUnavailableError as e:
+        return jsonify({"error": str(e)}), 503
+    except InferenceBusyError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+    except InferenceTimeoutError as e:
+        return jsonify({"error": str(e)}), 504
+
+    return jsonify({
+        "predictions": {str(pid): price for pid, price in result["predictions"].items()},
+        "price_bands": {str(pid): band for pid, band in result["price_bands"].items()},
+        "not_found": result["not_found"],
+        "model_version": result["model_version"]
     }), 200
 
 @property_bp.route("/residence/list", methods=["POST"])
@@ -322,9 +372,11 @@ def search_properties_route():
         min_bathrooms=get_arg("min_bathrooms", int),
         min_size=get_arg("min_size", float),
         max_size=get_arg("max_size", float),
-        page=get_arg("page", int) or 1
+        page=get_arg("page", int) or 1,
+        cursor=request.args.get("cursor"),
+        include_total=request.args.get("include_total", "false").lower() == "true"
     )
 
     if success:
         return jsonify({"success": True, "data": data}), 200
-    return jsonify({"success": False, "message": "Search failed"}), 400
\ No newline at end of file
+    return jsonify({"success": False, "message": data or "Search failed"}), 400
\ No newline at end of file
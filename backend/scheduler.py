@@ -1,23 +1,91 @@
 from flask_apscheduler import APScheduler
 from datetime import datetime
+import os
+import socket
+import uuid
+from database import db
+from models.scheduler_lock import SchedulerLock
 from services.tenant_record_service import process_daily_tasks
+from services.ai_service import refresh_suggested_prices
 
 
 scheduler = APScheduler()
 
+JOB_INTERVAL_SECONDS = 10  # Running every 10s (demo)
+
+# Lease jobs run in one process only. Every web worker starts a scheduler,
+# but a run first takes (or renews) this lock. The lock outlives several
+# intervals, so the holder renews it on its next tick long before it
+# expires and keeps the job; another worker takes over only once the
+# holder missed LOCK_TTL_INTERVALS ticks, e.g. because it died.
+LEASE_JOBS_LOCK = "lease_jobs"
+SUGGESTED_PRICES_LOCK = "suggested_prices"
+SUGGESTED_PRICE_INTERVAL_SECONDS = 60
+LOCK_TTL_INTERVALS = 3
+
+# Unique per process, also across hosts sharing the database
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+def lock_ttl(app, interval):
+    """Lock lifetime for a job run every `interval` seconds (SCHEDULER_LOCK_TTL overrides it)."""
+    return app.config.get("SCHEDULER_LOCK_TTL") or LOCK_TTL_INTERVALS * interval
+
+
+def run_if_leader(app, job, lock_name=LEASE_JOBS_LOCK, interval=JOB_INTERVAL_SECONDS, heartbeat=False):
+    """
+    Run `job` if this process holds (or can take) the lock. Returns True if it ran.
+    With heartbeat=True the job is called as job(heartbeat=renew) for runs
+    that can outlast the lock: renew() extends it and returns False once
+    another process has taken it over.
+    """
+    ttl = lock_ttl(app, interval)
+
+    with app.app_context():
+        try:
+            is_leader = SchedulerLock.acquire(lock_name, WORKER_ID, ttl)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Scheduler lock check failed: {e}")
+            return False
+
+        if not is_leader:
+            return False
+
+        if heartbeat:
+            job(heartbeat=lambda: SchedulerLock.acquire(lock_name, WORKER_ID, ttl))
+        else:
+            job()
+        return True
+
 def start_scheduler(app):
     scheduler.init_app(app)
 
     def daily_check_job():
-        with app.app_context():
-            process_daily_tasks()
+        # Each run only touches leases whose next_event_at has come, so a
+        # short interval costs an index lookup when nothing is due
+        run_if_leader(app, process_daily_tasks)
 
     scheduler.add_job(
         id="daily_lease_check",
         func=daily_check_job,
         trigger="interval",
-        seconds=10  # Running every 10s (demo)
+        seconds=JOB_INTERVAL_SECONDS
+    )
+
+    def suggested_price_job():
+        # Only rows that are stale or priced by an older model are read,
+        # so a run with nothing to do is a few index lookups
+        # A full reprice after a model swap takes many batches; the lock is
+        # renewed between them
+        run_if_leader(app, refresh_suggested_prices, SUGGESTED_PRICES_LOCK,
+                      SUGGESTED_PRICE_INTERVAL_SECONDS, heartbeat=True)
+
+    scheduler.add_job(
+        id="suggested_price_refresh",
+        func=suggested_price_job,
+        trigger="interval",
+        seconds=SUGGESTED_PRICE_INTERVAL_SECONDS
     )
 
     scheduler.start()
-    print("APScheduler started.")
\ No newline at end of file
+    print(f"APScheduler started (worker {WORKER_ID}).")
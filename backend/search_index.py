@@ -0,0 +1,173 @@
+"""
+Full-text index over property name, title and description.
+
+SQLite: an FTS5 external-content table (property_fts) over `properties`.
+PostgreSQL: a generated, weighted tsvector column with a GIN index.
+
+Only listed properties are indexed. On SQLite, triggers on `properties`
+keep the index in sync on every insert, delete and update of the indexed
+columns or the status, so Residence.create_residence, Property.update,
+list_property and unlist_property need no extra calls. On PostgreSQL the
+column is generated and the index is partial on status = 'listed'.
+
+search_residences falls back to ILIKE when the index is not installed or
+FULL_TEXT_SEARCH is disabled in the app config. On a SQLite build without
+FTS5 the migration stays pending and is retried on every start.
+"""
+import logging
+import re
+from flask import current_app
+from sqlalchemy import bindparam, func, literal_column, select, text, inspect
+from sqlalchemy.exc import OperationalError
+from database import db
+
+FTS_TABLE = "property_fts"
+
+logger = logging.getLogger(__name__)
+
+# bm25 column weights: name, title, description
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, title, description,
+        content='properties', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS property_fts_insert AFTER INSERT ON properties
+        WHEN new.status = 'listed' BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, name, title, description)
+            VALUES (new.id, new.name, new.title, new.description);
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS property_fts_delete AFTER DELETE ON properties
+        WHEN old.status = 'listed' BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, title, description)
+            VALUES ('delete', old.id, old.name, old.title, old.description);
+        END""",
+    # One trigger for both steps: separate triggers would fire in an
+    # unspecified order, and inserting the new row before deleting the old
+    # one corrupts an external-content index.
+    f"""CREATE TRIGGER IF NOT EXISTS property_fts_update
+        AFTER UPDATE OF name, title, description, status ON properties BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, title, description)
+            SELECT 'delete', old.id, old.name, old.title, old.description
+            WHERE old.status = 'listed';
+            INSERT INTO {FTS_TABLE}(rowid, name, title, description)
+            SELECT new.id, new.name, new.title, new.description
+            WHERE new.status = 'listed';
+        END""",
+]
+
+_POSTGRES_DDL = [
+    """ALTER TABLE properties ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(title, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+        ) STORED""",
+    """CREATE INDEX IF NOT EXISTS ix_properties_search_vector
+        ON properties USING GIN (search_vector) WHERE status = 'listed'""",
+]
+
+_available = {}
+
+
+def install(conn):
+    """
+    Create the index for the connection's dialect and fill it from existing
+    rows. Returns False if the database cannot hold it.
+    """
+    dialect = conn.dialect.name
+
+    if dialect == "sqlite":
+        try:
+            for ddl in _SQLITE_DDL:
+                conn.exec_driver_sql(ddl)
+        except OperationalError as e:
+            # SQLite built without FTS5: keep the ILIKE search
+            logger.warning("Full-text index not installed: %s", e)
+            return False
+        rebuild(conn)
+        return True
+
+    if dialect == "postgresql":
+        for ddl in _POSTGRES_DDL:
+            conn.exec_driver_sql(ddl)
+        return True
+
+    return False
+
+
+def rebuild(conn):
+    """Re-index every listed property (SQLite; the PostgreSQL column is generated)."""
+    if conn.dialect.name != "sqlite":
+        return
+    conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')")
+    conn.exec_driver_sql(
+        f"INSERT INTO {FTS_TABLE}(rowid, name, title, description) "
+        f"SELECT id, name, title, description FROM properties WHERE status = 'listed'"
+    )
+
+
+def is_available():
+    """True if the index is installed on the current database and enabled in config."""
+    if not current_app.config.get("FULL_TEXT_SEARCH", True):
+        return False
+
+    engine = db.engine
+    if engine not in _available:
+        if engine.dialect.name == "sqlite":
+            with engine.connect() as conn:
+                found = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {"name": FTS_TABLE}
+                ).first()
+            _available[engine] = found is not None
+        elif engine.dialect.name == "postgresql":
+            columns = inspect(engine).get_columns("properties")
+            _available[engine] = any(c["name"] == "search_vector" for c in columns)
+        else:
+            _available[engine] = False
+    return _available[engine]
+
+
+def tokenize(query):
+    """Split user input into lowercase word tokens, dropping FTS syntax characters."""
+    return re.findall(r"\w+", query.lower())
+
+
+def match_subquery(query):
+    """
+    Subquery of (property_id, score) for properties matching every token of
+    `query` as a prefix. Higher score means more relevant.
+    Returns None if the query has no searchable tokens.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+
+    if db.engine.dialect.name == "sqlite":
+        match = " ".join(f'"{token}"*' for token in tokens)
+        fts = literal_column(FTS_TABLE)
+        # bm25() is lower-is-better, negate it so every sort key is descending
+        stmt = select(
+            literal_column("rowid").label("property_id"),
+            (-func.bm25(fts, *BM25_WEIGHTS)).label("score"),
+        ).select_from(text(FTS_TABLE)).where(
+            fts.op("MATCH")(bindparam("fts_query", match))
+        # A LIMIT stops SQLite from flattening the subquery into the join.
+        # Flattened, it drives the join from `properties` and re-runs the
+        # MATCH once per listed row instead of once per query.
+        ).limit(-1)
+        return stmt.subquery("fts_match")
+
+    tsquery = func.to_tsquery("simple", " & ".join(f"{token}:*" for token in tokens))
+    vector = literal_column("properties.search_vector")
+    stmt = select(
+        literal_column("properties.id").label("property_id"),
+        func.ts_rank(vector, tsquery).label("score"),
+    ).select_from(text("properties")).where(
+        vector.op("@@")(tsquery),
+        literal_column("properties.status") == "listed",
+    )
+    return stmt.subquery("fts_match")
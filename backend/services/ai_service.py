@@ -1,96 +1,322 @@
-import joblib
-import os
-import pandas as pd
-from models.property import Property
-
-# Get current file directory (backend/services)
-CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_PATH = os.path.join(CURRENT_DIR, "..", "ai_model", "price_model.pkl")
-MODEL_PATH = os.path.normpath(MODEL_PATH)
-model = joblib.load(MODEL_PATH)
-
-def read_mean_values(filepath):
-    with open(filepath, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-
-    data_sections = {
-        "GLOBAL": 0,
-        "STATE": {},
-        "TOWN": {},
-        "DISTRICT": {},
-        "TYPE": {}
+import numpy as np
+from concurrent.futures import BrokenExecutor
+from sqlalchemy import event, bindparam, union_all
+from database import db, _env_value
+from models.property import Residence
+from services.model_registry import registry, ModelUnavailableError
+from services.encoding_store import normalize_key
+from services.prediction_cache import PredictionCache
+from services.inference_executor import (
+    InferenceExecutor, InferenceBusyError, InferenceTimeoutError, VersionMismatch, run_model,
+    DEFAULT_WORKERS, DEFAULT_MAX_PENDING, DEFAULT_TIMEOUT_SECONDS
+)
+
+MAX_BATCH_PREDICT = 500
+SUGGESTED_PRICE_BATCH_SIZE = 500
+
+# Spread of the individual tree predictions, reported next to the forest
+# mean as a rough price range. It reflects how much the trees disagree,
+# not a calibrated confidence interval.
+PRICE_PERCENTILES = (10, 25, 75, 90)
+
+# Everything a prediction needs, read without loading full Residence objects
+FEATURE_COLUMNS = (
+    Residence.id,
+    Residence.state,
+    Residence.city,
+    Residence.district,
+    Residence.residence_type,
+    Residence.land_size,
+    Residence.num_bedrooms,
+    Residence.num_bathrooms,
+)
+FEATURE_ATTRS = tuple(column.key for column in FEATURE_COLUMNS[1:])
+
+prediction_cache = PredictionCache()
+
+# Worker pool for the model itself; None runs it in the request thread
+inference = None
+
+# Read by start_inference from app.config or an environment variable of the
+# same name; INFERENCE_WORKERS=0 predicts in the request thread
+DEFAULT_INFERENCE_CONFIG = {
+    "INFERENCE_WORKERS": DEFAULT_WORKERS,
+    "INFERENCE_MAX_PENDING": DEFAULT_MAX_PENDING,
+    "INFERENCE_TIMEOUT": DEFAULT_TIMEOUT_SECONDS,
+}
+
+
+def start_inference(app):
+    """
+    Start INFERENCE_WORKERS inference workers (default 2), each loading the
+    model now so the first prediction does not wait for it. With 0, or
+    without fork(), the model runs in the request thread instead. Call it
+    before anything starts threads, see services/inference_executor.py.
+    """
+    global inference
+
+    for key, default in DEFAULT_INFERENCE_CONFIG.items():
+        app.config.setdefault(key, _env_value(key, default))
+    workers = app.config["INFERENCE_WORKERS"]
+    if workers <= 0:
+        return
+    if not InferenceExecutor.supported():
+        print("Inference workers need fork(); predicting in the request thread instead.")
+        return
+
+    executor = InferenceExecutor(
+        registry.root,
+        workers=workers,
+        max_pending=app.config["INFERENCE_MAX_PENDING"],
+        timeout=app.config["INFERENCE_TIMEOUT"],
+    )
+    versions = executor.start()
+    inference = executor
+    print(f"Inference workers started: {versions}")
+
+
+def build_features(prop, encodings):
+    """
+    Feature values for one property (fallback to the global mean for unknown categories).
+    `prop` is a Residence or a row of FEATURE_COLUMNS.
+    """
+    state = normalize_key(prop.state)
+    town = normalize_key(prop.city)
+    district = normalize_key(prop.district)
+    type_ = normalize_key(prop.residence_type)
+
+    return {
+        'size': prop.land_size,
+        'bed': prop.num_bedrooms,
+        'bath': prop.num_bathrooms,
+        'type_mean': encodings.type.get(type_, encodings.global_mean),
+        'town_mean': encodings.town.get(town, encodings.global_mean),
+        'district_mean': encodings.district.get(district, encodings.global_mean),
+        'state_mean': encodings.state.get(state, encodings.global_mean),
     }
 
-    current_section = None
-    for line in lines:
-        line = line.strip()
-
-        if not line:
-            continue
-
-        # Detect section headers
-        if line.startswith("# GLOBAL"):
-            current_section = "GLOBAL"
-        elif line.startswith("# STATE"):
-            current_section = "STATE"
-        elif line.startswith("# TOWN"):
-            current_section = "TOWN"
-        elif line.startswith("# DISTRICT"):
-            current_section = "DISTRICT"
-        elif line.startswith("# TYPE"):
-            current_section = "TYPE"
+
+def feature_values(row, bundle):
+    """Feature values in bundle.features order."""
+    values = build_features(row, bundle.encodings)
+    return [values[name] for name in bundle.features]
+
+
+def feature_matrix(feature_rows):
+    """float64 matrix from rows of feature_values (None -> NaN)."""
+    return np.array(feature_rows, dtype=np.float64)
+
+
+def predict_matrix(bundle, matrix):
+    """
+    Prices and percentile bands (a {"p10": ...} dict per row, None if the
+    model is not a tree ensemble) for a feature matrix, in one model pass.
+    Runs in the inference workers when they are started.
+    Raises InferenceBusyError or InferenceTimeoutError from the workers.
+    """
+    result = None
+    if inference is not None:
+        try:
+            result = inference.predict(bundle.version, matrix, PRICE_PERCENTILES)
+        except VersionMismatch:
+            pass  # workers are on the other side of a model swap; predict here once
+        except BrokenExecutor as e:
+            print(f"Inference workers unavailable, predicting inline: {e}")
+    prices, percentiles = result or run_model(bundle.model, matrix, PRICE_PERCENTILES)
+
+    if percentiles is None:
+        return prices, [None] * len(matrix)
+    names = [f"p{pct}" for pct in PRICE_PERCENTILES]
+    bands = [dict(zip(names, map(float, row))) for row in percentiles]
+    return prices, bands
+
+
+def predict_batch(property_ids):
+    """
+    Predict prices for many residences with one query and one model call.
+    Returns (True, {"predictions": {id: price}, "price_bands": {id: band},
+    "not_found": [ids], "model_version"}).
+    Raises ModelUnavailableError if no price model is installed, and
+    InferenceBusyError or InferenceTimeoutError when the workers are overloaded.
+    """
+    ids = list(dict.fromkeys(property_ids))
+    rows = db.session.execute(
+        db.select(*FEATURE_COLUMNS).where(Residence.id.in_(ids))
+    ).all() if ids else []
+
+    # Hold on to one bundle so model and encodings come from the same version
+    bundle = registry.get()
+
+    predictions, bands = {}, {}
+    misses = []
+    for row in rows:
+        values = feature_values(row, bundle)
+        key = prediction_cache.make_key(bundle.version, values)
+        cached = prediction_cache.get(key, row.id)
+        if cached is None:
+            misses.append((row.id, key, values))
         else:
-            # detect line wiht ":" and current section is not none.
-            if current_section == "GLOBAL":
-                data_sections["GLOBAL"] = float(line)
-            elif ":" in line and current_section:
-                k, v = line.split(":", 1)
-                data_sections[current_section][k.strip()] = float(v.strip())
-
-    return (
-        data_sections["GLOBAL"],
-        data_sections["STATE"],
-        data_sections["TOWN"],
-        data_sections["DISTRICT"],
-        data_sections["TYPE"]
-    )
+            predictions[row.id], bands[row.id] = cached
 
+    if misses:
+        prices, new_bands = predict_matrix(bundle, feature_matrix([values for _, _, values in misses]))
+        for (property_id, key, _), price, band in zip(misses, prices, new_bands):
+            predictions[property_id], bands[property_id] = float(price), band
+            prediction_cache.put(key, (float(price), band), property_id)
+
+    return True, {
+        "predictions": predictions,
+        "price_bands": bands,
+        "not_found": [i for i in ids if i not in predictions],
+        "model_version": bundle.version,
+    }
 
-MEAN_VALUES_PATH = os.path.join(CURRENT_DIR, "..", "ai_model", "mean_values.txt")
-MEAN_VALUES_PATH = os.path.normpath(MEAN_VALUES_PATH)
-global_mean, state_mean, town_mean, district_mean, type_mean = read_mean_values(MEAN_VALUES_PATH)
 
 def predict(property_id):
-    prop = Property.find_by_id(property_id)
+    """
+    Returns (True, {"predicted_price", "price_band", "model_version"}) or (False, message).
+    Raises ModelUnavailableError if no price model is installed.
+    """
+    _, result = predict_batch([property_id])
 
-    if not prop:    
+    if property_id not in result["predictions"]:
         return False, "Property Not Found !"
 
-    state = prop.state.lower() if prop.state else None
-    town = prop.city.lower() if prop.city else None
-    district = prop.district.lower() if prop.district else None
-    type_ = prop.residence_type.lower() if prop.residence_type else None
-    size = prop.land_size
-    bed = prop.num_bedrooms
-    bath = prop.num_bathrooms   
-
-    # Get mean values based on input (fallback to global if not found)
-    state_mean_val = state_mean.get(state, global_mean)
-    town_mean_val = town_mean.get(town, global_mean)
-    district_mean_val = district_mean.get(district, global_mean)
-    type_mean_val = type_mean.get(type_, global_mean)
-
-    # Create a single-row dataframe for prediction
-    df = pd.DataFrame([{
-        'size': size,
-        'bed': bed,
-        'bath': bath,
-        'type_mean': type_mean_val,
-        'town_mean': town_mean_val,
-        'district_mean': district_mean_val,
-        'state_mean': state_mean_val,
-    }])
-
-    predicted_price = model.predict(df)[0]
-    return True, float(predicted_price)
+    return True, {
+        "predicted_price": result["predictions"][property_id],
+        "price_band": result["price_bands"][property_id],
+        "model_version": result["model_version"],
+    }
+
+
+def _suggested_price_candidates(version, limit):
+    """
+    Up to `limit` residence ids whose suggested price needs computing: rows
+    marked stale, and rows priced by another model version. The version
+    test is two range scans (< and >) so both arms stay on an index.
+    """
+    residences = Residence.__table__
+    arms = [
+        db.select(residences.c.property_id).where(residences.c.suggested_price_stale.is_(True)).limit(limit),
+        db.select(residences.c.property_id).where(residences.c.suggested_price_model_version < version).limit(limit),
+        db.select(residences.c.property_id).where(residences.c.suggested_price_model_version > version).limit(limit),
+    ]
+    candidates = union_all(*(arm.subquery().select() for arm in arms)).subquery()
+    ids = db.session.execute(db.select(candidates.c.property_id).distinct().limit(limit)).scalars()
+    return sorted(ids)
+
+
+def _predict_rows(bundle, rows):
+    """
+    Suggested prices for rows of FEATURE_COLUMNS. If the batch fails, each
+    row is predicted alone; a row that still fails gets None, is stored
+    with the current version and so leaves the candidate set until its
+    features or the model change, instead of failing every later run.
+    """
+    try:
+        prices, _ = predict_matrix(bundle, feature_matrix([feature_values(row, bundle) for row in rows]))
+        return [float(price) for price in prices]
+    except (InferenceBusyError, InferenceTimeoutError):
+        raise
+    except Exception as e:
+        print(f"Suggested price batch failed ({e}); pricing its {len(rows)} rows one by one")
+
+    prices, failed = [], []
+    for row in rows:
+        try:
+            price, _ = predict_matrix(bundle, feature_matrix([feature_values(row, bundle)]))
+            prices.append(float(price[0]))
+        except (InferenceBusyError, InferenceTimeoutError):
+            raise
+        except Exception:
+            prices.append(None)
+            failed.append(row.id)
+    if failed:
+        print(f"No suggested price for residences {failed} with model {bundle.version}")
+    return prices
+
+
+def refresh_suggested_prices(batch_size=SUGGESTED_PRICE_BATCH_SIZE, heartbeat=None):
+    """
+    Recompute Residence.suggested_price where it is out of date: rows whose
+    features changed since the last run (and new rows), or every row after
+    the model version changes. Works in batches of `batch_size`, each one
+    query, one model call and one bulk update in its own transaction.
+    Returns the number of residences priced. Scheduled by scheduler.py,
+    which passes `heartbeat`: called before every batch to renew the
+    scheduler lock, the run stops once it returns False.
+    """
+    try:
+        bundle = registry.get()
+    except ModelUnavailableError:
+        return 0
+
+    residences = Residence.__table__
+    write_price = db.update(residences)\
+        .where(residences.c.property_id == bindparam("pid"))\
+        .values(suggested_price=bindparam("price"), suggested_price_model_version=bundle.version)
+
+    priced = 0
+    while True:
+        if heartbeat is not None and not heartbeat():
+            print("Suggested price refresh stopped: scheduler lock taken over")
+            return priced
+
+        ids = _suggested_price_candidates(bundle.version, batch_size)
+        if not ids:
+            return priced
+
+        try:
+            # Clear the flag before reading the features: an edit committed
+            # after this point marks the row stale again for the next run
+            db.session.execute(
+                db.update(residences).where(residences.c.property_id.in_(ids)).values(suggested_price_stale=False)
+            )
+            rows = db.session.execute(db.select(*FEATURE_COLUMNS).where(Residence.id.in_(ids))).all()
+            if rows:
+                prices = _predict_rows(bundle, rows)
+                db.session.execute(
+                    write_price,
+                    [{"pid": row.id, "price": price} for row, price in zip(rows, prices)],
+                )
+            db.session.commit()
+        except (InferenceBusyError, InferenceTimeoutError) as e:
+            db.session.rollback()
+            print(f"Suggested price refresh deferred: {e}")
+            return priced
+        except Exception:
+            db.session.rollback()
+            raise
+
+        priced += len(rows)
+
+
+@event.listens_for(Residence, "before_update")
+def _mark_suggested_price_stale(mapper, connection, target):
+    """Queue a residence whose features changed for the next suggested price refresh."""
+    state = db.inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in FEATURE_ATTRS):
+        target.suggested_price_stale = True
+
+
+@event.listens_for(Residence, "after_update")
+def _invalidate_edited_prediction(mapper, connection, target):
+    """Drop the cached price of a residence whose features changed (Property.update, update_residence)."""
+    state = db.inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in FEATURE_ATTRS):
+        prediction_cache.invalidate_property(target.id)
+
+
+@event.listens_for(Residence, "after_delete")
+def _invalidate_deleted_prediction(mapper, connection, target):
+    prediction_cache.invalidate_property(target.id)
+
+
+def _clear_predictions_on_swap(previous, bundle):
+    # Keys carry the version, but a version directory rewritten in place
+    # keeps its name, and old-version entries can never be hit again
+    if previous is not None:
+        prediction_cache.clear()
+
 
+registry.on_swap(_clear_predictions_on_swap)
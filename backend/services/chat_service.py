@@ -1,11 +1,74 @@
 from datetime import datetime
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
 from models.lease import Lease
 from models.property import Property
 from models.channel import Channel
+from models.user import User
 from services.file_service import upload_file
 from models.message import Message
-import database as db
+from database import db
 from extension import socketio
+from pagination import encode_cursor, decode_cursor, seek_after, CURSOR_ID, CURSOR_TIMESTAMP
+
+MAX_CHANNEL_PAGE = 100
+MAX_GAP_FILL = 200
+MAX_MESSAGE_PAGE = 100
+
+# Socket event pushed to both participants for every new message.
+# Bump CHAT_EVENT_VERSION on any incompatible payload change.
+CHAT_EVENT = "chat_message"
+CHAT_EVENT_VERSION = 1
+
+def serialize_message(msg):
+    return {
+        "id": msg.id,
+        "seq": msg.seq,
+        "sender_id": msg.sender_id,
+        "channel_id": msg.channel_id,
+        "message_body": msg.message_body,
+        "type": msg.type,
+        "sent_at": msg.sent_at.isoformat()
+    }
+
+def broadcast_message(msg):
+    """
+    Push a new message to both participants of its channel, each with their
+    own updated channel summary, so clients can apply it without refetching:
+
+        {"v": 1, "channel_id": ..., "seq": ..., "message": {...}, "channel": {...}}
+
+    `seq` increases by one per message within a channel. A client that sees
+    a jump from its last seq fetches the gap with /chat/messages?after_seq=.
+
+    The legacy refresh_chat event is still sent to the receiver unless
+    CHAT_LEGACY_REFRESH is disabled in the app config.
+    """
+    row = _channel_rows().filter(Channel.id == msg.channel_id).first()
+    if not row:
+        return
+
+    payload = serialize_message(msg)
+    for user_id in {row.tenant_id, row.owner_id}:
+        socketio.emit(CHAT_EVENT, {
+            "v": CHAT_EVENT_VERSION,
+            "channel_id": msg.channel_id,
+            "seq": msg.seq,
+            "message": payload,
+            "channel": _channel_summary(row, user_id),
+        }, room=f"user_{user_id}")
+
+    if current_app.config.get("CHAT_LEGACY_REFRESH", True):
+        receiver_id = row.tenant_id if row.tenant_id != msg.sender_id else row.owner_id
+        socketio.emit('refresh_chat', {'channel_id': msg.channel_id}, room=f"user_{receiver_id}")
+
+def _broadcast_saved(msg):
+    """broadcast_message for a committed message; a failed push is logged, never raised."""
+    try:
+        broadcast_message(msg)
+    except Exception:
+        current_app.logger.exception("Chat push failed for message %s", msg.id)
 
 def create_image_message(sender_id: int, channel_id: int, image_file=None):
     """
@@ -37,23 +100,16 @@ def create_image_message(sender_id: int, channel_id: int, image_file=None):
             type="image"
         )
 
-        channel = Channel.query.filter_by(id=channel_id).first()
-
-        if channel:
-            owner_id = channel.property.user_id
-            receiver_id = channel.tenant_id if channel.tenant_id != sender_id else owner_id
-            
-            if msg:
-                socketio.emit('refresh_chat', {'channel_id': channel_id}, room=f"user_{receiver_id}")
-
-
-
-        return True, "Image message created successfully", msg
-
     except Exception as e:
         db.session.rollback()
         return False, str(e), None
 
+    # The message is saved whether or not the push gets out
+    if msg:
+        _broadcast_saved(msg)
+
+    return True, "Image message created successfully", msg
+
 def create_text_message(sender_id: int, channel_id: int, message_body: str):
     """
     Create a normal text message.
@@ -69,29 +125,36 @@ def create_text_message(sender_id: int, channel_id: int, message_body: str):
             type="text"
         )
 
-        channel = Channel.query.filter_by(id=channel_id).first()
-
-        if channel:
-            owner_id = channel.property.user_id
-            receiver_id = channel.tenant_id if channel.tenant_id != sender_id else owner_id
-            if msg:
-                socketio.emit('refresh_chat', {'channel_id': channel_id}, room=f"user_{receiver_id}")
-
-        return True, "Text message created successfully", msg
-
     except Exception as e:
         db.session.rollback()
         return False, str(e), None
 
-def get_messages(channel_id: int, limit=None, offset=None):
+    # The message is saved whether or not the push gets out
+    if msg:
+        _broadcast_saved(msg)
+
+    return True, "Text message created successfully", msg
+
+def get_messages(channel_id: int, limit=None, offset=None, after_seq=None, before_id=None, after_id=None):
     """
-    Retrieve messages for a specific channel with optional limit and offset.
+    Retrieve messages for a specific channel with optional limit and offset,
+    or before_id / after_id cursors (see Message.get_messages_by_channel).
+    Pages hold at most MAX_MESSAGE_PAGE messages.
+    With after_seq, returns only the messages after that sequence number,
+    oldest first (gap fill after missed socket events).
     """
     try:
+        if after_seq is not None:
+            limit = min(limit or MAX_GAP_FILL, MAX_GAP_FILL)
+            messages = Message.get_messages_after_seq(channel_id, after_seq, limit)
+            return True, "Messages retrieved", messages
+
         messages = Message.get_messages_by_channel(
             channel_id=channel_id,
-            limit=limit,
-            offset=offset
+            limit=min(limit or MAX_MESSAGE_PAGE, MAX_MESSAGE_PAGE),
+            offset=offset,
+            before_id=before_id,
+            after_id=after_id
         )
         return True, "Messages retrieved", messages
     except Exception as e:
@@ -183,71 +246,120 @@ def initiate_channel(property_id, tenant_id, type='query'):
         db.session.rollback()
         return False, str(e), None
 
-def get_user_channels(user_id):
+def _channel_rows():
+    """Channels with a message, joined with their property and both participants."""
+    owner = aliased(User)
+    tenant = aliased(User)
+
+    return db.session.query(
+        Channel.id, Channel.type, Channel.status,
+        Channel.tenant_unread_count, Channel.owner_unread_count, Channel.last_seq,
+        Channel.last_message_preview, Channel.last_message_at, Channel.last_message_type,
+        Property.id.label("property_id"), Property.title, Property.name, Property.thumbnail_url,
+        owner.id.label("owner_id"), owner.username.label("owner_name"),
+        owner.profile_pic_url.label("owner_profile"),
+        tenant.id.label("tenant_id"), tenant.username.label("tenant_name"),
+        tenant.profile_pic_url.label("tenant_profile"),
+    ).join(Property, Property.id == Channel.property_id)\
+     .join(owner, owner.id == Property.user_id)\
+     .join(tenant, tenant.id == Channel.tenant_id)\
+     .filter(Channel.last_message_id.is_not(None))
+
+def _channel_summary(row, user_id):
+    """Inbox entry for a _channel_rows() row as seen by `user_id`."""
+    if row.tenant_id == user_id:
+        my_role, unread_count = "tenant", row.tenant_unread_count
+        other_id, other_name, other_profile = row.owner_id, row.owner_name, row.owner_profile
+    else:
+        my_role, unread_count = "owner", row.owner_unread_count
+        other_id, other_name, other_profile = row.tenant_id, row.tenant_name, row.tenant_profile
+
+    return {
+        "id": row.id,
+        "type": row.type, # 'query' or 'lease'
+        "status": row.status,
+        "my_role": my_role, # 'tenant' or 'owner'
+
+        "property_id": row.property_id,
+        "property_title": row.title if row.title else row.name,
+        "property_image": row.thumbnail_url,
+
+        "other_user_id": other_id,
+        "other_user_name": other_name,
+        "other_user_profile": other_profile,
+
+        "last_message": row.last_message_preview,
+        "last_message_time": row.last_message_at.isoformat() if row.last_message_at else None,
+        "last_message_type": row.last_message_type,
+        "last_seq": row.last_seq,
+        "unread_count": unread_count
+    }
+
+def get_user_channels(user_id, limit=None, cursor=None):
     """
     Get all channels where the user is either the tenant or the owner.
-    Includes the latest message for preview.
+    Includes the latest message for preview and the user's unread count.
+
+    Reads the last-message summary kept on each channel by
+    Message.create_message, so the inbox is a scan of `channels` on
+    (tenant_id | property_id, last_message_at) with the property and both
+    participants joined in. With a limit, next_cursor continues after the
+    last channel returned (None on the last page).
+
+    Returns (success, message, channels, next_cursor).
     """
     try:
-        tenant_channels = Channel.query.filter(
-            Channel.tenant_id == user_id,
-            Channel.status != 'closed'
-        ).all()
+        # Channels the user takes part in, as a union so each side can use
+        # its own index (an OR across channels and properties cannot)
+        member_channel_ids = select(Channel.id).where(Channel.tenant_id == user_id)\
+            .union(
+                select(Channel.id)
+                .join(Property, Property.id == Channel.property_id)
+                .where(Property.user_id == user_id)
+            )
 
-        owner_channels = Channel.query.join(Property).filter(
-            Property.user_id == user_id,
+        query = _channel_rows().filter(
+            Channel.id.in_(member_channel_ids),
             Channel.status != 'closed'
-        ).all()
-
-        all_channels = []
-        
-        def process_channels(channel_list, role):
-            for channel in channel_list:
-
-                last_msg = Message.query.filter_by(channel_id=channel.id)\
-                                        .order_by(Message.sent_at.desc())\
-                                        .first()
-                
-                if not last_msg:
-                    continue
-
-                prop = channel.property
-                
-                if role == "tenant":
-                    counterpart = prop.user
-                else:
-                    counterpart = channel.tenant
+        )
 
-                all_channels.append({
-                    "id": channel.id,
-                    "type": channel.type, # 'query' or 'lease'
-                    "status": channel.status,
-                    "my_role": role, # 'tenant' or 'owner'
-                    
+        key = decode_cursor(cursor, (CURSOR_TIMESTAMP, CURSOR_ID))
+        if key:
+            query = query.filter(seek_after([Channel.last_message_at, Channel.id], key))
 
-                    "property_id": prop.id,
-                    "property_title": prop.title if prop.title else prop.name,
-                    "property_image": prop.thumbnail_url,
+        query = query.order_by(Channel.last_message_at.desc(), Channel.id.desc())
 
-                    "other_user_id": counterpart.id,
-                    "other_user_name": counterpart.username,
-                    "other_user_profile": counterpart.profile_pic_url,
+        if limit is not None:
+            limit = max(1, min(limit, MAX_CHANNEL_PAGE))
+            query = query.limit(limit + 1)
 
-                    "last_message": last_msg.message_body if last_msg else "No messages yet",
-                    "last_message_time": last_msg.sent_at.isoformat() if last_msg else None,
-                    "last_message_type": last_msg.type if last_msg else "text"
-                })
+        rows = query.all()
 
-        process_channels(tenant_channels, "tenant")
-        process_channels(owner_channels, "owner")
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1].last_message_at.isoformat(), rows[-1].id])
 
-        # Sort by latest message time (descending)
-        all_channels.sort(key=lambda x: x['last_message_time'] or "", reverse=True)
+        all_channels = [_channel_summary(row, user_id) for row in rows]
 
-        return True, "Channels retrieved", all_channels
+        return True, "Channels retrieved", all_channels, next_cursor
 
     except Exception as e:
-        return False, str(e), []
+        return False, str(e), [], None
+
+def mark_channel_read(channel_id, user_id):
+    """
+    Reset the user's unread counter on a channel.
+    Returns (False, message) if the user is not a participant; other
+    errors are raised after rolling back.
+    """
+    try:
+        if not Channel.mark_read(channel_id, user_id):
+            return False, "Channel not found for this user"
+        return True, "Channel marked as read"
+    except Exception:
+        db.session.rollback()
+        raise
     
 def get_channel_by_lease_id(lease_id):
     """
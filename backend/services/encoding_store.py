@@ -0,0 +1,115 @@
+"""
+Binary store for the mean target encodings of the price model.
+
+mean_values.txt is parsed into five dicts by every worker. encodings.npz
+holds the same values as one sorted key array and one value array per
+category, so a worker memory-maps it (the pages are shared by all worker
+processes through the page cache) and looks keys up by binary search:
+
+    format              int, ENCODINGS_FORMAT
+    global_mean         float64, used for unknown keys
+    <category>_keys     UTF-8 bytes, sorted ascending, for state/town/district/type
+    <category>_values   float64, the mean price for the key at the same index
+
+Keys are normalized like ai_training/Data Cleaning.py normalizes the
+training data (strip, then lower-case), both when the file is written and
+when it is queried.
+
+Convert an existing mean_values.txt from the backend directory with
+    python -m services.encoding_store <mean_values.txt> <encodings.npz>
+"""
+import numpy as np
+
+from services.forest_engine import _write_aligned_npz, _mapped_members
+
+ENCODINGS_FILE = "encodings.npz"
+ENCODINGS_FORMAT = 1
+CATEGORIES = ("state", "town", "district", "type")
+
+
+def normalize_key(value):
+    """Key as stored in the encodings; None stays None."""
+    if value is None:
+        return None
+    return str(value).strip().lower()
+
+
+class EncodingTable:
+    """Read-only mapping from a normalized key to its mean, by binary search over sorted keys."""
+
+    def __init__(self, keys, values):
+        self.keys = np.asarray(keys)
+        self.values = np.asarray(values)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _index(self, key):
+        key = normalize_key(key)
+        if key is None or not len(self.keys):
+            return None
+        encoded = key.encode("utf-8")
+        i = int(np.searchsorted(self.keys, encoded))
+        if i < len(self.keys) and self.keys[i] == encoded:
+            return i
+        return None
+
+    def __contains__(self, key):
+        return self._index(key) is not None
+
+    def get(self, key, default=None):
+        i = self._index(key)
+        return default if i is None else float(self.values[i])
+
+
+def encoding_arrays(encodings):
+    """The arrays of an encodings.npz from a MeanEncodings of mappings."""
+    arrays = {
+        "format": np.array(ENCODINGS_FORMAT),
+        "global_mean": np.array(encodings.global_mean, dtype=np.float64),
+    }
+    for category in CATEGORIES:
+        means = {normalize_key(k): float(v) for k, v in getattr(encodings, category).items()}
+        keys = sorted(means, key=lambda k: k.encode("utf-8"))
+        arrays[f"{category}_keys"] = np.array([k.encode("utf-8") for k in keys], dtype=bytes) \
+            if keys else np.empty(0, dtype="S1")
+        arrays[f"{category}_values"] = np.array([means[k] for k in keys], dtype=np.float64)
+    return arrays
+
+
+def export_encodings(encodings, path):
+    """Write a MeanEncodings (of dicts or pandas Series) to `path` as encodings.npz."""
+    _write_aligned_npz(path, encoding_arrays(encodings))
+
+
+def load_encodings(path, mmap=True):
+    """MeanEncodings of EncodingTables over an encodings.npz, memory-mapped unless mmap=False."""
+    from services.model_registry import MeanEncodings
+
+    if mmap:
+        arrays = _mapped_members(path)
+    else:
+        with np.load(path) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+
+    if int(arrays["format"]) != ENCODINGS_FORMAT:
+        raise ValueError(f"{path} has encodings format {int(arrays['format'])}, expected {ENCODINGS_FORMAT}")
+
+    return MeanEncodings(
+        float(arrays["global_mean"]),
+        *(EncodingTable(arrays[f"{category}_keys"], arrays[f"{category}_values"]) for category in CATEGORIES)
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+    from services.model_registry import read_mean_values
+
+    parser = argparse.ArgumentParser(description="Convert mean_values.txt to " + ENCODINGS_FILE)
+    parser.add_argument("means", help="mean_values.txt")
+    parser.add_argument("output", help="encodings.npz")
+    args = parser.parse_args()
+
+    encodings = read_mean_values(args.means)
+    export_encodings(encodings, args.output)
+    print(f"Exported {sum(len(getattr(encodings, c)) for c in CATEGORIES)} keys to {args.output}")
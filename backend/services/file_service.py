@@ -1,16 +1,11 @@
-import os
-from flask import current_app
+from services.storage import get_storage, url_for_key
 
 def upload_file(image, folder, filename):
-    folder_path = os.path.join(current_app.config["UPLOAD_FOLDER"], folder)
+    """Store an uploaded file (a werkzeug FileStorage) and return its "/uploads/..." URL."""
+    key = f"{folder}/{filename}"
 
-    if not os.path.exists(folder_path):
-        os.makedirs(folder_path)
+    get_storage().save(image.stream, key, content_type=image.mimetype or None)
 
-    save_path = os.path.join(folder_path, filename)
+    image_url = url_for_key(key)
 
-    image.save(save_path)
-
-    image_url = f"/uploads/{folder}/{filename}"
-
-    return image_url
\ No newline at end of file
+    return image_url
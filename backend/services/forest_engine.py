@@ -0,0 +1,246 @@
+"""
+NumPy inference engine for the RandomForest price model.
+
+export_forest() flattens every tree of a fitted RandomForestRegressor into
+one set of contiguous node arrays and saves them as an uncompressed .npz:
+
+    feature      int32    split feature of each node (0 for leaves)
+    threshold    float32  split threshold, rounded down to float32
+    children     int32    (n_nodes, 2) left and right child index into the
+                          flat arrays; a leaf points at itself
+    is_leaf      bool     whether a node is a leaf
+    missing_left bool     where a NaN feature value goes
+    value        float64  node output (the prediction at a leaf)
+    roots        int32    root node index of each tree
+    max_depth    int32    depth of the deepest tree
+    feature_names str     column order the forest was fitted with
+
+load_forest() memory-maps those arrays straight out of the archive, so
+every worker process shares one read-only copy through the page cache
+instead of holding its own unpickled forest.
+
+Predictions are bit-identical to scikit-learn's: inputs are cast to
+float32 as the trees do, x <= float32-rounded threshold is the same test
+as x <= the float64 threshold for float32 x, and tree outputs are summed
+in estimator order before dividing, as RandomForestRegressor.predict does
+with a single job.
+
+Traversal is vectorized over all (sample, tree) pairs, one tree level
+per step. That is much faster than scikit-learn for request-sized inputs
+(one property up to a few hundred) where its per-call overhead dominates,
+but slower for inputs of thousands of rows; see benchmark/forest_engine.py.
+
+Export a trained model with:
+    python -m services.forest_engine ai_model/<version>/price_model.pkl ai_model/<version>/forest.npz
+"""
+import io
+import struct
+import zipfile
+import numpy as np
+
+FOREST_FILE = "forest.npz"
+ALIGNMENT = 64          # array data starts on a 64-byte boundary in the file
+PADDING_FIELD_ID = 0x7061  # zip extra field used only as padding; readers skip it
+ARRAYS = ("feature", "threshold", "children", "is_leaf", "missing_left", "value", "roots", "max_depth", "feature_names")
+
+
+def _float32_floor(threshold):
+    """Largest float32 <= each float64 threshold."""
+    rounded = threshold.astype(np.float32)
+    too_big = rounded.astype(np.float64) > threshold
+    rounded[too_big] = np.nextafter(rounded[too_big], np.float32(-np.inf))
+    return rounded
+
+
+def flatten_forest(model):
+    """Node arrays (see module docstring) for a fitted RandomForestRegressor."""
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output forests can be flattened")
+
+    features, thresholds, children, leaves, missing, values, roots = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        index = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+
+        roots.append(offset)
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        children.append(np.stack([np.where(is_leaf, index, tree.children_left),
+                                  np.where(is_leaf, index, tree.children_right)], axis=1) + offset)
+        leaves.append(is_leaf)
+        missing.append(tree.missing_go_to_left.astype(bool))
+        values.append(tree.value[:, 0, 0])
+
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    names = getattr(model, "feature_names_in_", None)
+    return {
+        "feature": np.concatenate(features).astype(np.int32),
+        "threshold": _float32_floor(np.concatenate(thresholds)),
+        "children": np.concatenate(children).astype(np.int32),
+        "is_leaf": np.concatenate(leaves),
+        "missing_left": np.concatenate(missing),
+        "value": np.concatenate(values).astype(np.float64),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "max_depth": np.asarray(max_depth, dtype=np.int32),
+        "feature_names": np.asarray([] if names is None else list(names), dtype=str),
+    }
+
+
+def _write_aligned_npz(path, arrays):
+    """
+    Like np.savez, but pads each member's zip header so the array data is
+    aligned; traversal over unaligned mapped arrays is many times slower.
+    The result is an ordinary .npz that np.load reads as usual.
+    """
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, array in arrays.items():
+            buffer = io.BytesIO()
+            np.lib.format.write_array(buffer, np.asanyarray(array), allow_pickle=False)
+
+            info = zipfile.ZipInfo(name + ".npy", date_time=(1980, 1, 1, 0, 0, 0))
+            # Local header is 30 bytes + file name + extra field; the .npy
+            # header after it is already a multiple of 64 bytes long
+            header_end = archive.fp.tell() + 30 + len(info.filename.encode())
+            padding = -header_end % ALIGNMENT
+            if 0 < padding < 4:
+                padding += ALIGNMENT  # an extra field needs at least its 4-byte header
+            if padding:
+                info.extra = struct.pack("<HH", PADDING_FIELD_ID, padding - 4) + bytes(padding - 4)
+
+            archive.writestr(info, buffer.getvalue())
+
+
+def export_forest(model, path):
+    """Save a fitted RandomForestRegressor as an uncompressed, memory-mappable .npz."""
+    _write_aligned_npz(path, flatten_forest(model))
+
+
+def _mapped_members(path):
+    """Memory-map each .npy member of an uncompressed .npz archive."""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path} is compressed; save it with np.savez, not np.savez_compressed")
+
+            # The data follows the local file header, whose name/extra fields
+            # can differ from the central directory entry
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(f.read(4), dtype="<u2")
+            f.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+
+            major, _ = np.lib.format.read_magic(f)
+            read_header = np.lib.format.read_array_header_1_0 if major == 1 else np.lib.format.read_array_header_2_0
+            shape, fortran_order, dtype = read_header(f)
+            name = info.filename[:-len(".npy")]
+            if shape == () or 0 in shape:
+                # Nothing worth mapping (and mmap refuses empty ranges)
+                arrays[name] = np.lib.format.read_array(archive.open(info))
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                         order="F" if fortran_order else "C")
+    return arrays
+
+
+class ForestEngine:
+    """Drop-in replacement for RandomForestRegressor.predict over flattened node arrays."""
+
+    def __init__(self, arrays):
+        # Plain ndarray views: they still read the mapped pages, but skip the
+        # np.memmap subclass overhead on every take() during traversal
+        self.feature = np.asarray(arrays["feature"])
+        self.threshold = np.asarray(arrays["threshold"])
+        # Flat view: children of node i at 2*i (left) and 2*i + 1 (right)
+        self.children = np.asarray(arrays["children"]).reshape(-1)
+        self.is_leaf = np.asarray(arrays["is_leaf"])
+        self.missing_left = np.asarray(arrays["missing_left"])
+        self.value = np.asarray(arrays["value"])
+        self.roots = np.asarray(arrays["roots"])
+        self.max_depth = int(arrays["max_depth"])
+        names = np.asarray(arrays["feature_names"])
+        self.feature_names_in_ = names.tolist() if names.size else None
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def leaves(self, X):
+        """(n_samples, n_trees) leaf node index each sample reaches in each tree."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2:
+            raise ValueError("X must be a 2D array")
+        n_samples, n_features = X.shape
+        n_trees = len(self.roots)
+
+        # One (sample, tree) pair per entry, sample-major; pairs leave the
+        # working set once they reach a leaf, so later levels touch fewer nodes
+        flat_X = X.reshape(-1)
+        has_nan = np.isnan(flat_X).any()
+        nodes = np.tile(self.roots, n_samples)
+        row_start = np.repeat(np.arange(n_samples, dtype=np.intp) * n_features, n_trees)
+        pair = np.arange(n_samples * n_trees, dtype=np.intp)
+        result = nodes.copy()  # single-node trees are done before the first step
+
+        for _ in range(self.max_depth):
+            x = flat_X.take(row_start + self.feature.take(nodes))
+            go_right = x > self.threshold.take(nodes)
+            if has_nan:
+                go_right = np.where(np.isnan(x), ~self.missing_left.take(nodes), go_right)
+            nodes = self.children.take(2 * nodes + go_right)
+
+            done = self.is_leaf.take(nodes)
+            if done.any():
+                result[pair[done]] = nodes[done]
+                active = ~done
+                nodes, row_start, pair = nodes[active], row_start[active], pair[active]
+                if nodes.size == 0:
+                    break
+
+        return result.reshape(n_samples, n_trees)
+
+    def tree_predictions(self, X):
+        """(n_samples, n_trees) output of every tree."""
+        return self.value[self.leaves(X)]
+
+    def _average(self, per_tree):
+        # cumsum adds left to right, the order the estimators are summed in
+        # scikit-learn; np.sum's pairwise summation can differ in the last bit
+        return np.cumsum(per_tree, axis=1)[:, -1] / self.n_estimators
+
+    def predict(self, X):
+        return self._average(self.tree_predictions(X))
+
+    def predict_with_percentiles(self, X, percentiles):
+        """
+        Forest prediction plus percentiles of the individual tree outputs,
+        as (predictions, (n_samples, len(percentiles)) array), from one traversal.
+        """
+        per_tree = self.tree_predictions(X)
+        return self._average(per_tree), np.percentile(per_tree, percentiles, axis=1).T
+
+
+def load_forest(path, mmap=True):
+    """ForestEngine over an exported .npz, memory-mapped unless mmap=False."""
+    if mmap:
+        return ForestEngine(_mapped_members(path))
+    with np.load(path) as archive:
+        return ForestEngine({name: archive[name] for name in ARRAYS})
+
+
+if __name__ == "__main__":
+    import argparse
+    import joblib
+
+    parser = argparse.ArgumentParser(description="Export a pickled RandomForestRegressor to " + FOREST_FILE)
+    parser.add_argument("model", help="price_model.pkl")
+    parser.add_argument("output", help="forest.npz")
+    args = parser.parse_args()
+
+    forest = joblib.load(args.model)
+    export_forest(forest, args.output)
+    print(f"Exported {len(forest.estimators_)} trees to {args.output}")
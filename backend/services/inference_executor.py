@@ -0,0 +1,160 @@
+"""
+Runs price model inference in a pool of worker processes.
+
+A forest predict is CPU-bound and holds the GIL. Run inline under an
+eventlet/gevent Socket.IO server it stalls the whole event loop: chat
+events and every other request wait for it. Here the parent only builds
+the feature matrix; the tree traversal runs in a worker process, and the
+request waits cooperatively (socketio.sleep) so the loop keeps serving.
+
+Each worker loads the model through its own ModelRegistry when it starts
+(an exported forest.npz is memory-mapped, so workers share one copy) and
+picks up new versions the same way the web process does.
+
+Workers are forked, so start() must run before the web process starts
+any threads (scheduler, socket server): a child forked later could
+inherit a lock held by one of them. Spawned workers would instead
+re-import app.py as their main module, with all its side effects. On
+platforms without fork, inference stays inline.
+
+Backpressure: at most `max_pending` predictions are queued or running.
+Beyond that, predict() raises InferenceBusyError at once instead of
+growing the queue; a caller waiting longer than `timeout` seconds gets
+InferenceTimeoutError. Its slot is only freed once the worker is done,
+so a stuck pool keeps refusing new work rather than piling it up.
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from extension import socketio
+from services.model_registry import ModelRegistry
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 32
+DEFAULT_TIMEOUT_SECONDS = 5.0
+POLL_INTERVAL = 0.002  # seconds between cooperative checks for a result
+
+COOPERATIVE_MODES = ("eventlet", "gevent", "gevent_uwsgi")
+
+
+class InferenceBusyError(RuntimeError):
+    """Too many predictions are already queued."""
+
+
+class InferenceTimeoutError(RuntimeError):
+    """A prediction did not finish in time."""
+
+
+class VersionMismatch(Exception):
+    """The worker serves another model version than the parent built features for."""
+
+
+# ---- worker process side ----------------------------------------------------
+
+_worker_registry = None
+
+
+def _init_worker(model_root):
+    global _worker_registry
+    _worker_registry = ModelRegistry(model_root)
+
+
+def _warm_up():
+    """Load the model now rather than on the first request."""
+    try:
+        return _worker_registry.get().version
+    except Exception as e:
+        return f"no model: {e}"
+
+
+def run_model(model, matrix, percentiles):
+    """(prices, percentiles of the tree outputs or None if the model has no trees)."""
+    if hasattr(model, "predict_with_percentiles"):
+        return model.predict_with_percentiles(matrix, percentiles)
+    return model.predict(matrix), None
+
+
+def _worker_predict(version, matrix, percentiles):
+    bundle = _worker_registry.get()
+    if bundle.version != version:
+        raise VersionMismatch(bundle.version)
+    return run_model(bundle.model, matrix, percentiles)
+
+
+# ---- web process side -------------------------------------------------------
+
+class InferenceExecutor:
+
+    def __init__(self, model_root, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                 timeout=DEFAULT_TIMEOUT_SECONDS):
+        self.model_root = model_root
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    @staticmethod
+    def supported():
+        return "fork" in multiprocessing.get_all_start_methods()
+
+    def start(self):
+        """Fork the workers and load the model in each; returns the versions they loaded."""
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_worker,
+            initargs=(self.model_root,),
+        )
+        warm = [self._pool.submit(_warm_up) for _ in range(self.workers)]
+        return [future.result() for future in warm]
+
+    @property
+    def running(self):
+        return self._pool is not None
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _wait(self, future, timeout):
+        # async_mode is only set once socketio.init_app has run
+        if getattr(socketio, "async_mode", None) not in COOPERATIVE_MODES:
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                raise InferenceTimeoutError(f"Prediction took longer than {timeout}s") from None
+
+        # A blocking result() would stall the event loop; yield to it instead
+        deadline = time.monotonic() + timeout
+        while not future.done():
+            if time.monotonic() >= deadline:
+                raise InferenceTimeoutError(f"Prediction took longer than {timeout}s")
+            socketio.sleep(POLL_INTERVAL)
+        return future.result()
+
+    def predict(self, version, matrix, percentiles):
+        """
+        (prices, percentile array or None) for `matrix` from model `version`.
+        Raises InferenceBusyError, InferenceTimeoutError, or VersionMismatch
+        while workers and web process are on different sides of a model swap.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise InferenceBusyError(f"{self.max_pending} predictions already pending")
+
+        try:
+            future = self._pool.submit(_worker_predict, version, matrix, percentiles)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return self._wait(future, self.timeout)
+        except InferenceTimeoutError:
+            future.cancel()  # only succeeds if it has not started yet
+            raise
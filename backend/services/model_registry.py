@@ -0,0 +1,311 @@
+"""
+Registry for the rental price model.
+
+Models live under ai_model/ (or $AI_MODEL_DIR), one directory per version:
+
+    ai_model/
+        CURRENT                 optional, names the active version
+        2025-01-05/
+            price_model.pkl     or forest.npz (see forest_engine), preferred
+            mean_values.txt     or encodings.npz (see encoding_store), preferred
+            metadata.json       written last; marks the version as complete
+        2025-03-02/
+            ...
+
+The active version is the one named in CURRENT, otherwise the newest
+(by name) complete version directory. The original flat layout, with
+price_model.pkl and mean_values.txt directly in ai_model/, is still
+loaded as version "legacy" when there is no version directory.
+
+Nothing is loaded at import time. The first get() loads the active
+version; later calls check every CHECK_INTERVAL seconds whether another
+version became active (new directory, CURRENT changed). The new version
+is loaded by one caller while the others keep serving the old one, then
+swapped in with a single assignment. Requests that already hold the old
+bundle finish with it.
+
+Publishing a new version without a restart: copy the directory in place
+with metadata.json written last, or write CURRENT via a temp file and
+os.replace(). Never overwrite a forest.npz in place: it is memory-mapped
+by every worker that loaded it.
+"""
+import json
+import os
+import threading
+import time
+from typing import NamedTuple
+from services.forest_engine import FOREST_FILE
+from services.encoding_store import ENCODINGS_FILE, load_encodings, normalize_key
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL_ROOT = os.path.normpath(os.path.join(CURRENT_DIR, "..", "ai_model"))
+
+MODEL_FILE = "price_model.pkl"
+MEAN_VALUES_FILE = "mean_values.txt"
+METADATA_FILE = "metadata.json"
+CURRENT_FILE = "CURRENT"
+LEGACY_VERSION = "legacy"
+
+# Feature order the model was trained with (ai_training/Model Training.py)
+DEFAULT_FEATURES = ['size', 'bed', 'bath', 'type_mean', 'town_mean', 'district_mean', 'state_mean']
+
+CHECK_INTERVAL = 5.0  # seconds between checks for a new version
+
+
+class ModelUnavailableError(RuntimeError):
+    """No usable model version was found."""
+
+
+class MeanEncodings(NamedTuple):
+    # Each category maps a normalized key to its mean: a dict when read
+    # from mean_values.txt, an EncodingTable when mapped from encodings.npz
+    global_mean: float
+    state: dict
+    town: dict
+    district: dict
+    type: dict
+
+
+class ModelBundle(NamedTuple):
+    version: str
+    path: str
+    model: object
+    encodings: MeanEncodings
+    features: list
+    metadata: dict
+
+
+def read_mean_values(filepath):
+    with open(filepath, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+
+    data_sections = {
+        "GLOBAL": 0,
+        "STATE": {},
+        "TOWN": {},
+        "DISTRICT": {},
+        "TYPE": {}
+    }
+
+    current_section = None
+    for line in lines:
+        line = line.strip()
+
+        if not line:
+            continue
+
+        # Detect section headers
+        if line.startswith("# GLOBAL"):
+            current_section = "GLOBAL"
+        elif line.startswith("# STATE"):
+            current_section = "STATE"
+        elif line.startswith("# TOWN"):
+            current_section = "TOWN"
+        elif line.startswith("# DISTRICT"):
+            current_section = "DISTRICT"
+        elif line.startswith("# TYPE"):
+            current_section = "TYPE"
+        else:
+            # detect line wiht ":" and current section is not none.
+            if current_section == "GLOBAL":
+                data_sections["GLOBAL"] = float(line)
+            elif ":" in line and current_section:
+                k, v = line.split(":", 1)
+                data_sections[current_section][normalize_key(k)] = float(v.strip())
+
+    return MeanEncodings(
+        data_sections["GLOBAL"],
+        data_sections["STATE"],
+        data_sections["TOWN"],
+        data_sections["DISTRICT"],
+        data_sections["TYPE"]
+    )
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+class ModelRegistry:
+    """Loads the active model version on first use and swaps in new versions."""
+
+    def __init__(self, root=None, check_interval=CHECK_INTERVAL):
+        self.root = root or os.environ.get("AI_MODEL_DIR") or DEFAULT_MODEL_ROOT
+        self.check_interval = check_interval
+
+        self._bundle = None
+        self._stamp = None
+        self._checked_at = 0.0
+        self._load_lock = threading.Lock()
+        self._listeners = []
+
+    # ---- version discovery ------------------------------------------------
+
+    def _has_model(self, path):
+        return any(os.path.isfile(os.path.join(path, name)) for name in (FOREST_FILE, MODEL_FILE))
+
+    def _has_encodings(self, path):
+        return any(os.path.isfile(os.path.join(path, name)) for name in (ENCODINGS_FILE, MEAN_VALUES_FILE))
+
+    def _is_complete(self, path):
+        return self._has_model(path) and self._has_encodings(path) \
+            and os.path.isfile(os.path.join(path, METADATA_FILE))
+
+    def versions(self):
+        """Complete version directories, oldest first."""
+        try:
+            entries = sorted(os.listdir(self.root))
+        except FileNotFoundError:
+            return []
+        return [name for name in entries if self._is_complete(os.path.join(self.root, name))]
+
+    def _resolve(self):
+        """
+        (version, path, stamp) of the active version, or None.
+        The stamp changes whenever the active version's files are replaced.
+        """
+        current_path = os.path.join(self.root, CURRENT_FILE)
+        if os.path.isfile(current_path):
+            with open(current_path, "r", encoding="utf-8") as f:
+                version = f.read().strip()
+            path = os.path.join(self.root, version)
+            if version and self._is_complete(path):
+                return version, path, (version, _mtime(os.path.join(path, METADATA_FILE)))
+
+        versions = self.versions()
+        if versions:
+            version = versions[-1]
+            path = os.path.join(self.root, version)
+            return version, path, (version, _mtime(os.path.join(path, METADATA_FILE)))
+
+        if self._has_model(self.root) and self._has_encodings(self.root):
+            return LEGACY_VERSION, self.root, (LEGACY_VERSION, *(
+                _mtime(os.path.join(self.root, name))
+                for name in (FOREST_FILE, MODEL_FILE, ENCODINGS_FILE, MEAN_VALUES_FILE)
+            ))
+
+        return None
+
+    def active_version(self):
+        """Name of the version get() would serve, without loading it."""
+        resolved = self._resolve()
+        return resolved[0] if resolved else None
+
+    # ---- loading ----------------------------------------------------------
+
+    def _load_model(self, path):
+        """
+        The exported forest (memory-mapped, shared by all workers) if there is
+        one, else the pickle. A pickled random forest is flattened into a
+        ForestEngine in memory, so every forest offers per-tree outputs.
+        """
+        from services.forest_engine import ForestEngine, flatten_forest, load_forest
+
+        forest_path = os.path.join(path, FOREST_FILE)
+        if os.path.isfile(forest_path):
+            return load_forest(forest_path)
+
+        import joblib
+        model = joblib.load(os.path.join(path, MODEL_FILE))
+
+        from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+        if isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)) and model.n_outputs_ == 1:
+            return ForestEngine(flatten_forest(model))
+        return model
+
+    def _load_encodings(self, path):
+        """The memory-mapped encodings.npz if there is one, else mean_values.txt."""
+        encodings_path = os.path.join(path, ENCODINGS_FILE)
+        if os.path.isfile(encodings_path):
+            return load_encodings(encodings_path)
+        return read_mean_values(os.path.join(path, MEAN_VALUES_FILE))
+
+    def _load(self, version, path):
+        metadata = {}
+        metadata_path = os.path.join(path, METADATA_FILE)
+        if os.path.isfile(metadata_path):
+            with open(metadata_path, "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+
+        model = self._load_model(path)
+
+        # Feature matrices are built in this column order. A model fitted on
+        # a DataFrame knows its own order, which wins over the metadata; the
+        # names are then dropped so the model takes a plain NumPy matrix
+        # without warning about missing column names.
+        features = getattr(model, "feature_names_in_", None)
+        if features is not None:
+            features = list(features)
+            del model.feature_names_in_
+        else:
+            features = metadata.get("features", DEFAULT_FEATURES)
+
+        return ModelBundle(
+            version=version,
+            path=path,
+            model=model,
+            encodings=self._load_encodings(path),
+            features=features,
+            metadata=metadata,
+        )
+
+    def get(self):
+        """
+        The active ModelBundle, loading or swapping versions as needed.
+        Raises ModelUnavailableError if there is no model to load.
+        """
+        bundle = self._bundle
+        now = time.monotonic()
+        if bundle is not None and now - self._checked_at < self.check_interval:
+            return bundle
+
+        resolved = self._resolve()
+        self._checked_at = now
+
+        if resolved is None:
+            if bundle is not None:
+                return bundle  # files removed; keep serving what is loaded
+            raise ModelUnavailableError(f"No price model found in {self.root}")
+
+        version, path, stamp = resolved
+        if bundle is not None and stamp == self._stamp:
+            return bundle
+
+        with self._load_lock:
+            # Another thread may have loaded it while we waited
+            if self._bundle is not None and stamp == self._stamp:
+                return self._bundle
+
+            try:
+                new_bundle = self._load(version, path)
+            except Exception as e:
+                if self._bundle is not None:
+                    print(f"Failed to load price model {version}, keeping {self._bundle.version}: {e}")
+                    return self._bundle
+                raise ModelUnavailableError(f"Failed to load price model {version}: {e}") from e
+
+            previous = self._bundle
+            self._bundle, self._stamp = new_bundle, stamp
+
+        if previous is not None:
+            print(f"Price model switched from {previous.version} to {new_bundle.version}")
+        for listener in list(self._listeners):
+            listener(previous, new_bundle)
+        return new_bundle
+
+    def on_swap(self, listener):
+        """Call listener(previous_bundle, new_bundle) after a version is loaded."""
+        self._listeners.append(listener)
+
+    def reset(self):
+        """Forget the loaded model; the next get() loads again."""
+        with self._load_lock:
+            self._bundle = None
+            self._stamp = None
+            self._checked_at = 0.0
+
+
+registry = ModelRegistry()
@@ -0,0 +1,97 @@
+"""
+In-process LRU/TTL cache of predicted prices (with their price bands).
+
+A prediction depends only on the model version and the property's feature
+values, so entries are keyed on (model_version, feature tuple): properties
+with the same features share an entry, and an edited property simply gets
+a new key. Entries that can no longer be hit are dropped early: the old
+entry of a property whose features were edited (see ai_service), and
+everything when the registry swaps in another model version.
+
+Each worker process has its own cache; entries expire after `ttl` seconds
+regardless, which bounds staleness from edits made through another worker.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_TTL_SECONDS = 3600
+
+
+class PredictionCache:
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries = OrderedDict()   # key -> (value, expires_at), least recently used first
+        self._property_keys = {}        # property id -> key it was last predicted under
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(model_version, features):
+        """Hashable key from feature values (missing values as None)."""
+        return (model_version, tuple(None if v is None else float(v) for v in features))
+
+    def get(self, key, property_id=None):
+        """Cached value for `key`, or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if property_id is not None:
+                self._property_keys[property_id] = key
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, property_id=None):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            if property_id is not None:
+                self._property_keys[property_id] = key
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+            # Only an upper bound; stale ids just point at evicted keys
+            if len(self._property_keys) > 2 * self.max_entries:
+                self._property_keys.clear()
+
+    def invalidate_property(self, property_id):
+        """Drop the entry last used for `property_id`, e.g. after its features changed."""
+        with self._lock:
+            key = self._property_keys.pop(property_id, None)
+            if key is not None and self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._property_keys.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
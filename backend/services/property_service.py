@@ -13,6 +13,13 @@ import uuid
 from typing import Optional
 from sqlalchemy import or_, and_
 from extension import socketio
+from pagination import encode_cursor, decode_cursor, seek_after, cached_count, CURSOR_ID, CURSOR_NUMBER
+import search_index
+
+SUMMARY_PAGE_SIZE = 10
+
+# A listing counts as below market when it asks at least 10% under its suggested price
+BELOW_MARKET_MARGIN = 0.10
 
 def add_residence_property(      
     uid,
@@ -87,8 +94,43 @@ def add_residence_property(
         db.session.rollback()
         return False, str(e), None, None
 
-def get_residence_summaries(*,state=None, city=None, district=None, user_id, page):
-    props, length = Property.find_by_location(state=state,city=city,district=district,page=page)
+def is_below_market(residence):
+    """True if the asking price is at least BELOW_MARKET_MARGIN under the suggested price."""
+    if residence.price is None or not residence.suggested_price:
+        return False
+    return residence.price <= residence.suggested_price * (1 - BELOW_MARKET_MARGIN)
+
+def get_residence_summaries(*,state=None, city=None, district=None, user_id, page, cursor=None, include_total=False):
+    """
+    Return (summaries, length, next_cursor).
+    With cursor=None the page number is used (offset paging, exact length).
+    Otherwise cursor mode is used: "" requests the first page and
+    next_cursor is None on the last page. The length is then only counted
+    exactly when include_total is set, and served from a short-lived cache
+    otherwise. Raises ValueError for a malformed cursor.
+    """
+    next_cursor = None
+
+    if cursor is None:
+        props, length = Property.find_by_location(state=state,city=city,district=district,page=page)
+    else:
+        key = decode_cursor(cursor, (CURSOR_NUMBER, CURSOR_ID))
+        rows = Property.find_by_location_after(
+            state=state, city=city, district=district,
+            after=key,
+            limit=SUMMARY_PAGE_SIZE + 1
+        )
+
+        if len(rows) > SUMMARY_PAGE_SIZE:
+            rows = rows[:SUMMARY_PAGE_SIZE]
+            next_cursor = encode_cursor([rows[-1][1], rows[-1][0].id])
+        props = [row[0] for row in rows]
+
+        count_query = Property.listed_in_location(state=state, city=city, district=district)
+        if include_total:
+            length = count_query.count()
+        else:
+            length = cached_count(("summaries", state, city, district), count_query)
 
     summaries = []
 
@@ -117,9 +159,11 @@ def get_residence_summaries(*,state=None, city=None, district=None, user_id, pag
             "thumbnail_url": prop.thumbnail_url,
             "is_favourited": prop.id in user_fav_ids,
             "residence_type": prop.residence_type,
+            "suggested_price": prop.suggested_price,
+            "below_market": is_below_market(prop),
     })
 
-    return summaries, length
+    return summaries, length, next_cursor
 
 def search_residences(
     user_id = None,
@@ -135,24 +179,38 @@ def search_residences(
     min_size=None,
     max_size=None,
     page=1,
-    per_page=20
+    per_page=20,
+    cursor=None,
+    include_total=False
 ):
     """
     Search residences with multiple filters.
+    A text query is matched against the full-text index and results are
+    ranked by relevance, newest first among equal scores.
+    With cursor=None results are paged by page number with an exact total.
+    Otherwise cursor mode is used ("" for the first page): results seek past
+    the cursor, and the total is exact only when include_total is set.
     """
     # Start Query on Residence (which joins Property automatically due to polymorphism)
     sql_query = Residence.query.filter(Residence.status == "listed")
 
-    # 1. Text Search (Name or Title)
+    # 1. Text Search (Name, Title or Description)
+    match = None
     if query:
-        search_term = f"%{query}%"
-        sql_query = sql_query.filter(
-            or_(
-                Residence.name.ilike(search_term),
-                Residence.title.ilike(search_term),
-                Residence.description.ilike(search_term) # Optional: Search description too
+        if search_index.is_available():
+            match = search_index.match_subquery(query)
+
+        if match is not None:
+            sql_query = sql_query.join(match, match.c.property_id == Residence.id)
+        else:
+            search_term = f"%{query}%"
+            sql_query = sql_query.filter(
+                or_(
+                    Residence.name.ilike(search_term),
+                    Residence.title.ilike(search_term),
+                    Residence.description.ilike(search_term)
+                )
             )
-        )
 
     # 2. Location Filters
     if state:
@@ -182,11 +240,47 @@ def search_residences(
     if max_size is not None:
         sql_query = sql_query.filter(Residence.land_size <= max_size)
 
+    # Sort key: relevance first when searching text, then newest first.
+    # The key values are selected with each row so they can form the cursor.
+    sort_columns = [Residence.id]
+    cursor_kinds = (CURSOR_ID,)
+    if match is not None:
+        sort_columns = [match.c.score, Residence.id]
+        cursor_kinds = (CURSOR_NUMBER, CURSOR_ID)
+
+    sql_query = sql_query.add_columns(*sort_columns)
+    ordering = [column.desc() for column in sort_columns]
+
     # Pagination
-    total = sql_query.count()
-    items = sql_query.offset((page - 1) * per_page).limit(per_page).all()
+    next_cursor = None
+
+    if cursor is None:
+        total = sql_query.count()
+        rows = sql_query.order_by(*ordering)\
+                        .offset((page - 1) * per_page).limit(per_page).all()
+    else:
+        try:
+            key = decode_cursor(cursor, cursor_kinds)
+        except ValueError as e:
+            return False, str(e)
+
+        if include_total:
+            total = sql_query.count()
+        else:
+            cache_key = ("search", query, state, city, district, min_price, max_price, residence_type,
+                         min_bedrooms, min_bathrooms, min_size, max_size)
+            total = cached_count(cache_key, sql_query)
 
-    print(items)
+        if key:
+            sql_query = sql_query.filter(seek_after(sort_columns, key))
+
+        rows = sql_query.order_by(*ordering).limit(per_page + 1).all()
+
+        if len(rows) > per_page:
+            rows = rows[:per_page]
+            next_cursor = encode_cursor(rows[-1][1:])
+
+    items = [row[0] for row in rows]
 
     user_fav_ids = []
 
@@ -210,9 +304,19 @@ def search_residences(
             "land_size": prop.land_size,
             "residence_type": prop.residence_type,
             "is_favourited": prop.id in user_fav_ids,
+            "suggested_price": prop.suggested_price,
+            "below_market": is_below_market(prop),
         })
 
-    return True, {"results": results, "total": total, "page": page}
+    if cursor is None:
+        return True, {"results": results, "total": total, "page": page}
+
+    return True, {
+        "results": results,
+        "total": total,
+        "total_cached": not include_total,
+        "next_cursor": next_cursor,
+    }
 
 
 def get_owned_properties(owner_id):
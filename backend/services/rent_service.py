@@ -513,8 +513,9 @@ def pay_first_payment(request_id):
     prop = request_obj.property
     prop.status = "rented"
     
-    # Activate lease
+    # Activate lease; the daily job picks it up on its next run
     lease_obj.status = "active"
+    lease_obj.next_event_at = None
     step_3_doc = RequestDocument.query.filter_by(
         request_id=lease_obj.request_id,
         step_number=3,
@@ -569,6 +570,10 @@ def pay_rent(tenant_record_id, total_amount):
         record.paid_at = datetime.now(timezone.utc)
         record.status = 'paid'
 
+        # Paying off the last debt can let an ended lease complete
+        if record.lease:
+            record.lease.next_event_at = None
+
         db.session.commit()
         
         return True, "Rent payment processed successfully."
@@ -0,0 +1,361 @@
+"""
+Where uploaded files live.
+
+Every upload is stored under a key "<folder>/<filename>" and referenced
+in the database as "/uploads/<key>" (PropertyImage, Message,
+RequestDocument, ...). That URL never changes with the storage driver:
+routes/file_route.py resolves it through the driver, which either sends
+the bytes itself or redirects the client to the object store.
+
+STORAGE_BACKEND selects the driver:
+    local   files in UPLOAD_FOLDER on this machine, sent by Flask (default)
+    s3      objects in S3_BUCKET under S3_PREFIX, on AWS or any
+            S3-compatible server (S3_ENDPOINT_URL, e.g. MinIO or moto);
+            needs boto3. Downloads are redirected to S3_PUBLIC_URL (a
+            public bucket or CDN) when set, otherwise to a presigned URL
+            valid for S3_URL_EXPIRY seconds, so no media bytes pass
+            through the Python workers. With S3_PRESIGN off the bytes are
+            streamed through Flask instead (a private bucket the clients
+            cannot reach).
+
+Caching. A file named by a UUID (every upload except chat images) is
+never overwritten, so it is sent with Cache-Control "public, max-age=
+MEDIA_IMMUTABLE_MAX_AGE, immutable" and clients never ask for it again;
+its redirect is cached for half the presigned URL's lifetime. Other
+names get "no-cache" and are revalidated with their strong ETag (304).
+Range requests are answered with 206, for large contract PDFs.
+
+MEDIA_SENDFILE hands the transfer of local files to the front proxy: the
+response carries only headers and the proxy sends the bytes (and answers
+ranges and revalidations) itself:
+    x-accel-redirect  nginx; MEDIA_ACCEL_PREFIX is an internal location
+                      aliased to UPLOAD_FOLDER, e.g.
+                          location /protected-uploads/ {
+                              internal;
+                              alias /srv/app/backend/uploads/;
+                          }
+    x-sendfile        Apache mod_xsendfile, lighttpd (absolute path)
+
+Every setting can be overridden in app.config before init_storage is
+called, or through an environment variable of the same name. AWS
+credentials come from the usual boto3 sources (environment, profile or
+instance role).
+
+Copy existing local uploads to the bucket before switching, so stored
+URLs keep resolving (from the backend directory):
+    python -m services.storage sync <uploads directory>
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from flask import Response, current_app, redirect, request, send_from_directory
+from werkzeug.exceptions import NotFound, RequestedRangeNotSatisfiable
+from werkzeug.utils import safe_join
+
+from database import _env_value
+
+URL_PREFIX = "/uploads/"
+STREAM_CHUNK_SIZE = 64 * 1024
+SENDFILE_MODES = ("", "x-accel-redirect", "x-sendfile")
+
+# uuid4() names, with an optional extension: written once, never replaced
+IMMUTABLE_NAME = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}(\.[A-Za-z0-9]+)?$")
+
+DEFAULT_STORAGE_CONFIG = {
+    "STORAGE_BACKEND": "local",
+    "S3_BUCKET": "",
+    "S3_PREFIX": "uploads/",
+    "S3_ENDPOINT_URL": "",
+    "S3_REGION": "",
+    "S3_PUBLIC_URL": "",
+    "S3_PRESIGN": True,
+    "S3_URL_EXPIRY": 3600,
+    "MEDIA_IMMUTABLE_MAX_AGE": 365 * 24 * 3600,
+    "MEDIA_SENDFILE": "",
+    "MEDIA_ACCEL_PREFIX": "/protected-uploads/",
+}
+
+
+def key_for_url(url):
+    """Storage key of a stored "/uploads/..." URL (None for other URLs)."""
+    if not url or not url.startswith(URL_PREFIX):
+        return None
+    return url[len(URL_PREFIX):]
+
+
+def url_for_key(key):
+    return URL_PREFIX + key
+
+
+def is_immutable(key):
+    """Whether the file's name is never reused for other content."""
+    return IMMUTABLE_NAME.match(key.rsplit("/", 1)[-1]) is not None
+
+
+def _set_max_age(response, max_age):
+    # None: cacheable, but revalidated on every use
+    if max_age is None:
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+
+
+def _set_disposition(response, key, download):
+    response.headers.set("Content-Disposition", "attachment" if download else "inline",
+                         filename=os.path.basename(key))
+
+
+class LocalStorage:
+    """Files under `root` on the local disk, sent by Flask or handed to the front proxy (`sendfile`)."""
+
+    def __init__(self, root, sendfile="", accel_prefix="/protected-uploads/"):
+        if sendfile not in SENDFILE_MODES:
+            raise ValueError(f"Unknown MEDIA_SENDFILE: {sendfile}")
+        self.root = root
+        self.sendfile = sendfile
+        self.accel_prefix = accel_prefix
+
+    def _path(self, key):
+        path = safe_join(self.root, key)
+        if path is None:
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def save(self, stream, key, content_type=None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            while True:
+                chunk = stream.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+
+    def exists(self, key):
+        return os.path.isfile(self._path(key))
+
+    def url(self, key, download=False):
+        """Direct download URL, or None when the bytes are sent by this app."""
+        return None
+
+    def send(self, key, download=False, max_age=None):
+        if not self.sendfile:
+            # ETag, Last-Modified, 304 and Range handled by werkzeug
+            return send_from_directory(self.root, key, as_attachment=download, max_age=max_age)
+
+        try:
+            path = self._path(key)
+        except ValueError:
+            raise NotFound()
+        if not os.path.isfile(path):
+            raise NotFound()
+
+        response = current_app.response_class(
+            mimetype=mimetypes.guess_type(key)[0] or "application/octet-stream"
+        )
+        if self.sendfile == "x-accel-redirect":
+            response.headers["X-Accel-Redirect"] = self.accel_prefix + quote(key)
+        else:
+            response.headers["X-Sendfile"] = os.path.abspath(path)
+        _set_disposition(response, key, download)
+        _set_max_age(response, max_age)
+        return response
+
+
+class S3Storage:
+    """Objects in an S3 (or S3-compatible) bucket, keys under `prefix`."""
+
+    def __init__(self, bucket, prefix="", endpoint_url=None, region=None, public_url=None,
+                 presign=True, url_expiry=3600, immutable_max_age=None, client=None):
+        if client is None:
+            import boto3
+
+            client = boto3.client("s3", endpoint_url=endpoint_url or None, region_name=region or None)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.public_url = public_url.rstrip("/") if public_url else None
+        self.presign = presign
+        self.url_expiry = url_expiry
+        self.immutable_max_age = immutable_max_age
+
+    def _object_key(self, key):
+        if not key or key.startswith("/") or ".." in key.split("/"):
+            raise ValueError(f"Invalid storage key: {key}")
+        return self.prefix + key
+
+    def save(self, stream, key, content_type=None):
+        extra = {"ContentType": content_type or mimetypes.guess_type(key)[0] or "application/octet-stream"}
+        if self.immutable_max_age and is_immutable(key):
+            # Sent by S3 itself with every presigned or public download
+            extra["CacheControl"] = f"public, max-age={self.immutable_max_age}, immutable"
+        # upload_fileobj switches to a multipart upload for large files
+        self.client.upload_fileobj(stream, self.bucket, self._object_key(key), ExtraArgs=extra)
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def url(self, key, download=False):
+        """Direct download URL, or None when the bytes are sent by this app."""
+        object_key = self._object_key(key)
+        if self.public_url and not download:
+            return f"{self.public_url}/{object_key}"
+        if not self.presign:
+            return None
+
+        params = {"Bucket": self.bucket, "Key": object_key}
+        if download:
+            filename = os.path.basename(key)
+            params["ResponseContentDisposition"] = f'attachment; filename="{filename}"'
+        return self.client.generate_presigned_url("get_object", Params=params, ExpiresIn=self.url_expiry)
+
+    def send(self, key, download=False, max_age=None):
+        """Stream the object; Range and If-None-Match are passed on to the store."""
+        from botocore.exceptions import ClientError
+
+        params = {"Bucket": self.bucket, "Key": self._object_key(key)}
+        if request.headers.get("Range"):
+            params["Range"] = request.headers["Range"]
+        if request.headers.get("If-None-Match"):
+            params["IfNoneMatch"] = request.headers["If-None-Match"]
+
+        try:
+            obj = self.client.get_object(**params)
+        except ClientError as e:
+            code = e.response["Error"]["Code"]
+            if code in ("304", "NotModified"):
+                # The object's own ETag: If-None-Match may be a list or weak
+                etag = e.response.get("ResponseMetadata", {}).get("HTTPHeaders", {}).get("etag")
+                if not etag:
+                    etag = self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))["ETag"]
+                response = Response(status=304)
+                response.headers["ETag"] = etag
+                _set_max_age(response, max_age)
+                return response
+            if code in ("404", "NoSuchKey", "NotFound"):
+                raise NotFound()
+            if code in ("416", "InvalidRange"):
+                raise RequestedRangeNotSatisfiable()
+            raise
+
+        response = Response(obj["Body"].iter_chunks(STREAM_CHUNK_SIZE), mimetype=obj.get("ContentType"),
+                            direct_passthrough=True)
+        response.content_length = obj.get("ContentLength")
+        if obj.get("ContentRange"):
+            response.status_code = 206
+            response.headers["Content-Range"] = obj["ContentRange"]
+        response.headers["Accept-Ranges"] = "bytes"
+        if obj.get("ETag"):
+            response.headers["ETag"] = obj["ETag"]
+        if obj.get("LastModified"):
+            response.last_modified = obj["LastModified"]
+        _set_disposition(response, key, download)
+        _set_max_age(response, max_age)
+        return response
+
+
+def create_storage(config):
+    """The driver selected by config["STORAGE_BACKEND"]."""
+    backend = config["STORAGE_BACKEND"].lower()
+    if backend == "local":
+        return LocalStorage(config["UPLOAD_FOLDER"], sendfile=config["MEDIA_SENDFILE"].lower(),
+                            accel_prefix=config["MEDIA_ACCEL_PREFIX"])
+    if backend == "s3":
+        if not config["S3_BUCKET"]:
+            raise ValueError("STORAGE_BACKEND is s3 but S3_BUCKET is not set")
+        return S3Storage(
+            config["S3_BUCKET"],
+            prefix=config["S3_PREFIX"],
+            endpoint_url=config["S3_ENDPOINT_URL"],
+            region=config["S3_REGION"],
+            public_url=config["S3_PUBLIC_URL"],
+            presign=config["S3_PRESIGN"],
+            url_expiry=config["S3_URL_EXPIRY"],
+            immutable_max_age=config["MEDIA_IMMUTABLE_MAX_AGE"],
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND: {config['STORAGE_BACKEND']}")
+
+
+def init_storage(app):
+    """Create the app's storage driver from its config (UPLOAD_FOLDER must be set for local)."""
+    for key, default in DEFAULT_STORAGE_CONFIG.items():
+        app.config.setdefault(key, _env_value(key, default))
+    app.config.setdefault("UPLOAD_FOLDER", os.path.join(os.getcwd(), "uploads"))
+
+    storage = create_storage(app.config)
+    app.extensions["storage"] = storage
+    return storage
+
+
+def get_storage():
+    """The current app's storage driver, created on first use."""
+    storage = current_app.extensions.get("storage")
+    if storage is None:
+        storage = init_storage(current_app)
+    return storage
+
+
+def serve(key, download=False):
+    """Response for a stored file: a redirect to the store, or the bytes (or a proxy hand-off)."""
+    storage = get_storage()
+    max_age = current_app.config.get("MEDIA_IMMUTABLE_MAX_AGE") if is_immutable(key) else None
+
+    try:
+        url = storage.url(key, download=download)
+    except ValueError:
+        raise NotFound()
+    if url is not None:
+        response = redirect(url)
+        if max_age:
+            # A presigned URL stops working after S3_URL_EXPIRY
+            response.cache_control.private = True
+            response.cache_control.max_age = min(max_age, storage.url_expiry // 2)
+        return response
+
+    response = storage.send(key, download=download, max_age=max_age or None)
+    if max_age:
+        response.cache_control.immutable = True
+    return response
+
+
+def sync(source, storage, log=print):
+    """Copy every file under the local directory `source` into `storage`, keeping relative paths as keys."""
+    copied = 0
+    for parent, _, names in os.walk(source):
+        for name in names:
+            path = os.path.join(parent, name)
+            key = os.path.relpath(path, source).replace(os.sep, "/")
+            if storage.exists(key):
+                continue
+            with open(path, "rb") as f:
+                storage.save(f, key)
+            copied += 1
+            log(f"copied {key}")
+    return copied
+
+
+if __name__ == "__main__":
+    import argparse
+    from flask import Flask
+
+    parser = argparse.ArgumentParser(description="Storage maintenance for uploaded files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sync_parser = commands.add_parser("sync", help="copy local uploads into the configured storage")
+    sync_parser.add_argument("source", help="local uploads directory (the old UPLOAD_FOLDER)")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    with app.app_context():
+        copied = sync(args.source, init_storage(app))
+    print(f"Copied {copied} files")
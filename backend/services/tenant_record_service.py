@@ -1,11 +1,18 @@
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from dateutil.relativedelta import relativedelta
+from sqlalchemy import bindparam, case, func, insert, update
+from models.channel import Channel
 from models.property import Property
 from models.request import Request
 from models.tenant_record import TenantRecord
 from models.lease import Lease
 from database import db
 
+BATCH_SIZE = 500   # leases per batch; also bounds the size of IN lists
+
+# next_event_at of a lease with nothing scheduled
+NO_EVENT = date(9999, 12, 31)
+
 def generate_next_tenant_record(lease_id, force_generate=False):
     """
     Generate the next tenant billing record based on the lease's base start date.
@@ -46,67 +53,239 @@ def generate_next_tenant_record(lease_id, force_generate=False):
 
     return None
 
+def _missing_cycles(lease, record_count, today):
+    """
+    Billing records a lease is missing as of today, following the same
+    rules as generate_next_tenant_record: cycle N starts at
+    start_date + N months, only once it has begun and before end_date.
+    """
+    cycles = []
+    cycle = record_count
+    while True:
+        next_start_date = lease.start_date + relativedelta(months=cycle)
+        if lease.end_date and next_start_date >= lease.end_date:
+            break
+        if next_start_date > today:
+            break
+
+        cycles.append({
+            "lease_id": lease.id,
+            "month": next_start_date.strftime("%Y-%m"),
+            "start_date": next_start_date,
+            "due_date": next_start_date + timedelta(days=lease.gracePeriodDays),
+            "amount_paid": 0.0,
+            "status": "unpaid",
+        })
+        cycle += 1
+    return cycles
+
+def _next_event(lease, record_count, first_unpaid_due, today):
+    """
+    Earliest day the daily job has work for a lease: the start of its next
+    billing cycle, the day its oldest unpaid record becomes overdue, or its
+    end date. NO_EVENT if none is ahead (an ended lease waiting for its
+    debt to be paid; pay_rent reschedules it).
+    """
+    candidates = []
+
+    next_start_date = lease.start_date + relativedelta(months=record_count)
+    if not lease.end_date or next_start_date < lease.end_date:
+        candidates.append(next_start_date)
+
+    if first_unpaid_due:
+        candidates.append(first_unpaid_due + timedelta(days=1))
+
+    if lease.end_date and lease.end_date > today:
+        candidates.append(lease.end_date)
+
+    return min(candidates) if candidates else NO_EVENT
+
+def _chunks(values, size=BATCH_SIZE):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+def _bulk_update(model, *criteria, **values):
+    db.session.execute(
+        update(model).where(*criteria).values(**values).execution_options(synchronize_session=False)
+    )
+
+def due_leases(today):
+    """
+    Active leases whose next event has come (or is unknown), served by the
+    (status, next_event_at) index, so the cost follows the due events
+    rather than the number of leases.
+    """
+    def active_leases(*criteria):
+        return db.session.query(
+            Lease.id, Lease.start_date, Lease.end_date, Lease.gracePeriodDays,
+            Lease.property_id, Lease.channel_id
+        ).filter(Lease.status == 'active', *criteria)
+
+    # Two index probes; an OR of the two conditions makes SQLite walk
+    # every active lease in the index
+    return active_leases(Lease.next_event_at <= today)\
+        .union_all(active_leases(Lease.next_event_at.is_(None)))\
+        .all()
+
+def _record_summary(lease_ids):
+    """Record count and earliest unpaid due date of each lease, in one grouped query."""
+    rows = db.session.query(
+        TenantRecord.lease_id,
+        func.count(TenantRecord.id),
+        func.min(case((TenantRecord.status == 'unpaid', TenantRecord.due_date)))
+    ).filter(TenantRecord.lease_id.in_(lease_ids))\
+     .group_by(TenantRecord.lease_id)\
+     .all()
+    return {lease_id: (count, first_unpaid_due) for lease_id, count, first_unpaid_due in rows}
+
+def generate_missing_records(leases, today):
+    """
+    Bulk-insert the missing billing records of the given leases.
+    Returns the number of records created.
+    """
+    summary = _record_summary([lease.id for lease in leases])
+
+    new_records = []
+    for lease in leases:
+        record_count, _ = summary.get(lease.id, (0, None))
+        new_records.extend(_missing_cycles(lease, record_count, today))
+
+    if not new_records:
+        return 0
+    result = db.session.execute(_insert_new_records(), new_records)
+    return result.rowcount if result.rowcount >= 0 else len(new_records)
+
+def _insert_new_records():
+    """
+    INSERT for tenant records that skips a (lease_id, month) that already
+    exists, e.g. created by another process at the same moment.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        # The unique index still rejects duplicates, failing the run instead
+        return insert(TenantRecord.__table__)
+
+    return dialect_insert(TenantRecord.__table__)\
+        .on_conflict_do_nothing(index_elements=["lease_id", "month"])
+
+def mark_overdue_records(lease_ids, today):
+    """Flip the unpaid records of the given leases past their due date to overdue in one UPDATE."""
+    result = db.session.execute(
+        update(TenantRecord)
+        .where(
+            TenantRecord.lease_id.in_(lease_ids),
+            TenantRecord.status == 'unpaid',
+            TenantRecord.due_date < today
+        )
+        .values(status='overdue')
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+def complete_ended_leases(leases, today):
+    """
+    Complete the given leases that have ended and have no unpaid or overdue
+    record: one aggregate query finds them, then bulk UPDATEs close their
+    channels, unlist their properties and archive old requests.
+    Returns the ids of the completed leases.
+    """
+    ended_ids = [lease.id for lease in leases if lease.end_date and lease.end_date <= today]
+    if not ended_ids:
+        return []
+
+    with_debt = {lease_id for (lease_id,) in db.session.query(TenantRecord.lease_id).filter(
+        TenantRecord.lease_id.in_(ended_ids),
+        TenantRecord.status.in_(['unpaid', 'overdue'])
+    ).distinct()}
+
+    ended = [lease for lease in leases if lease.id in ended_ids and lease.id not in with_debt]
+    if not ended:
+        return []
+
+    lease_ids = [lease.id for lease in ended]
+    property_ids = sorted({lease.property_id for lease in ended})
+    channel_ids = sorted({lease.channel_id for lease in ended if lease.channel_id})
+
+    _bulk_update(Lease, Lease.id.in_(lease_ids), status='completed', next_event_at=None)
+
+    if channel_ids:
+        _bulk_update(Channel, Channel.id.in_(channel_ids), status='closed')
+
+    # Set Property back to Unlisted
+    _bulk_update(Property, Property.id.in_(property_ids), status='unlisted')
+    _bulk_update(
+        Request,
+        Request.property_id.in_(property_ids),
+        Request.status.in_(['pending', 'rejected', 'terminated', 'completed']),
+        status='archived'
+    )
+
+    return lease_ids
+
+def schedule_next_events(leases, today):
+    """Store the next event date of each of the given (still active) leases."""
+    if not leases:
+        return
+
+    summary = _record_summary([lease.id for lease in leases])
+    schedule = []
+    for lease in leases:
+        record_count, first_unpaid_due = summary.get(lease.id, (0, None))
+        schedule.append({
+            "lease_id": lease.id,
+            "next_event": _next_event(lease, record_count, first_unpaid_due, today),
+        })
+
+    # A Core update that sets updated_at to itself: the schedule is not
+    # exported data, so it must not move the lease past the export mark
+    leases_table = Lease.__table__
+    db.session.execute(
+        update(leases_table)
+        .where(leases_table.c.id == bindparam("lease_id"))
+        .values(next_event_at=bindparam("next_event"), updated_at=leases_table.c.updated_at),
+        schedule,
+    )
+
 def process_daily_tasks():
     """
+    For every active lease whose next event has come:
     1. Generate missing tenant records (handling date jumps).
     2. Update overdue statuses.
     3. Complete leases if ended and fully paid.
+    4. Schedule the lease's next event.
+
+    Leases are handled in batches with set-based statements, so the work
+    per run follows the number of due leases, not the total number of
+    leases. Everything commits in one transaction.
+    Returns a summary of the changes, or None if the run was rolled back.
     """
-    with db.session.no_autoflush:
-        # Fetch all active leases
-        active_leases = Lease.query.filter_by(status='active').all()
-        today = datetime.now(timezone.utc).date()
-        print(today)
-
-        for lease in active_leases:
-
-            while True:
-                created = generate_next_tenant_record(lease.id)
-                if not created:
-                    break
-            
-
-            unpaid_records = TenantRecord.query.filter(
-                TenantRecord.lease_id == lease.id,
-                TenantRecord.status == 'unpaid'
-            ).all()
-
-            for record in unpaid_records:
-                if today > record.due_date:
-                    record.status = 'overdue'
-                 
-
-
-            if lease.end_date and today >= lease.end_date:
-                # Check if there are ANY unpaid or overdue records
-                outstanding_balance = TenantRecord.query.filter(
-                    TenantRecord.lease_id == lease.id,
-                    TenantRecord.status.in_(['unpaid', 'overdue'])
-                ).count()
-
-                if outstanding_balance == 0:
-                    lease.status = 'completed'
-                    
-                    if lease.channel:
-                        lease.channel.status = 'closed'
-                         
-                    # Set Property back to Unlisted
-                    if lease.property:
-                        lease.property.status = 'unlisted'
-
-                    requests_to_archive = Request.query.filter(
-                        Request.property_id == lease.property_id,
-                        Request.status.in_(['pending', 'rejected', 'terminated','completed'])
-                    ).all()
-
-                    for req in requests_to_archive:
-                        req.status = 'archived'
-                        
-                    print(f"Lease {lease.id} completed and property {lease.property_id} unlisted.")
-
-        # Commit all changes for this batch
-        try:
-            db.session.commit()
-        except Exception as e:
-            db.session.rollback()
-            print(f"Error in daily scheduler task: {e}")
\ No newline at end of file
+    today = datetime.now(timezone.utc).date()
+
+    created = overdue = 0
+    completed = []
+    try:
+        leases = due_leases(today)
+
+        for batch in _chunks(leases):
+            lease_ids = [lease.id for lease in batch]
+
+            created += generate_missing_records(batch, today)
+            overdue += mark_overdue_records(lease_ids, today)
+            done = set(complete_ended_leases(batch, today))
+            schedule_next_events([lease for lease in batch if lease.id not in done], today)
+            completed.extend(done)
+
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error in daily scheduler task: {e}")
+        return None
+
+    if completed:
+        print(f"{len(completed)} lease(s) completed and their properties unlisted.")
+
+    return {"processed": len(leases), "created": created, "overdue": overdue, "completed": len(completed)}
@@ -0,0 +1,303 @@
+"""
+Incremental export of platform data for the price model, as Parquet.
+
+Two datasets are written under the export directory, each partitioned by
+the month of the last change (hive-style, so pyarrow and pandas read the
+partition back as a column):
+
+    leases/updated_month=2026-10/part-<run>.parquet
+        one row per signed lease (not pending) with the residence it is
+        for; monthly_rent is the agreed rent
+    listings/updated_month=2026-10/part-<run>.parquet
+        one row per residence, whatever its status; price is the asking
+        rent (None if not set)
+    export_state.json
+        the high-water mark (updated_at, id) reached by each dataset
+
+Rows are read in (updated_at, id) order from the mark onwards through a
+streaming cursor (server-side on PostgreSQL), `chunk_size` rows at a
+time, and appended to the open partition file as one row group, so
+memory stays flat whatever the table size. Only rows changed more than
+SETTLE_SECONDS ago are taken, so a transaction committing late cannot
+slip in behind the mark.
+
+A row changed again after an export appears again in a later run: every
+row is a snapshot, and readers keep the latest one per lease_id or
+property_id (see ai_training/train.py). Listings are exported in every
+status so that a residence taken off the market leaves a snapshot saying
+so; readers filter on status after taking the latest one. Part files become visible and
+the mark moves only when a dataset finishes, so a failed run leaves the
+previous export untouched and the rerun starts from the old mark. Run
+one export at a time per directory.
+
+Run from the backend directory (pyarrow must be installed):
+    python -m services.training_export <directory> [--chunk-size N]
+"""
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, tuple_
+from database import db
+from models.lease import Lease
+from models.property import Property, Residence
+
+STATE_FILE = "export_state.json"
+PARTITION_KEY = "updated_month"
+DEFAULT_CHUNK_SIZE = 5000
+SETTLE_SECONDS = 60
+
+properties = Property.__table__
+residences = Residence.__table__
+leases = Lease.__table__
+
+RESIDENCE_COLUMNS = (
+    properties.c.state,
+    properties.c.city,
+    properties.c.district,
+    residences.c.residence_type,
+    residences.c.land_size,
+    residences.c.num_bedrooms,
+    residences.c.num_bathrooms,
+)
+
+RESIDENCE_FIELDS = (
+    ("state", "string"), ("city", "string"), ("district", "string"), ("residence_type", "string"),
+    ("land_size", "float"), ("num_bedrooms", "int"), ("num_bathrooms", "int"),
+)
+
+
+def _schema(*fields):
+    import pyarrow as pa
+
+    types = {
+        "int": pa.int64(), "float": pa.float64(), "string": pa.string(),
+        "date": pa.date32(), "timestamp": pa.timestamp("us"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in fields])
+
+
+class Dataset:
+    """
+    One exported query: its columns (the row id first, updated_at last),
+    their Arrow types, and the (updated_at, id) pair it is ordered by.
+    """
+
+    def __init__(self, name, columns, fields, updated_at, row_id, source, criteria=()):
+        self.name = name
+        self.columns = columns
+        self.fields = fields
+        self.updated_at = updated_at
+        self.row_id = row_id
+        self.source = source
+        self.criteria = criteria
+
+    def query(self, mark, until):
+        """Rows changed after `mark` (an (updated_at, id) pair or None) and up to `until`, in mark order."""
+        stmt = select(*self.columns).select_from(self.source)\
+            .where(*self.criteria, self.updated_at <= until)
+        if mark is not None:
+            stmt = stmt.where(tuple_(self.updated_at, self.row_id) > tuple_(*mark))
+        return stmt.order_by(self.updated_at, self.row_id)
+
+
+DATASETS = {
+    "leases": Dataset(
+        "leases",
+        (leases.c.id.label("lease_id"), leases.c.property_id, leases.c.status.label("lease_status"),
+         leases.c.start_date, leases.c.end_date, leases.c.monthly_rent, leases.c.deposit_amount,
+         properties.c.price.label("listed_price"), *RESIDENCE_COLUMNS, leases.c.updated_at),
+        (("lease_id", "int"), ("property_id", "int"), ("lease_status", "string"),
+         ("start_date", "date"), ("end_date", "date"), ("monthly_rent", "float"),
+         ("deposit_amount", "float"), ("listed_price", "float"), *RESIDENCE_FIELDS,
+         ("updated_at", "timestamp")),
+        leases.c.updated_at, leases.c.id,
+        leases.join(properties, properties.c.id == leases.c.property_id)
+              .join(residences, residences.c.property_id == properties.c.id),
+        criteria=(leases.c.status != "pending",),
+    ),
+    "listings": Dataset(
+        "listings",
+        (properties.c.id.label("property_id"), properties.c.status, properties.c.price,
+         properties.c.deposit, *RESIDENCE_COLUMNS, properties.c.updated_at),
+        (("property_id", "int"), ("status", "string"), ("price", "float"), ("deposit", "float"),
+         *RESIDENCE_FIELDS, ("updated_at", "timestamp")),
+        properties.c.updated_at, properties.c.id,
+        properties.join(residences, residences.c.property_id == properties.c.id),
+    ),
+}
+
+
+# ---- state --------------------------------------------------------------------
+
+def read_state(directory):
+    """{dataset: {"updated_at", "id", "rows", "exported_at"}} of the last finished exports."""
+    path = os.path.join(directory, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_state(directory, state):
+    path = os.path.join(directory, STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _mark(entry):
+    if not entry:
+        return None
+    return datetime.fromisoformat(entry["updated_at"]), entry["id"]
+
+
+# ---- writing ------------------------------------------------------------------
+
+class PartitionWriter:
+    """
+    Appends chunks to `<dataset>/<PARTITION_KEY>=<month>/part-<run>.parquet`.
+    Rows arrive in updated_at order, so only the current month's file is
+    open; every file is written as .tmp and renamed by commit().
+    """
+
+    def __init__(self, root, run, schema):
+        self.root = root
+        self.run = run
+        self.schema = schema
+        self.month = None
+        self.writer = None
+        self.written = []
+
+    def write(self, rows):
+        start = 0
+        for i in range(1, len(rows) + 1):
+            if i == len(rows) or _month(rows[i].updated_at) != _month(rows[start].updated_at):
+                self._write_run(_month(rows[start].updated_at), rows[start:i])
+                start = i
+
+    def _write_run(self, month, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if month != self.month:
+            self.close()
+            directory = os.path.join(self.root, f"{PARTITION_KEY}={month}")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{self.run}.parquet")
+            self.writer = pq.ParquetWriter(path + ".tmp", self.schema)
+            self.written.append(path)
+            self.month = month
+
+        columns = list(zip(*rows))
+        self.writer.write_table(pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, self.schema)],
+            schema=self.schema,
+        ))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def commit(self):
+        self.close()
+        for path in self.written:
+            os.replace(path + ".tmp", path)
+        return self.written
+
+    def discard(self):
+        self.close()
+        for path in self.written:
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+
+
+def _remove_unfinished(root):
+    # Part files of a run that was killed before commit()
+    for parent, _, names in os.walk(root):
+        for name in names:
+            if name.endswith(".parquet.tmp"):
+                os.remove(os.path.join(parent, name))
+
+
+def _month(value):
+    return value.strftime("%Y-%m")
+
+
+# ---- export -------------------------------------------------------------------
+
+def export_dataset(dataset, directory, mark=None, until=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream one dataset's rows after `mark` into Parquet under `directory`.
+    Returns (rows written, new mark, files); the mark is unchanged when no
+    row is new.
+    Must be called inside an app context.
+    """
+    until = until or datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=SETTLE_SECONDS)
+    _remove_unfinished(os.path.join(directory, dataset.name))
+    run = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    writer = PartitionWriter(os.path.join(directory, dataset.name), run, _schema(*dataset.fields))
+    rows = 0
+
+    try:
+        with db.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=chunk_size)\
+                .execute(dataset.query(mark, until))
+            for chunk in result.partitions():
+                last = chunk[-1]
+                mark = (last.updated_at, last[0])
+                writer.write(chunk)
+                rows += len(chunk)
+    except BaseException:
+        writer.discard()
+        raise
+
+    return rows, mark, writer.commit()
+
+
+def export(directory, datasets=tuple(DATASETS), chunk_size=DEFAULT_CHUNK_SIZE, until=None):
+    """
+    Export every dataset from its recorded mark and record the new marks.
+    Returns {dataset: rows exported}. Must be called inside an app context.
+    """
+    os.makedirs(directory, exist_ok=True)
+    state = read_state(directory)
+    exported = {}
+
+    for name in datasets:
+        entry = state.get(name)
+        previous = _mark(entry)
+        rows, mark, _ = export_dataset(DATASETS[name], directory, previous, until, chunk_size)
+        exported[name] = rows
+        if mark != previous:
+            state[name] = {
+                "updated_at": mark[0].isoformat(),
+                "id": mark[1],
+                "rows": (entry or {}).get("rows", 0) + rows,
+                "exported_at": datetime.now(timezone.utc).isoformat(),
+            }
+            _write_state(directory, state)
+
+    return exported
+
+
+if __name__ == "__main__":
+    import argparse
+    from flask import Flask
+    from database import init_db
+
+    parser = argparse.ArgumentParser(description="Export leases and listings to Parquet for model training.")
+    parser.add_argument("directory", help="export directory; rerun with the same one to export only changes")
+    parser.add_argument("--dataset", choices=sorted(DATASETS), action="append",
+                        help="export only this dataset (repeatable)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per fetch and row group")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    init_db(app)
+
+    with app.app_context():
+        exported = export(args.directory, args.dataset or tuple(DATASETS), args.chunk_size)
+    for name, rows in exported.items():
+        print(f"{name}: {rows} new rows")
@@ -0,0 +1,175 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from sqlalchemy import event
+from fixtures import create_test_app
+from database import db
+from models.user import User
+from models.property import Residence
+from models.channel import Channel
+from models.message import Message
+from services import chat_service
+
+
+class TestUserChannels(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        self.owner = User(uid="owner", email="o@x", username="owner")
+        self.tenant = User(uid="tenant", email="t@x", username="tenant")
+        db.session.add_all([self.owner, self.tenant])
+        db.session.flush()
+
+        start = datetime(2025, 1, 1)
+        self.channels = []
+        for i in range(5):
+            prop = Residence(user_id=self.owner.id, name=f"Home {i}", type="residence", status="listed")
+            db.session.add(prop)
+            db.session.flush()
+            channel = Channel(property_id=prop.id, tenant_id=self.tenant.id)
+            db.session.add(channel)
+            db.session.flush()
+            # Older channels get newer messages, so id order != inbox order
+            self.send(channel, self.tenant, f"first {i}", start)
+            self.send(channel, self.owner, f"latest {i}", start + timedelta(hours=10 - i))
+            self.channels.append(channel)
+
+        # Channels without messages or closed channels are not listed
+        db.session.add(Channel(property_id=prop.id, tenant_id=self.tenant.id))
+        closed = Channel(property_id=prop.id, tenant_id=self.tenant.id, status="closed")
+        db.session.add(closed)
+        db.session.flush()
+        self.send(closed, self.tenant, "bye", start + timedelta(days=1))
+        db.session.commit()
+
+    def send(self, channel, sender, body, sent_at):
+        """Insert a message with a fixed timestamp, as Message.create_message would."""
+        msg = Message(sender_id=sender.id, channel_id=channel.id, message_body=body, type="text", sent_at=sent_at)
+        db.session.add(msg)
+        db.session.flush()
+        Channel.record_message(msg)
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def test_channels_sorted_by_latest_message_with_counterpart(self):
+        """Test the inbox lists each channel once with its latest message and the other participant."""
+        success, _, channels, next_cursor = chat_service.get_user_channels(self.tenant.id)
+
+        self.assertTrue(success)
+        self.assertIsNone(next_cursor)
+        self.assertEqual([c["id"] for c in channels], [c.id for c in self.channels])
+        self.assertEqual(channels[0]["last_message"], "latest 0")
+        self.assertEqual(channels[0]["my_role"], "tenant")
+        self.assertEqual(channels[0]["other_user_name"], "owner")
+
+        _, _, owner_channels, _ = chat_service.get_user_channels(self.owner.id)
+        self.assertEqual(owner_channels[0]["my_role"], "owner")
+        self.assertEqual(owner_channels[0]["other_user_id"], self.tenant.id)
+
+    def test_cursor_pages_through_inbox_in_one_query_each(self):
+        """Test limit/cursor paging covers every channel once, one SELECT per page."""
+        owner_id = self.owner.id
+        expected = [c.id for c in self.channels]
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", capture)
+        try:
+            ids, cursor, pages = [], None, 0
+            while True:
+                _, _, channels, cursor = chat_service.get_user_channels(owner_id, limit=2, cursor=cursor)
+                ids += [c["id"] for c in channels]
+                pages += 1
+                if cursor is None:
+                    break
+        finally:
+            event.remove(db.engine, "before_cursor_execute", capture)
+
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(statements), pages)
+
+    def test_unread_counts_and_mark_read(self):
+        """Test each message bumps the receiver's unread count and mark_channel_read resets it."""
+        channel_id = self.channels[0].id
+        Message.create_message(self.tenant.id, channel_id, "hello?", "text")
+        Message.create_message(self.tenant.id, channel_id, "anyone?", "text")
+
+        _, _, channels, _ = chat_service.get_user_channels(self.owner.id)
+        self.assertEqual(channels[0]["id"], channel_id)
+        self.assertEqual(channels[0]["last_message"], "anyone?")
+        self.assertEqual(channels[0]["unread_count"], 3)
+
+        _, _, channels, _ = chat_service.get_user_channels(self.tenant.id)
+        self.assertEqual(channels[0]["unread_count"], 1)
+
+        success, _ = chat_service.mark_channel_read(channel_id, self.owner.id)
+        self.assertTrue(success)
+        _, _, channels, _ = chat_service.get_user_channels(self.owner.id)
+        self.assertEqual(channels[0]["unread_count"], 0)
+
+        success, _ = chat_service.mark_channel_read(channel_id, 9999)
+        self.assertFalse(success)
+
+    def test_mark_read_route_statuses(self):
+        """Test string ids are accepted, a non-participant gets 404, and a database error 500."""
+        from unittest.mock import patch
+        from sqlalchemy.exc import OperationalError
+        from routes.chat_route import chat_bp
+
+        self.app.register_blueprint(chat_bp)
+        client = self.app.test_client()
+        channel_id = self.channels[0].id
+
+        res = client.post("/chat/read", json={"channel_id": str(channel_id), "user_id": str(self.tenant.id)})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(db.session.get(Channel, channel_id).tenant_unread_count, 0)
+
+        res = client.post("/chat/read", json={"channel_id": channel_id, "user_id": 9999})
+        self.assertEqual(res.status_code, 404)
+        res = client.post("/chat/read", json={"channel_id": channel_id, "user_id": "me"})
+        self.assertEqual(res.status_code, 400)
+
+        with patch.object(Channel, "mark_read", side_effect=OperationalError("UPDATE", {}, Exception("locked"))):
+            res = client.post("/chat/read", json={"channel_id": channel_id, "user_id": self.owner.id})
+        self.assertEqual(res.status_code, 500)
+
+    def test_migration_backfills_summary(self):
+        """Test the channel summary migration rebuilds the columns from existing messages."""
+        from migrations import channel_summary_columns
+
+        db.session.execute(db.update(Channel).values(
+            last_message_id=None, last_message_at=None, last_message_preview=None, last_message_type=None
+        ))
+        db.session.commit()
+
+        with db.engine.begin() as conn:
+            channel_summary_columns(conn)
+
+        channel = db.session.get(Channel, self.channels[2].id)
+        self.assertEqual(channel.last_message_preview, "latest 2")
+        self.assertEqual(channel.last_message_type, "text")
+        self.assertEqual(channel.last_message_at, datetime(2025, 1, 1, 8))
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor fails instead of returning the first page."""
+        success, _, channels, _ = chat_service.get_user_channels(self.owner.id, limit=2, cursor="bogus")
+        self.assertFalse(success)
+        self.assertEqual(channels, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
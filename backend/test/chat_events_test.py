@@ -0,0 +1,137 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from fixtures import create_test_app
+from database import db
+from models.user import User
+from models.property import Residence
+from models.channel import Channel
+from models.message import Message
+from services import chat_service
+
+
+class TestChatEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.test_request_context()
+        self.ctx.push()
+
+        owner = User(uid="owner", email="o@x", username="owner")
+        tenant = User(uid="tenant", email="t@x", username="tenant")
+        db.session.add_all([owner, tenant])
+        db.session.flush()
+        prop = Residence(user_id=owner.id, name="Home", type="residence", status="listed")
+        db.session.add(prop)
+        db.session.flush()
+        channel = Channel(property_id=prop.id, tenant_id=tenant.id)
+        other = Channel(property_id=prop.id, tenant_id=tenant.id, type="lease")
+        db.session.add_all([channel, other])
+        db.session.commit()
+
+        self.owner_id, self.tenant_id = owner.id, tenant.id
+        self.channel_id, self.other_id = channel.id, other.id
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def send(self, sender_id, body, channel_id=None):
+        success, _, msg = chat_service.create_text_message(sender_id, channel_id or self.channel_id, body)
+        self.assertTrue(success)
+        return msg
+
+    def test_sequence_numbers_are_per_channel(self):
+        """Test each channel numbers its messages 1, 2, 3... independently."""
+        with patch('services.chat_service.socketio'):
+            seqs = [self.send(self.tenant_id, f"m{i}").seq for i in range(3)]
+            other = self.send(self.owner_id, "lease", self.other_id)
+
+        self.assertEqual(seqs, [1, 2, 3])
+        self.assertEqual(other.seq, 1)
+        self.assertEqual(db.session.get(Channel, self.channel_id).last_seq, 3)
+
+    @patch('services.chat_service.socketio')
+    def test_message_event_sent_to_both_participants(self, mock_socketio):
+        """Test a new message is pushed with its payload and each user's own channel summary."""
+        msg = self.send(self.tenant_id, "hello")
+
+        events = {c.kwargs["room"]: c.args for c in mock_socketio.emit.call_args_list if c.args[0] == "chat_message"}
+        self.assertEqual(set(events), {f"user_{self.tenant_id}", f"user_{self.owner_id}"})
+
+        _, payload = events[f"user_{self.owner_id}"]
+        self.assertEqual(payload["v"], chat_service.CHAT_EVENT_VERSION)
+        self.assertEqual(payload["seq"], 1)
+        self.assertEqual(payload["message"]["id"], msg.id)
+        self.assertEqual(payload["message"]["message_body"], "hello")
+        self.assertEqual(payload["channel"]["my_role"], "owner")
+        self.assertEqual(payload["channel"]["unread_count"], 1)
+        self.assertEqual(payload["channel"]["last_message"], "hello")
+
+        _, payload = events[f"user_{self.tenant_id}"]
+        self.assertEqual(payload["channel"]["my_role"], "tenant")
+        self.assertEqual(payload["channel"]["unread_count"], 0)
+
+        # Legacy event still reaches the receiver only
+        mock_socketio.emit.assert_any_call('refresh_chat', {'channel_id': self.channel_id}, room=f"user_{self.owner_id}")
+
+    @patch('services.chat_service.socketio')
+    def test_legacy_refresh_can_be_disabled(self, mock_socketio):
+        """Test CHAT_LEGACY_REFRESH = False stops the refresh_chat event."""
+        self.app.config["CHAT_LEGACY_REFRESH"] = False
+        self.send(self.tenant_id, "hello")
+
+        events = [c.args[0] for c in mock_socketio.emit.call_args_list]
+        self.assertEqual(events, ["chat_message", "chat_message"])
+
+    @patch('services.chat_service.socketio')
+    def test_failed_push_still_reports_saved_message(self, mock_socketio):
+        """Test a Socket.IO error after the commit is logged, and the send still succeeds once."""
+        mock_socketio.emit.side_effect = RuntimeError("socket down")
+        with self.assertLogs(self.app.logger, "ERROR"):
+            msg = self.send(self.tenant_id, "hello")
+
+        self.assertEqual(msg.seq, 1)
+        self.assertEqual(Message.query.filter_by(channel_id=self.channel_id).count(), 1)
+
+    def test_gap_fill_after_seq(self):
+        """Test after_seq returns only the missed messages, oldest first."""
+        with patch('services.chat_service.socketio'):
+            for i in range(5):
+                self.send(self.tenant_id, f"m{i}")
+
+        success, _, messages = chat_service.get_messages(self.channel_id, after_seq=2)
+        self.assertTrue(success)
+        self.assertEqual([m.seq for m in messages], [3, 4, 5])
+
+        _, _, messages = chat_service.get_messages(self.channel_id, limit=1, after_seq=2)
+        self.assertEqual([m.seq for m in messages], [3])
+
+    def test_migration_numbers_existing_messages(self):
+        """Test the sequence migration numbers history in sent order and sets last_seq."""
+        from datetime import datetime
+        from migrations import message_sequence_numbers
+
+        for day in (3, 1, 2):
+            db.session.add(Message(sender_id=self.tenant_id, channel_id=self.channel_id, message_body=f"day {day}",
+                                   type="text", sent_at=datetime(2025, 1, day)))
+        db.session.commit()
+
+        with db.engine.begin() as conn:
+            message_sequence_numbers(conn)
+
+        db.session.expire_all()
+        bodies = [m.message_body for m in Message.query.order_by(Message.seq).all()]
+        self.assertEqual(bodies, ["day 1", "day 2", "day 3"])
+        self.assertEqual(db.session.get(Channel, self.channel_id).last_seq, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
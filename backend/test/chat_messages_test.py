@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from fixtures import create_test_app
+from database import db
+from models.message import Message
+from services import chat_service
+
+
+class TestMessagePaging(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        for i in range(30):
+            db.session.add(Message(sender_id=1, channel_id=1, message_body=f"m{i}", type="text"))
+            db.session.add(Message(sender_id=1, channel_id=2, message_body=f"other {i}", type="text"))
+        db.session.commit()
+        self.ids = [m.id for m in Message.query.filter_by(channel_id=1).order_by(Message.id.desc())]
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def test_before_id_walks_history_without_gaps(self):
+        """Test before_id pages return every message of the channel once, newest first."""
+        seen, before_id = [], None
+        while True:
+            _, _, page = chat_service.get_messages(1, limit=7, before_id=before_id)
+            if not page:
+                break
+            seen += [m.id for m in page]
+            before_id = page[-1].id
+
+        self.assertEqual(seen, self.ids)
+
+    def test_new_messages_do_not_shift_before_id_pages(self):
+        """Test inserts between page loads do not duplicate messages, unlike offset paging."""
+        _, _, first = chat_service.get_messages(1, limit=10)
+        db.session.add(Message(sender_id=1, channel_id=1, message_body="new", type="text"))
+        db.session.commit()
+
+        _, _, by_cursor = chat_service.get_messages(1, limit=10, before_id=first[-1].id)
+        _, _, by_offset = chat_service.get_messages(1, limit=10, offset=10)
+
+        self.assertEqual([m.id for m in by_cursor], self.ids[10:20])
+        self.assertEqual(by_offset[0].id, first[-1].id)
+
+    def test_after_id_returns_next_messages_oldest_first(self):
+        """Test after_id returns the messages right after the cursor in ascending order."""
+        _, _, page = chat_service.get_messages(1, limit=3, after_id=self.ids[10])
+        self.assertEqual([m.id for m in page], self.ids[9:6:-1])
+
+    def test_page_size_is_capped(self):
+        """Test a missing or oversized limit returns at most MAX_MESSAGE_PAGE messages."""
+        for i in range(chat_service.MAX_MESSAGE_PAGE):
+            db.session.add(Message(sender_id=1, channel_id=1, message_body=f"more {i}", type="text"))
+        db.session.commit()
+
+        _, _, page = chat_service.get_messages(1, limit=10_000)
+        self.assertEqual(len(page), chat_service.MAX_MESSAGE_PAGE)
+        _, _, page = chat_service.get_messages(1)
+        self.assertEqual(len(page), chat_service.MAX_MESSAGE_PAGE)
+
+
+if __name__ == '__main__':
+    unittest.main()
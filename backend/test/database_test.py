@@ -0,0 +1,112 @@
+import unittest
+import tempfile
+import threading
+import sys
+import os
+
+from flask import Flask
+from sqlalchemy import create_engine, text
+from unittest.mock import patch
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from database import db, init_db, engine_options, _database_uri, DEFAULT_DB_CONFIG
+from migrations import MIGRATIONS, applied_versions, upgrade
+
+
+class TestInitDb(unittest.TestCase):
+
+    def test_sqlite_connections_use_wal_and_pragmas(self):
+        """Test every SQLite connection is opened with the configured pragmas."""
+        with tempfile.TemporaryDirectory() as tmp:
+            app = Flask(__name__)
+            app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(tmp, 'test.db')}"
+            app.config["SQLITE_BUSY_TIMEOUT_MS"] = 1234
+            init_db(app)
+
+            with app.app_context():
+                journal_mode = db.session.execute(text("PRAGMA journal_mode")).scalar()
+                synchronous = db.session.execute(text("PRAGMA synchronous")).scalar()
+                busy_timeout = db.session.execute(text("PRAGMA busy_timeout")).scalar()
+                db.session.remove()
+                db.engine.dispose()
+
+        self.assertEqual(journal_mode, "wal")
+        self.assertEqual(synchronous, 1)  # NORMAL
+        self.assertEqual(busy_timeout, 1234)
+
+    def test_postgres_options_use_sized_pool(self):
+        """Test server databases get a sized, pre-pinged and recycled pool."""
+        config = dict(DEFAULT_DB_CONFIG, DB_POOL_SIZE=5, DB_MAX_OVERFLOW=7)
+        options = engine_options("postgresql://user:pw@localhost/rental", config)
+
+        self.assertEqual(options["pool_size"], 5)
+        self.assertEqual(options["max_overflow"], 7)
+        self.assertTrue(options["pool_pre_ping"])
+        self.assertEqual(options["pool_recycle"], DEFAULT_DB_CONFIG["DB_POOL_RECYCLE"])
+
+    def test_legacy_postgres_scheme_is_normalized(self):
+        """Test the deprecated postgres:// scheme is rewritten before engine creation."""
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = "postgres://user:pw@localhost/rental"
+
+        self.assertEqual(_database_uri(app), "postgresql://user:pw@localhost/rental")
+
+
+class TestUpgrade(unittest.TestCase):
+
+    def test_workers_starting_together_apply_each_step_once(self):
+        """Test concurrent upgrade() calls on one database all succeed and apply every step exactly once."""
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'test.db')}"
+            engines = [create_engine(url, connect_args={"timeout": 30}) for _ in range(4)]
+            start = threading.Barrier(len(engines))
+            results, errors = [], []
+
+            def worker(engine):
+                start.wait()
+                try:
+                    results.append(upgrade(engine))
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=worker, args=(engine,)) for engine in engines]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            versions = {version for version, _, _ in MIGRATIONS}
+            self.assertEqual(errors, [])
+            self.assertEqual(sorted(v for applied in results for v in applied), sorted(versions))
+            self.assertEqual(applied_versions(engines[0]), versions)
+            for engine in engines:
+                engine.dispose()
+
+    def test_full_text_index_retried_once_fts5_available(self):
+        """Test the full-text migration stays pending on a SQLite without FTS5 and applies on a later start."""
+        import search_index
+
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'test.db')}")
+            without_fts5 = ["CREATE VIRTUAL TABLE property_fts USING no_such_module(name)"]
+            with patch.object(search_index, "_SQLITE_DDL", without_fts5), \
+                    self.assertLogs("migrations", "WARNING"):
+                applied = upgrade(engine)
+
+            versions = {version for version, _, _ in MIGRATIONS}
+            self.assertEqual(set(applied), versions - {3})
+            self.assertEqual(applied_versions(engine), versions - {3})
+
+            self.assertEqual(upgrade(engine), [3])
+            with engine.connect() as conn:
+                self.assertIsNotNone(conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'property_fts'")).first())
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
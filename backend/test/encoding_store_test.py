@@ -0,0 +1,107 @@
+import unittest
+import tempfile
+import sys
+import os
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import numpy as np
+from fixtures import write_model
+from services.encoding_store import (
+    export_encodings, load_encodings, EncodingTable, ENCODINGS_FILE, ENCODINGS_FORMAT
+)
+from services.forest_engine import ALIGNMENT, _write_aligned_npz
+from services.model_registry import ModelRegistry, MeanEncodings, MEAN_VALUES_FILE, read_mean_values
+
+
+class TestEncodingStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, ENCODINGS_FILE)
+        self.encodings = MeanEncodings(
+            1000.0,
+            {"selangor": 900.0, "johor": 800.0, "kuala lumpur": 1400.0},
+            {f"town {i}": float(i) for i in range(300)},
+            {"petaling": 950.5, "ampang jaya": 1100.25},
+            {},
+        )
+        export_encodings(self.encodings, self.path)
+
+    def test_round_trip(self):
+        """Test every key reads back its value and unknown keys get the default."""
+        loaded = load_encodings(self.path)
+        self.assertEqual(loaded.global_mean, 1000.0)
+        for category in ("state", "town", "district", "type"):
+            expected = getattr(self.encodings, category)
+            table = getattr(loaded, category)
+            self.assertEqual(len(table), len(expected))
+            for key, value in expected.items():
+                self.assertEqual(table.get(key), value)
+            self.assertIsNone(table.get("nowhere"))
+            self.assertEqual(table.get(None, -1.0), -1.0)
+
+    def test_keys_normalized(self):
+        """Test lookups strip and lower-case keys like the training data cleaning, on both sides."""
+        export_encodings(self.encodings._replace(state={" Pulau Pinang ": 700.0, "SABAH": 650.0}), self.path)
+        states = load_encodings(self.path).state
+        self.assertEqual(states.get("pulau pinang"), 700.0)
+        self.assertEqual(states.get("  PULAU PINANG"), 700.0)
+        self.assertIn("Sabah", states)
+        self.assertNotIn("pulau", states)
+
+    def test_non_ascii_keys(self):
+        """Test keys sort and match as UTF-8 bytes."""
+        encodings = self.encodings._replace(town={"zeta": 1.0, "älv": 2.0, "alpha": 3.0})
+        export_encodings(encodings, self.path)
+        towns = load_encodings(self.path).town
+        self.assertEqual([towns.get(k) for k in ("alpha", "zeta", "ÄLV")], [3.0, 1.0, 2.0])
+        self.assertEqual(list(towns.keys), sorted(k.encode() for k in ("zeta", "älv", "alpha")))
+
+    def test_memory_mapped(self):
+        """Test the key and value arrays are aligned read-only maps, and loading without mmap agrees."""
+        towns = load_encodings(self.path).town
+        self.assertIsInstance(towns.keys.base, np.memmap)
+        self.assertEqual(towns.values.ctypes.data % ALIGNMENT, 0)
+        with self.assertRaises(ValueError):
+            towns.values[0] = 1.0
+
+        in_memory = load_encodings(self.path, mmap=False)
+        self.assertNotIsInstance(in_memory.town.keys.base, np.memmap)
+        self.assertEqual(in_memory.town.get("town 42"), 42.0)
+
+    def test_unknown_format_rejected(self):
+        """Test a file written by a newer trainer is refused rather than misread."""
+        with np.load(self.path) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+        arrays["format"] = np.array(ENCODINGS_FORMAT + 1)
+        _write_aligned_npz(self.path, arrays)
+
+        with self.assertRaises(ValueError):
+            load_encodings(self.path)
+
+    def test_registry_prefers_binary_encodings(self):
+        """Test a version with encodings.npz is served from it, and one with only mean_values.txt still loads."""
+        text_only = os.path.join(self.tmp.name, "models", "v1")
+        write_model(text_only, 1200)
+        self.assertIsInstance(ModelRegistry(os.path.join(self.tmp.name, "models")).get().encodings.state, dict)
+
+        binary = os.path.join(self.tmp.name, "models", "v2")
+        write_model(binary, 1200)
+        means_path = os.path.join(binary, MEAN_VALUES_FILE)
+        export_encodings(read_mean_values(means_path), os.path.join(binary, ENCODINGS_FILE))
+        os.remove(means_path)
+
+        bundle = ModelRegistry(os.path.join(self.tmp.name, "models")).get()
+        self.assertEqual(bundle.version, "v2")
+        self.assertIsInstance(bundle.encodings.state, EncodingTable)
+        self.assertEqual(bundle.encodings.state.get("Selangor"), 900.0)
+        self.assertEqual(bundle.encodings.type.get("condominium"), 1500.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+"""Shared helpers for tests that need a real (in-memory) database or a price model."""
+import json
+import sys
+import os
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from flask import Flask
+from database import init_db
+from migrations import upgrade
+from services.model_registry import DEFAULT_FEATURES
+
+
+def create_test_app(**config):
+    """Flask app on a private in-memory SQLite database with all migrations applied."""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    app.config.update(config)
+    init_db(app)
+    with app.app_context():
+        upgrade()
+    return app
+
+
+MEAN_VALUES = """# GLOBAL MEAN
+1000.00
+# STATE MEANS
+selangor: 900.00
+# TOWN MEANS
+# DISTRICT MEANS
+# TYPE MEANS
+condominium: 1500.00
+"""
+
+
+def write_model(directory, price, metadata=True):
+    """A model version directory whose model always predicts `price`."""
+    import joblib
+    import pandas as pd
+    from sklearn.dummy import DummyRegressor
+
+    os.makedirs(directory, exist_ok=True)
+    model = DummyRegressor(strategy="constant", constant=price)
+    model.fit(pd.DataFrame([[0] * len(DEFAULT_FEATURES)], columns=DEFAULT_FEATURES), [price])
+    joblib.dump(model, os.path.join(directory, "price_model.pkl"))
+    with open(os.path.join(directory, "mean_values.txt"), "w", encoding="utf-8") as f:
+        f.write(MEAN_VALUES)
+    if metadata:
+        with open(os.path.join(directory, "metadata.json"), "w", encoding="utf-8") as f:
+            json.dump({"features": DEFAULT_FEATURES}, f)
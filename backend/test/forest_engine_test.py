@@ -0,0 +1,119 @@
+import unittest
+import tempfile
+import sys
+import os
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from fixtures import write_model
+from services.forest_engine import export_forest, load_forest, FOREST_FILE, ALIGNMENT
+from services.model_registry import ModelRegistry, DEFAULT_FEATURES
+
+
+class TestForestEngine(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        cls.X = pd.DataFrame(rng.uniform(0, 3000, (1500, len(DEFAULT_FEATURES))), columns=DEFAULT_FEATURES)
+        y = cls.X["size"] * 0.5 + cls.X["state_mean"] + rng.normal(0, 100, len(cls.X))
+        cls.model = RandomForestRegressor(n_estimators=20, random_state=0).fit(cls.X, y)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, FOREST_FILE)
+        export_forest(self.model, self.path)
+
+    def test_bit_identical_on_training_set(self):
+        """Test predictions equal scikit-learn's exactly, not just approximately."""
+        engine = load_forest(self.path)
+        expected = self.model.predict(self.X)
+        self.assertTrue(np.array_equal(engine.predict(self.X.to_numpy()), expected))
+
+    def test_bit_identical_on_new_and_missing_values(self):
+        """Test unseen values, values on thresholds and NaN follow the same branches as scikit-learn."""
+        engine = load_forest(self.path)
+        rng = np.random.default_rng(1)
+        X = rng.uniform(-100, 4000, (2000, len(DEFAULT_FEATURES)))
+        root = self.model.estimators_[0].tree_
+        X[:200, root.feature[0]] = root.threshold[0]
+        X[::5, 2] = np.nan
+        X[::11, 6] = np.nan
+
+        expected = self.model.predict(pd.DataFrame(X, columns=DEFAULT_FEATURES))
+        self.assertTrue(np.array_equal(engine.predict(X), expected))
+
+    def test_arrays_are_memory_mapped_read_only(self):
+        """Test the node arrays are aligned read-only maps of the file, and loading without mmap agrees."""
+        engine = load_forest(self.path)
+        self.assertIsInstance(engine.value.base, np.memmap)
+        with self.assertRaises(ValueError):
+            engine.value[0] = 1.0
+
+        for name in ("feature", "threshold", "children", "value"):
+            self.assertEqual(getattr(engine, name).ctypes.data % ALIGNMENT, 0, name)
+
+        in_memory = load_forest(self.path, mmap=False)
+        self.assertNotIsInstance(in_memory.value.base, np.memmap)
+        self.assertTrue(np.array_equal(in_memory.predict(self.X.to_numpy()), engine.predict(self.X.to_numpy())))
+        self.assertEqual(engine.feature_names_in_, DEFAULT_FEATURES)
+
+    def test_single_leaf_trees(self):
+        """Test a forest of trees with no splits (constant target)."""
+        model = RandomForestRegressor(n_estimators=3, random_state=0).fit(self.X, np.full(len(self.X), 7.5))
+        export_forest(model, self.path)
+        self.assertTrue(np.array_equal(load_forest(self.path).predict(self.X.to_numpy()[:10]), np.full(10, 7.5)))
+
+    def test_compressed_archive_rejected(self):
+        """Test a compressed .npz is refused instead of silently loaded into memory."""
+        compressed = os.path.join(self.tmp.name, "compressed.npz")
+        with np.load(self.path) as archive:
+            np.savez_compressed(compressed, **{name: archive[name] for name in archive.files})
+
+        with self.assertRaises(ValueError):
+            load_forest(compressed)
+
+    def test_registry_prefers_exported_forest(self):
+        """Test a version with forest.npz is served by the engine with the same predictions."""
+        directory = os.path.join(self.tmp.name, "models", "v1")
+        write_model(directory, 0)
+        joblib.dump(self.model, os.path.join(directory, "price_model.pkl"))
+        export_forest(self.model, os.path.join(directory, FOREST_FILE))
+
+        bundle = ModelRegistry(os.path.join(self.tmp.name, "models")).get()
+        self.assertEqual(type(bundle.model).__name__, "ForestEngine")
+        self.assertEqual(bundle.features, DEFAULT_FEATURES)
+        self.assertTrue(np.array_equal(bundle.model.predict(self.X.to_numpy()), self.model.predict(self.X)))
+
+    def test_pickled_forest_served_by_engine(self):
+        """Test a version with only the pickle still gets the engine, with the same predictions."""
+        directory = os.path.join(self.tmp.name, "models", "v1")
+        write_model(directory, 0)
+        joblib.dump(self.model, os.path.join(directory, "price_model.pkl"))
+
+        bundle = ModelRegistry(os.path.join(self.tmp.name, "models")).get()
+        self.assertEqual(type(bundle.model).__name__, "ForestEngine")
+        self.assertTrue(np.array_equal(bundle.model.predict(self.X.to_numpy()), self.model.predict(self.X)))
+
+    def test_percentiles_of_tree_outputs(self):
+        """Test the bands are percentiles of what each estimator predicts, next to the unchanged mean."""
+        engine = load_forest(self.path)
+        X = self.X.to_numpy()[:50]
+        per_tree = np.column_stack([tree.predict(X.astype(np.float32)) for tree in self.model.estimators_])
+
+        prices, bands = engine.predict_with_percentiles(X, (10, 90))
+        self.assertTrue(np.array_equal(prices, self.model.predict(self.X[:50])))
+        self.assertEqual(bands.shape, (50, 2))
+        self.assertTrue(np.allclose(bands, np.percentile(per_tree, (10, 90), axis=1).T))
+
+
+if __name__ == '__main__':
+    unittest.main()
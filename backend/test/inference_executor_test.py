@@ -0,0 +1,186 @@
+import unittest
+import tempfile
+import threading
+import sys
+import os
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+from fixtures import create_test_app, write_model
+from database import db
+from extension import socketio
+from models.property import Residence
+from services import ai_service, inference_executor
+from services.inference_executor import (
+    InferenceExecutor, InferenceBusyError, InferenceTimeoutError, VersionMismatch
+)
+from services.model_registry import ModelRegistry, DEFAULT_FEATURES
+from services.prediction_cache import PredictionCache
+
+
+class TestInferenceWorkers(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        write_model(os.path.join(cls.tmp.name, "v1"), 1250)
+        cls.executor = InferenceExecutor(cls.tmp.name, workers=1)
+        cls.versions = cls.executor.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+        cls.tmp.cleanup()
+
+    def test_workers_warmed_and_predict(self):
+        """Test each worker loads the model at start and predicts in its own process."""
+        self.assertEqual(self.versions, ["v1"])
+
+        prices, bands = self.executor.predict("v1", np.zeros((3, len(DEFAULT_FEATURES))), (10, 90))
+        self.assertEqual(list(prices), [1250.0] * 3)
+        self.assertIsNone(bands)
+
+    def test_version_mismatch(self):
+        """Test a worker refuses features built for another model version."""
+        with self.assertRaises(VersionMismatch):
+            self.executor.predict("v0", np.zeros((1, len(DEFAULT_FEATURES))), (10, 90))
+
+    def test_predict_through_ai_service(self):
+        """Test ai_service sends cache misses to the workers."""
+        registry = ModelRegistry(self.tmp.name)
+        app = create_test_app()
+        with app.app_context(), \
+                patch.object(ai_service, "registry", registry), \
+                patch.object(ai_service, "prediction_cache", PredictionCache()), \
+                patch.object(ai_service, "inference", self.executor), \
+                patch.object(self.executor, "predict", wraps=self.executor.predict) as worker_predict:
+            prop = Residence(user_id=1, name="Home", type="residence", status="listed", land_size=800)
+            db.session.add(prop)
+            db.session.commit()
+
+            success, result = ai_service.predict(prop.id)
+
+        self.assertTrue(success)
+        self.assertEqual(result["predicted_price"], 1250.0)
+        self.assertEqual(worker_predict.call_count, 1)
+
+    def test_start_inference_config(self):
+        """Test start_inference warms a pool by default, and predicts inline with 0 workers or without fork."""
+        with patch.dict(os.environ, {"INFERENCE_TIMEOUT": "2.5"}), \
+                patch.object(ai_service, "inference", None), \
+                patch.object(InferenceExecutor, "start", return_value=["v1"]) as start:
+            app = create_test_app()
+            ai_service.start_inference(app)
+            self.assertEqual((ai_service.inference.workers, ai_service.inference.timeout), (2, 2.5))
+            start.assert_called_once()
+
+            ai_service.inference = None
+            for config, supported in (({"INFERENCE_WORKERS": 0}, True), ({}, False)):
+                app = create_test_app()
+                app.config.update(config)
+                with patch.object(InferenceExecutor, "supported", return_value=supported):
+                    ai_service.start_inference(app)
+                self.assertIsNone(ai_service.inference)
+            start.assert_called_once()
+
+
+class TestBackpressure(unittest.TestCase):
+    """A thread pool stands in for the processes so the worker function can be held."""
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.executor = InferenceExecutor("unused", workers=1, max_pending=1, timeout=0.05)
+        self.executor._pool = ThreadPoolExecutor(1)
+        self.addCleanup(self.executor._pool.shutdown)
+        self.addCleanup(self.release.set)
+
+        def slow_predict(version, matrix, percentiles):
+            self.release.wait(5)
+            return np.ones(len(matrix)), None
+
+        patcher = patch.object(inference_executor, "_worker_predict", slow_predict)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_timeout_keeps_slot_until_done(self):
+        """Test a timed-out prediction raises, and its slot is only freed once the worker finishes."""
+        with self.assertRaises(InferenceTimeoutError):
+            self.executor.predict("v1", np.zeros((1, 7)), ())
+
+        with self.assertRaises(InferenceBusyError):
+            self.executor.predict("v1", np.zeros((1, 7)), ())
+
+        self.release.set()
+        self.executor._pool.submit(lambda: None).result()  # the held task has finished
+        prices, _ = self.executor.predict("v1", np.zeros((2, 7)), ())
+        self.assertEqual(list(prices), [1.0, 1.0])
+
+    def test_cooperative_wait_yields(self):
+        """Test under an event-loop server the wait yields with socketio.sleep instead of blocking."""
+        sleeps = []
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 3:
+                self.release.set()
+            threading.Event().wait(0.005)
+
+        self.executor.timeout = 5
+        with patch.object(socketio, "async_mode", "eventlet", create=True), \
+                patch.object(socketio, "sleep", fake_sleep):
+            prices, _ = self.executor.predict("v1", np.zeros((1, 7)), ())
+
+        self.assertEqual(list(prices), [1.0])
+        self.assertGreaterEqual(len(sleeps), 3)
+
+
+class TestOverloadResponses(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        write_model(os.path.join(self.tmp.name, "v1"), 1200)
+        for name, value in [("registry", ModelRegistry(self.tmp.name)),
+                            ("prediction_cache", PredictionCache()),
+                            ("inference", MagicMock())]:
+            patcher = patch.object(ai_service, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        from routes.property_route import property_bp
+        self.app = create_test_app()
+        self.app.register_blueprint(property_bp)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            prop = Residence(user_id=1, name="Home", type="residence", status="listed")
+            db.session.add(prop)
+            db.session.commit()
+            self.property_id = prop.id
+
+    def test_busy_and_timeout_statuses(self):
+        """Test a full queue answers 503 with Retry-After and a timeout answers 504, on both endpoints."""
+        ai_service.inference.predict.side_effect = InferenceBusyError("busy")
+        res = self.client.get(f"/property/residence/predict/{self.property_id}")
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res.headers["Retry-After"], "1")
+
+        ai_service.inference.predict.side_effect = InferenceTimeoutError("slow")
+        res = self.client.post("/property/residence/predict/batch", json={"property_ids": [self.property_id]})
+        self.assertEqual(res.status_code, 504)
+
+    def test_version_mismatch_predicts_inline(self):
+        """Test a model swap the workers have not caught up with is answered in the request thread."""
+        ai_service.inference.predict.side_effect = VersionMismatch("v0")
+        res = self.client.get(f"/property/residence/predict/{self.property_id}")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.get_json()["predicted_price"], 1200.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,266 @@
+import unittest
+import subprocess
+import tempfile
+import sys
+import os
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import joblib
+import numpy as np
+import pandas as pd
+from sqlalchemy import event
+from unittest.mock import patch
+from fixtures import create_test_app, write_model
+from database import db
+from models.user import User
+from models.property import Residence
+from services import ai_service
+from services.model_registry import ModelRegistry, ModelUnavailableError, DEFAULT_FEATURES
+from services.prediction_cache import PredictionCache
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.registry = ModelRegistry(self.root, check_interval=0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_loads_on_first_use(self):
+        """Test nothing is loaded until get() is called."""
+        write_model(os.path.join(self.root, "v1"), 1200)
+        self.assertIsNone(self.registry._bundle)
+
+        bundle = self.registry.get()
+        self.assertEqual(bundle.version, "v1")
+        self.assertEqual(bundle.encodings.state["selangor"], 900.0)
+        self.assertIs(self.registry.get(), bundle)
+
+    def test_newest_complete_version_is_active(self):
+        """Test the newest directory wins, but only once its metadata.json exists."""
+        write_model(os.path.join(self.root, "v1"), 1200)
+        write_model(os.path.join(self.root, "v2"), 1300, metadata=False)
+        self.assertEqual(self.registry.get().version, "v1")
+
+        write_model(os.path.join(self.root, "v2"), 1300)
+        bundle = self.registry.get()
+        self.assertEqual(bundle.version, "v2")
+        self.assertEqual(bundle.model.predict(pd.DataFrame([[0] * 7], columns=DEFAULT_FEATURES))[0], 1300)
+
+    def test_current_pointer_selects_version(self):
+        """Test CURRENT can pin (or roll back to) an older version."""
+        write_model(os.path.join(self.root, "v1"), 1200)
+        write_model(os.path.join(self.root, "v2"), 1300)
+        with open(os.path.join(self.root, "CURRENT"), "w", encoding="utf-8") as f:
+            f.write("v1\n")
+
+        self.assertEqual(self.registry.get().version, "v1")
+
+    def test_swap_listeners_and_check_interval(self):
+        """Test listeners see each swap and no new version is looked for within the interval."""
+        swaps = []
+        self.registry.on_swap(lambda old, new: swaps.append((old and old.version, new.version)))
+        write_model(os.path.join(self.root, "v1"), 1200)
+        self.registry.get()
+
+        self.registry.check_interval = 3600
+        write_model(os.path.join(self.root, "v2"), 1300)
+        self.assertEqual(self.registry.get().version, "v1")
+
+        self.registry.check_interval = 0
+        self.assertEqual(self.registry.get().version, "v2")
+        self.assertEqual(swaps, [(None, "v1"), ("v1", "v2")])
+
+    def test_broken_version_keeps_previous(self):
+        """Test a version that fails to load does not replace the one being served."""
+        write_model(os.path.join(self.root, "v1"), 1200)
+        self.registry.get()
+
+        broken = os.path.join(self.root, "v2")
+        write_model(broken, 1300)
+        with open(os.path.join(broken, "price_model.pkl"), "wb") as f:
+            f.write(b"not a pickle")
+
+        self.assertEqual(self.registry.get().version, "v1")
+
+    def test_legacy_layout_and_missing_model(self):
+        """Test the flat ai_model/ layout loads as 'legacy', and an empty directory raises."""
+        with self.assertRaises(ModelUnavailableError):
+            self.registry.get()
+
+        write_model(self.root, 1100, metadata=False)
+        bundle = self.registry.get()
+        self.assertEqual(bundle.version, "legacy")
+        self.assertEqual(bundle.features, DEFAULT_FEATURES)
+
+    def test_import_does_not_load_ml_libraries(self):
+        """Test importing the routes does not import joblib or pandas."""
+        code = ("import sys; import routes.property_route; "
+                "print('joblib' in sys.modules, 'pandas' in sys.modules)")
+        out = subprocess.run([sys.executable, "-c", code], cwd=parent_dir,
+                             capture_output=True, text=True, check=True).stdout
+        self.assertEqual(out.split(), ["False", "False"])
+
+
+class TestPredictRoute(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(self.tmp.name, check_interval=0)
+        for name, value in [("registry", self.registry), ("prediction_cache", PredictionCache())]:
+            patcher = patch.object(ai_service, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        from routes.property_route import property_bp
+        self.app = create_test_app()
+        self.app.register_blueprint(property_bp)
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            owner = User(uid="owner", email="o@x", username="owner")
+            db.session.add(owner)
+            db.session.flush()
+            prop = Residence(user_id=owner.id, name="Home", type="residence", status="listed",
+                             state="Selangor", residence_type="Condominium",
+                             land_size=900, num_bedrooms=3, num_bathrooms=2)
+            db.session.add(prop)
+            db.session.commit()
+            self.property_id = prop.id
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_predict_reports_model_version(self):
+        """Test the response carries the price and the version that produced it."""
+        write_model(os.path.join(self.tmp.name, "v1"), 1200)
+        res = self.client.get(f"/property/residence/predict/{self.property_id}")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.get_json(), {"property_id": self.property_id, "predicted_price": 1200.0,
+                                          "price_band": None, "model_version": "v1"})
+
+        write_model(os.path.join(self.tmp.name, "v2"), 1300)
+        res = self.client.get(f"/property/residence/predict/{self.property_id}")
+        self.assertEqual(res.get_json()["model_version"], "v2")
+
+    def test_features_use_encodings(self):
+        """Test categories are lowercased and unknown ones fall back to the global mean."""
+        write_model(os.path.join(self.tmp.name, "v1"), 1200)
+        with self.app.app_context():
+            prop = db.session.get(Residence, self.property_id)
+            row = ai_service.build_features(prop, self.registry.get().encodings)
+
+        self.assertEqual(row["state_mean"], 900.0)
+        self.assertEqual(row["type_mean"], 1500.0)
+        self.assertEqual(row["town_mean"], 1000.0)
+
+    def add_residence(self, **fields):
+        with self.app.app_context():
+            prop = Residence(user_id=1, name="Unit", type="residence", status="listed", **fields)
+            db.session.add(prop)
+            db.session.commit()
+            return prop.id
+
+    def test_batch_prices_keyed_by_id(self):
+        """Test one batch call returns a price per residence and lists unknown ids."""
+        write_model(os.path.join(self.tmp.name, "v1"), 1200)
+        other_id = self.add_residence(state="Johor", land_size=700, num_bedrooms=2, num_bathrooms=1)
+
+        res = self.client.post("/property/residence/predict/batch",
+                               json={"property_ids": [self.property_id, other_id, 999, other_id]})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.get_json(), {
+            "predictions": {str(self.property_id): 1200.0, str(other_id): 1200.0},
+            "price_bands": {str(self.property_id): None, str(other_id): None},
+            "not_found": [999],
+            "model_version": "v1",
+        })
+
+    def test_batch_matches_single_predictions(self):
+        """Test the feature matrix gives the same prices as predicting one property at a time."""
+        from sklearn.ensemble import RandomForestRegressor
+
+        directory = os.path.join(self.tmp.name, "v1")
+        write_model(directory, 0)
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.uniform(0, 2000, (200, len(DEFAULT_FEATURES))), columns=DEFAULT_FEATURES)
+        model = RandomForestRegressor(n_estimators=5, random_state=0).fit(X, X["size"] + X["state_mean"])
+        joblib.dump(model, os.path.join(directory, "price_model.pkl"))
+
+        ids = [self.property_id] + [
+            self.add_residence(state="Selangor", city="Ampang", land_size=300 + 100 * i,
+                               num_bedrooms=i % 4, num_bathrooms=1 + i % 2, residence_type="Condominium")
+            for i in range(5)
+        ] + [self.add_residence()]  # no details at all
+
+        with self.app.app_context():
+            _, batch = ai_service.predict_batch(ids)
+            for pid in ids:
+                _, single = ai_service.predict(pid)
+                self.assertEqual(single["predicted_price"], batch["predictions"][pid])
+
+    def test_price_bands_for_forests(self):
+        """Test forest models report ordered percentile bands in both endpoints, from the cache as well."""
+        from sklearn.ensemble import RandomForestRegressor
+
+        directory = os.path.join(self.tmp.name, "v1")
+        write_model(directory, 0)
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.uniform(0, 2000, (300, len(DEFAULT_FEATURES))), columns=DEFAULT_FEATURES)
+        y = X["size"] + rng.normal(0, 200, len(X))
+        joblib.dump(RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y),
+                    os.path.join(directory, "price_model.pkl"))
+
+        single = self.client.get(f"/property/residence/predict/{self.property_id}").get_json()
+        band = single["price_band"]
+        self.assertEqual(list(band), ["p10", "p25", "p75", "p90"])
+        self.assertTrue(band["p10"] <= band["p25"] <= band["p75"] <= band["p90"])
+
+        batch = self.client.post("/property/residence/predict/batch",
+                                 json={"property_ids": [self.property_id]}).get_json()
+        self.assertEqual(batch["price_bands"][str(self.property_id)], band)
+        self.assertEqual(batch["predictions"][str(self.property_id)], single["predicted_price"])
+
+    def test_batch_uses_one_query(self):
+        """Test the residences are read with a single SELECT."""
+        write_model(os.path.join(self.tmp.name, "v1"), 1200)
+        ids = [self.add_residence(land_size=500) for _ in range(10)]
+
+        statements = []
+        with self.app.app_context():
+            listener = lambda conn, cursor, statement, *args: statements.append(statement)
+            event.listen(db.engine, "before_cursor_execute", listener)
+            try:
+                _, result = ai_service.predict_batch(ids)
+            finally:
+                event.remove(db.engine, "before_cursor_execute", listener)
+
+        self.assertEqual(len(result["predictions"]), 10)
+        self.assertEqual(len(statements), 1)
+
+    def test_batch_validation(self):
+        """Test the batch endpoint rejects bad or oversized id lists."""
+        write_model(os.path.join(self.tmp.name, "v1"), 1200)
+        for body in [{}, {"property_ids": []}, {"property_ids": ["1"]}, {"property_ids": 1},
+                     {"property_ids": list(range(ai_service.MAX_BATCH_PREDICT + 1))}]:
+            res = self.client.post("/property/residence/predict/batch", json=body)
+            self.assertEqual(res.status_code, 400, body)
+
+    def test_missing_model_and_property(self):
+        """Test 503 without an installed model and 404 for an unknown property."""
+        res = self.client.get(f"/property/residence/predict/{self.property_id}")
+        self.assertEqual(res.status_code, 503)
+
+        write_model(os.path.join(self.tmp.name, "v1"), 1200)
+        res = self.client.get("/property/residence/predict/999")
+        self.assertEqual(res.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+import sys
+import os
+from datetime import datetime
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from fixtures import create_test_app
+from database import db
+from models.user import User
+from models.property import Residence
+from pagination import encode_cursor, decode_cursor, clear_count_cache, CURSOR_ID, CURSOR_NUMBER, CURSOR_TIMESTAMP
+from services import property_service
+
+
+class TestKeysetPagination(unittest.TestCase):
+
+    def setUp(self):
+        clear_count_cache()
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        owner = User(uid="owner", email="o@x", username="owner")
+        db.session.add(owner)
+        db.session.flush()
+        for i in range(45):
+            db.session.add(Residence(
+                user_id=owner.id, name=f"Home {i}", type="residence",
+                status="listed" if i % 3 else "unlisted", state="johor", price=1000 + i
+            ))
+        db.session.commit()
+        self.listed = Residence.query.filter_by(status="listed").count()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def test_cursor_roundtrip_and_invalid_cursor(self):
+        """Test cursors decode to their key and malformed ones are rejected."""
+        self.assertEqual(decode_cursor(encode_cursor([42]), (CURSOR_ID,)), [42])
+        self.assertIsNone(decode_cursor("", (CURSOR_ID,)))
+        with self.assertRaises(ValueError):
+            decode_cursor("not-a-cursor", (CURSOR_ID,))
+        with self.assertRaises(ValueError):
+            decode_cursor(encode_cursor([1, 2]), (CURSOR_ID,))
+
+    def test_cursor_value_types_checked(self):
+        """Test each key value must match its kind: an int id, a finite number, an ISO timestamp."""
+        self.assertEqual(decode_cursor(encode_cursor([0.75, 3]), (CURSOR_NUMBER, CURSOR_ID)), [0.75, 3])
+        self.assertEqual(decode_cursor(encode_cursor(["2026-01-02T03:04:05", 3]), (CURSOR_TIMESTAMP, CURSOR_ID)),
+                         [datetime(2026, 1, 2, 3, 4, 5), 3])
+
+        for values, kinds in [
+            (["42"], (CURSOR_ID,)),
+            ([True], (CURSOR_ID,)),
+            ([1.5], (CURSOR_ID,)),
+            ([None, 3], (CURSOR_NUMBER, CURSOR_ID)),
+            (["0.5", 3], (CURSOR_NUMBER, CURSOR_ID)),
+            ([float("nan"), 3], (CURSOR_NUMBER, CURSOR_ID)),
+            (["yesterday", 3], (CURSOR_TIMESTAMP, CURSOR_ID)),
+            ([1700000000, 3], (CURSOR_TIMESTAMP, CURSOR_ID)),
+            ([{"id": 1}], (CURSOR_ID,)),
+        ]:
+            with self.subTest(values=values), self.assertRaises(ValueError):
+                decode_cursor(encode_cursor(values), kinds)
+
+    def walk_summaries(self, **location):
+        """(ids in offset page order, ids in cursor walk order, cursor-mode length)."""
+        offset_ids = []
+        page = 1
+        while True:
+            summaries, _, _ = property_service.get_residence_summaries(user_id=None, page=page, **location)
+            if not summaries:
+                break
+            offset_ids += [s["id"] for s in summaries]
+            page += 1
+
+        cursor_ids = []
+        cursor = ""
+        while cursor is not None:
+            summaries, length, cursor = property_service.get_residence_summaries(
+                user_id=None, page=1, cursor=cursor, **location
+            )
+            cursor_ids += [s["id"] for s in summaries]
+        return offset_ids, cursor_ids, length
+
+    def test_summaries_cursor_walk_matches_offset_pages(self):
+        """Test walking with cursors returns every listed residence once, in offset order."""
+        offset_ids, cursor_ids, length = self.walk_summaries(state="johor")
+
+        self.assertEqual(cursor_ids, offset_ids)
+        self.assertEqual(len(cursor_ids), self.listed)
+        self.assertEqual(length, self.listed)
+
+    def test_summaries_cursor_walk_with_mixed_ranks(self):
+        """Test rows missing a city or district, which rank higher when those filters are None, keep offset order."""
+        for i, prop in enumerate(Residence.query.order_by(Residence.id).all()):
+            prop.city = "muar" if i % 2 else None
+            prop.district = "muar" if i % 4 == 1 else None
+        db.session.commit()
+
+        offset_ids, cursor_ids, _ = self.walk_summaries(state="johor")
+        self.assertEqual(cursor_ids, offset_ids)
+        self.assertEqual(len(cursor_ids), self.listed)
+        self.assertNotEqual(offset_ids, sorted(offset_ids, reverse=True))
+
+        offset_ids, cursor_ids, _ = self.walk_summaries(state="johor", city="muar")
+        self.assertEqual(cursor_ids, offset_ids)
+
+    def test_search_cursor_uses_cached_total_unless_requested(self):
+        """Test the cursor-mode total is cached, and exact when include_total is set."""
+        success, first = property_service.search_residences(cursor="", per_page=10)
+        self.assertTrue(success)
+        self.assertEqual(first["total"], self.listed)
+        self.assertTrue(first["total_cached"])
+
+        owner_id = User.query.first().id
+        db.session.add(Residence(user_id=owner_id, name="New", type="residence", status="listed"))
+        db.session.commit()
+
+        _, cached = property_service.search_residences(cursor=first["next_cursor"], per_page=10)
+        _, exact = property_service.search_residences(cursor=first["next_cursor"], per_page=10, include_total=True)
+
+        self.assertEqual(cached["total"], self.listed)
+        self.assertEqual(exact["total"], self.listed + 1)
+        self.assertFalse(exact["total_cached"])
+        self.assertTrue(set(r["id"] for r in first["results"]).isdisjoint(r["id"] for r in cached["results"]))
+
+    def test_search_invalid_cursor(self):
+        success, message = property_service.search_residences(cursor="%%%")
+        self.assertFalse(success)
+        self.assertEqual(message, "Invalid cursor")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import tempfile
+import time
+import sys
+import os
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from unittest.mock import patch
+from fixtures import create_test_app, write_model
+from database import db
+from models.property import Property, Residence
+from services import ai_service
+from services.model_registry import ModelRegistry
+from services.prediction_cache import PredictionCache
+
+
+class TestPredictionCache(unittest.TestCase):
+
+    def test_lru_eviction_and_stats(self):
+        """Test the least recently used entry is evicted and lookups are counted."""
+        cache = PredictionCache(max_entries=2)
+        a, b, c = (cache.make_key("v1", [n, 1, None]) for n in (1, 2, 3))
+        cache.put(a, 100.0)
+        cache.put(b, 200.0)
+        self.assertEqual(cache.get(a), 100.0)   # a is now the most recent
+        cache.put(c, 300.0)
+
+        self.assertIsNone(cache.get(b))
+        self.assertEqual(cache.get(c), 300.0)
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["hits"], stats["misses"], stats["evictions"]), (2, 2, 1, 1))
+
+    def test_entries_expire(self):
+        """Test an entry older than the TTL is a miss."""
+        cache = PredictionCache(ttl=60)
+        key = cache.make_key("v1", [1])
+        cache.put(key, 100.0)
+
+        with patch("services.prediction_cache.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_keys_normalize_numbers(self):
+        """Test ints and floats of the same value share a key, and the version is part of it."""
+        cache = PredictionCache()
+        self.assertEqual(cache.make_key("v1", [3, None]), cache.make_key("v1", [3.0, None]))
+        self.assertNotEqual(cache.make_key("v1", [3]), cache.make_key("v2", [3]))
+
+
+class TestPredictionCaching(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.registry = ModelRegistry(self.tmp.name, check_interval=0)
+        self.registry.on_swap(ai_service._clear_predictions_on_swap)
+        self.cache = PredictionCache()
+        for name, value in [("registry", self.registry), ("prediction_cache", self.cache)]:
+            patcher = patch.object(ai_service, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        write_model(os.path.join(self.tmp.name, "v1"), 1200)
+
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.addCleanup(self.ctx.pop)
+        self.addCleanup(db.session.remove)
+
+        prop = Residence(user_id=1, name="Home", type="residence", status="listed",
+                         state="Selangor", land_size=900, num_bedrooms=3, num_bathrooms=2)
+        twin = Residence(user_id=1, name="Twin", type="residence", status="listed",
+                         state="selangor", land_size=900.0, num_bedrooms=3, num_bathrooms=2)
+        db.session.add_all([prop, twin])
+        db.session.commit()
+        self.property_id, self.twin_id = prop.id, twin.id
+
+    def test_repeat_predictions_hit(self):
+        """Test the model runs once for repeated requests and for a property with the same features."""
+        with patch.object(ai_service, "feature_matrix", wraps=ai_service.feature_matrix) as matrix:
+            for _ in range(3):
+                ai_service.predict(self.property_id)
+            ai_service.predict(self.twin_id)
+
+        self.assertEqual(matrix.call_count, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (3, 1))
+
+    def test_feature_edit_invalidates(self):
+        """Test Property.update drops the entry when a feature column changes, but not for other edits."""
+        ai_service.predict(self.property_id)
+
+        Property.update(self.property_id, title="Renovated")
+        self.assertEqual(self.cache.stats()["entries"], 1)
+
+        Property.update(self.property_id, num_bedrooms=4)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+        self.assertEqual(self.cache.invalidations, 1)
+
+        ai_service.predict(self.property_id)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_model_swap_clears(self):
+        """Test a new model version empties the cache and its prices are served."""
+        self.assertEqual(ai_service.predict(self.property_id)[1]["predicted_price"], 1200.0)
+
+        write_model(os.path.join(self.tmp.name, "v2"), 1300)
+        _, result = ai_service.predict(self.property_id)
+
+        self.assertEqual(result, {"predicted_price": 1300.0, "price_band": None, "model_version": "v2"})
+        self.assertEqual(self.cache.stats()["entries"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+import re
+import tempfile
+import sys
+import os
+from datetime import date, timedelta
+
+from sqlalchemy import event
+from unittest.mock import patch
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from fixtures import create_test_app, write_model
+from database import db
+from models.user import User
+from models.property import Property, Residence
+from models.message import Message
+from models.channel import Channel
+from models.favourite import Favourite
+from models.request import Request
+from models.lease import Lease
+from models.tenant_record import TenantRecord
+from services import ai_service, chat_service, property_service, rent_service, tenant_record_service
+from services.model_registry import ModelRegistry
+from services.prediction_cache import PredictionCache
+
+# "SCAN <table>" without "USING ... INDEX" is a full table scan
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+class TestHotQueryPlans(unittest.TestCase):
+    """Run the hot queries and fail if SQLite plans any of them as a full table scan."""
+
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self._seed()
+
+        self.statements = []
+        event.listen(db.engine, "before_cursor_execute", self._capture)
+
+    def tearDown(self):
+        event.remove(db.engine, "before_cursor_execute", self._capture)
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+
+    def _capture(self, conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            self.statements.append((statement, parameters))
+
+    def _seed(self):
+        owner = User(uid="owner", email="o@x", username="owner")
+        tenant = User(uid="tenant", email="t@x", username="tenant")
+        db.session.add_all([owner, tenant])
+        db.session.flush()
+
+        residence = Residence(user_id=owner.id, name="Home", type="residence", status="listed",
+                              state="johor", city="bandar", district="district")
+        db.session.add(residence)
+        db.session.flush()
+
+        channel = Channel(property_id=residence.id, tenant_id=tenant.id)
+        db.session.add(channel)
+        db.session.flush()
+        db.session.add(Message(sender_id=tenant.id, channel_id=channel.id, message_body="hi", type="text"))
+
+        start = date.today() - timedelta(days=400)
+        request = Request(property_id=residence.id, tenant_id=tenant.id, start_date=start,
+                          end_date=start + timedelta(days=365), status="completed")
+        db.session.add(request)
+        db.session.flush()
+
+        lease = Lease(property_id=residence.id, tenant_id=tenant.id, request_id=request.id,
+                      start_date=start, end_date=start + timedelta(days=365), monthly_rent=1000,
+                      channel_id=channel.id, status="active")
+        db.session.add(lease)
+        db.session.add(Favourite(user_id=tenant.id, property_id=residence.id))
+        db.session.commit()
+
+        self.owner_id, self.tenant_id = owner.id, tenant.id
+        self.property_id, self.channel_id, self.lease_id = residence.id, channel.id, lease.id
+
+    def assertNoFullScan(self):
+        self.assertTrue(self.statements, "no queries were captured")
+        raw = db.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            for statement, parameters in self.statements:
+                plan = cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+                details = [row[-1] for row in plan]
+                for detail in details:
+                    match = FULL_SCAN.match(detail)
+                    # Subquery aliases (anon_1, ...) are not tables
+                    self.assertFalse(
+                        match and match.group(1) in db.metadata.tables,
+                        f"full table scan:\n{statement}\nplan: {details}"
+                    )
+        finally:
+            raw.close()
+
+    def test_find_by_location(self):
+        Property.find_by_location(state="johor", city="bandar", district="district")
+        Property.find_by_location(state="johor")
+        Property.find_by_location()
+        Property.find_by_location_after(state="johor", after=[3, 100])
+        self.assertNoFullScan()
+
+    def test_search_residences(self):
+        property_service.search_residences(query="home", state="johor", min_price=100)
+        self.assertNoFullScan()
+
+    def test_messages_by_channel(self):
+        Message.get_messages_by_channel(self.channel_id, limit=20, offset=0)
+        self.assertNoFullScan()
+
+    def test_user_channels(self):
+        chat_service.get_user_channels(self.tenant_id)
+        chat_service.get_user_channels(self.owner_id)
+        self.assertNoFullScan()
+
+    def test_request_lookups(self):
+        rent_service.check_existing_pending_request(self.tenant_id, self.property_id)
+        Request.query.filter_by(property_id=self.property_id, status="pending").all()
+        Request.query.filter_by(tenant_id=self.tenant_id).all()
+        self.assertNoFullScan()
+
+    def test_tenant_records_and_daily_tasks(self):
+        tenant_record_service.process_daily_tasks()
+        TenantRecord.find_by_lease(self.lease_id)
+        self.assertNoFullScan()
+
+    def test_suggested_price_refresh(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_model(os.path.join(tmp, "v1"), 1200)
+            with patch.object(ai_service, "registry", ModelRegistry(tmp)), \
+                    patch.object(ai_service, "prediction_cache", PredictionCache()):
+                ai_service.refresh_suggested_prices()
+        self.assertNoFullScan()
+
+    def test_favourites(self):
+        Favourite.get_favourites_by_user(self.tenant_id)
+        Favourite.query.filter_by(property_id=self.property_id).all()
+        self.assertNoFullScan()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from datetime import date, datetime, timedelta
+import sys
+import os
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from sqlalchemy.exc import IntegrityError
+from fixtures import create_test_app
+from database import db
+from models.lease import Lease
+from models.tenant_record import TenantRecord
+from models.scheduler_lock import SchedulerLock
+from services import tenant_record_service
+import scheduler
+
+
+class TestSchedulerLock(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def test_only_one_owner_until_expiry(self):
+        """Test a held lock is refused to others, renewed by its owner and taken over once expired."""
+        self.assertTrue(SchedulerLock.acquire("jobs", "worker-a", 60))
+        self.assertFalse(SchedulerLock.acquire("jobs", "worker-b", 60))
+        self.assertTrue(SchedulerLock.acquire("jobs", "worker-a", 60))
+
+        db.session.execute(db.update(SchedulerLock).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        db.session.commit()
+
+        self.assertTrue(SchedulerLock.acquire("jobs", "worker-b", 60))
+        self.assertFalse(SchedulerLock.acquire("jobs", "worker-a", 60))
+
+    def test_release(self):
+        """Test releasing lets another worker take the lock at once; others cannot release it."""
+        SchedulerLock.acquire("jobs", "worker-a", 60)
+        SchedulerLock.release("jobs", "worker-b")
+        self.assertFalse(SchedulerLock.acquire("jobs", "worker-b", 60))
+
+        SchedulerLock.release("jobs", "worker-a")
+        self.assertTrue(SchedulerLock.acquire("jobs", "worker-b", 60))
+
+    def test_job_runs_on_leader_only(self):
+        """Test two workers sharing the database run the job once per interval."""
+        self.ctx.pop()
+        job = MagicMock()
+        try:
+            with patch.object(scheduler, "WORKER_ID", "worker-a"):
+                self.assertTrue(scheduler.run_if_leader(self.app, job))
+            with patch.object(scheduler, "WORKER_ID", "worker-b"):
+                self.assertFalse(scheduler.run_if_leader(self.app, job))
+            with patch.object(scheduler, "WORKER_ID", "worker-a"):
+                self.assertTrue(scheduler.run_if_leader(self.app, job))
+        finally:
+            self.ctx.push()
+
+        self.assertEqual(job.call_count, 2)
+
+    def test_lock_outlives_interval(self):
+        """Test the lock lasts several intervals, so the holder renews it before anyone can take it."""
+        self.ctx.pop()
+        try:
+            with patch.object(scheduler, "WORKER_ID", "worker-a"):
+                scheduler.run_if_leader(self.app, MagicMock(), "jobs", interval=20)
+        finally:
+            self.ctx.push()
+
+        lock = db.session.get(SchedulerLock, "jobs")
+        self.assertAlmostEqual((lock.expires_at - datetime.utcnow()).total_seconds(),
+                               scheduler.LOCK_TTL_INTERVALS * 20, delta=5)
+
+    def test_heartbeat_renews_until_taken_over(self):
+        """Test a long job renews its lock through the heartbeat and learns when it was taken over."""
+        beats = []
+
+        def job(heartbeat):
+            beats.append(heartbeat())
+            db.session.execute(db.update(SchedulerLock).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+            db.session.commit()
+            SchedulerLock.acquire("jobs", "worker-b", 60)
+            beats.append(heartbeat())
+
+        self.ctx.pop()
+        try:
+            with patch.object(scheduler, "WORKER_ID", "worker-a"):
+                self.assertTrue(scheduler.run_if_leader(self.app, job, "jobs", heartbeat=True))
+        finally:
+            self.ctx.push()
+
+        self.assertEqual(beats, [True, False])
+
+
+class TestUniqueTenantRecords(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        lease = Lease(property_id=1, tenant_id=1, start_date=date(2024, 1, 1),
+                      end_date=date(2025, 1, 1), monthly_rent=1000, status="active")
+        db.session.add(lease)
+        db.session.commit()
+        self.lease_id = lease.id
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def add_record(self, month, status="unpaid"):
+        day = date.fromisoformat(f"{month}-01")
+        db.session.add(TenantRecord(lease_id=self.lease_id, month=month, start_date=day,
+                                    due_date=day + timedelta(days=3), status=status))
+
+    def test_duplicate_month_rejected(self):
+        """Test the database refuses a second record for the same lease and month."""
+        self.add_record("2024-01")
+        self.add_record("2024-01")
+        with self.assertRaises(IntegrityError):
+            db.session.commit()
+
+    def test_daily_tasks_skip_months_created_concurrently(self):
+        """Test a month already created by another process is skipped instead of failing the run."""
+        # Another scheduler inserted January after our record count was read
+        self.add_record("2024-01")
+        db.session.commit()
+        with patch('services.tenant_record_service._record_summary', return_value={self.lease_id: (0, None)}):
+            created = tenant_record_service.generate_missing_records(
+                tenant_record_service.due_leases(date(2024, 2, 10)), date(2024, 2, 10)
+            )
+        db.session.commit()
+
+        self.assertEqual(created, 1)
+        months = [r.month for r in TenantRecord.query.order_by(TenantRecord.month)]
+        self.assertEqual(months, ["2024-01", "2024-02"])
+
+    def test_migration_removes_duplicates(self):
+        """Test the migration keeps the paid duplicate and then enforces uniqueness."""
+        from migrations import scheduler_lock_and_unique_records
+
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX uq_tenant_records_lease_month")
+        self.add_record("2024-01", status="unpaid")
+        self.add_record("2024-01", status="paid")
+        self.add_record("2024-02", status="unpaid")
+        db.session.commit()
+
+        with db.engine.begin() as conn:
+            scheduler_lock_and_unique_records(conn)
+
+        rows = [(r.month, r.status) for r in TenantRecord.query.order_by(TenantRecord.month)]
+        self.assertEqual(rows, [("2024-01", "paid"), ("2024-02", "unpaid")])
+
+        self.add_record("2024-02")
+        with self.assertRaises(IntegrityError):
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import sys
+import os
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from fixtures import create_test_app
+from database import db
+from models.user import User
+from models.property import Property, Residence
+from services import property_service
+import search_index
+
+
+class TestFullTextSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        owner = User(uid="owner", email="o@x", username="owner")
+        db.session.add(owner)
+        db.session.commit()
+        self.owner_id = owner.id
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def add(self, name, title=None, description=None, status="listed"):
+        residence = Residence.create_residence(user_id=self.owner_id, name=name, title=title,
+                                               description=description, status=status)
+        return residence.id
+
+    def search_ids(self, query, **kwargs):
+        success, data = property_service.search_residences(query=query, **kwargs)
+        self.assertTrue(success)
+        return [r["id"] for r in data["results"]]
+
+    def test_index_is_installed(self):
+        self.assertTrue(search_index.is_available())
+
+    def test_prefix_match_and_relevance_order(self):
+        """Test tokens match as prefixes and name matches outrank description matches."""
+        in_description = self.add("Quiet flat", description="close to the seaside promenade")
+        in_name = self.add("Seaside villa", description="large garden")
+        self.add("City loft", description="near the station")
+
+        self.assertEqual(self.search_ids("seasi"), [in_name, in_description])
+        self.assertEqual(self.search_ids("seaside garden"), [in_name])
+
+    def test_index_follows_update_list_and_unlist(self):
+        """Test edits and status changes are reflected in search results."""
+        property_id = self.add("Old name")
+        self.assertEqual(self.search_ids("old"), [property_id])
+
+        Property.update(property_id, name="Renamed cottage")
+        self.assertEqual(self.search_ids("old"), [])
+        self.assertEqual(self.search_ids("cottage"), [property_id])
+
+        success, _ = property_service.unlist_property(property_id)
+        self.assertTrue(success)
+        self.assertEqual(self.search_ids("cottage"), [])
+
+        success, _ = property_service.list_property(property_id, 1500, None)
+        self.assertTrue(success)
+        self.assertEqual(self.search_ids("cottage"), [property_id])
+
+    def test_unlisted_residences_are_not_indexed(self):
+        self.add("Hidden house", status="unlisted")
+        self.assertEqual(self.search_ids("hidden"), [])
+
+    def test_ranked_cursor_walk_returns_each_match_once(self):
+        expected = {self.add(f"Garden home {i}", description="garden " * (i % 4)) for i in range(25)}
+
+        seen = []
+        cursor = ""
+        while cursor is not None:
+            success, data = property_service.search_residences(query="garden", cursor=cursor, per_page=7)
+            self.assertTrue(success)
+            seen += [r["id"] for r in data["results"]]
+            cursor = data["next_cursor"]
+
+        self.assertEqual(len(seen), len(expected))
+        self.assertEqual(set(seen), expected)
+
+    def test_ilike_fallback_when_disabled(self):
+        property_id = self.add("Condominium suite")
+        self.app.config["FULL_TEXT_SEARCH"] = False
+        self.assertEqual(self.search_ids("ondo"), [property_id])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,238 @@
+import unittest
+import tempfile
+import importlib.util
+import io
+import sys
+import os
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from unittest.mock import patch
+from flask import Flask
+from werkzeug.datastructures import FileStorage
+from routes.file_route import file_bp
+from services import storage
+from services.file_service import upload_file
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+UUID_NAME = "0b7e2c55-3f4e-4c1a-9d2b-5a8f6e7d9c10.png"
+YEAR = 365 * 24 * 3600
+
+
+def create_app(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+    app.register_blueprint(file_bp)
+    return app
+
+
+def upload(app, name="photo.png"):
+    with app.app_context():
+        return upload_file(FileStorage(io.BytesIO(PNG), filename=name, content_type="image/png"),
+                           "properties/7", name)
+
+
+class TestLocalStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.app = create_app(UPLOAD_FOLDER=self.tmp.name, STORAGE_BACKEND="local")
+
+    def test_upload_served_by_flask(self):
+        """Test the stored URL is unchanged and served from UPLOAD_FOLDER, inline or as attachment."""
+        url = upload(self.app)
+        self.assertEqual(url, "/uploads/properties/7/photo.png")
+        with open(os.path.join(self.tmp.name, "properties", "7", "photo.png"), "rb") as f:
+            self.assertEqual(f.read(), PNG)
+
+        client = self.app.test_client()
+        response = client.get(url)
+        self.assertEqual((response.status_code, response.data), (200, PNG))
+        response.close()
+        response = client.get(url + "?download=true")
+        self.assertIn("attachment", response.headers["Content-Disposition"])
+        response.close()
+        self.assertEqual(client.get("/uploads/properties/7/missing.png").status_code, 404)
+
+    def test_uuid_names_cached_as_immutable(self):
+        """Test UUID-named files are cached for a year without revalidation, other names revalidate."""
+        client = self.app.test_client()
+        response = client.get(upload(self.app, UUID_NAME))
+        self.assertEqual((response.cache_control.max_age, response.cache_control.public,
+                          response.cache_control.immutable), (YEAR, True, True))
+        response.close()
+
+        response = client.get(upload(self.app, "channel1_20260101.png"))
+        self.assertTrue(response.cache_control.no_cache)
+        self.assertFalse(response.cache_control.immutable)
+        response.close()
+
+    def test_revalidation_and_ranges(self):
+        """Test a matching strong ETag answers 304 and a byte range answers 206 with just those bytes."""
+        url = upload(self.app, "contract.pdf")
+        client = self.app.test_client()
+        response = client.get(url)
+        etag, weak = response.get_etag()
+        self.assertFalse(weak)
+        response.close()
+
+        self.assertEqual(client.get(url, headers={"If-None-Match": f'"{etag}"'}).status_code, 304)
+        response = client.get(url, headers={"Range": "bytes=0-7"})
+        self.assertEqual((response.status_code, response.data), (206, PNG[:8]))
+        self.assertEqual(response.headers["Content-Range"], f"bytes 0-7/{len(PNG)}")
+        response.close()
+
+    def test_sendfile_modes_hand_off_to_proxy(self):
+        """Test X-Accel-Redirect and X-Sendfile responses carry headers only, and missing files still 404."""
+        url = upload(self.app, UUID_NAME)
+
+        accel = create_app(UPLOAD_FOLDER=self.tmp.name, MEDIA_SENDFILE="x-accel-redirect")
+        response = accel.test_client().get(url + "?download=true")
+        self.assertEqual(response.headers["X-Accel-Redirect"], "/protected-uploads/properties/7/" + UUID_NAME)
+        self.assertEqual((response.data, response.mimetype), (b"", "image/png"))
+        self.assertIn("attachment", response.headers["Content-Disposition"])
+        self.assertTrue(response.cache_control.immutable)
+        self.assertEqual(accel.test_client().get("/uploads/properties/7/missing.png").status_code, 404)
+
+        sendfile = create_app(UPLOAD_FOLDER=self.tmp.name, MEDIA_SENDFILE="x-sendfile")
+        response = sendfile.test_client().get(url)
+        self.assertEqual(response.headers["X-Sendfile"],
+                         os.path.join(os.path.abspath(self.tmp.name), "properties", "7", UUID_NAME))
+
+    def test_keys_outside_root_rejected(self):
+        """Test a key cannot write outside UPLOAD_FOLDER."""
+        with self.app.app_context():
+            with self.assertRaises(ValueError):
+                storage.get_storage().save(io.BytesIO(PNG), "../escape.png")
+
+    def test_key_for_url(self):
+        """Test stored URLs map back to their keys and other URLs do not."""
+        self.assertEqual(storage.key_for_url("/uploads/chat/1/a.png"), "chat/1/a.png")
+        self.assertIsNone(storage.key_for_url("https://example.com/a.png"))
+
+
+@unittest.skipUnless(importlib.util.find_spec("moto") and importlib.util.find_spec("boto3"),
+                     "moto and boto3 are not installed")
+class TestS3Storage(unittest.TestCase):
+    """The S3 driver against moto's S3-compatible server on localhost."""
+
+    @classmethod
+    def setUpClass(cls):
+        from moto.server import ThreadedMotoServer
+
+        cls.server = ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+        cls.server.start()
+        host, port = cls.server.get_host_and_port()
+        cls.endpoint = f"http://{host}:{port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        import boto3
+
+        credentials = patch.dict(os.environ, {"AWS_ACCESS_KEY_ID": "test", "AWS_SECRET_ACCESS_KEY": "test",
+                                              "AWS_DEFAULT_REGION": "us-east-1"})
+        credentials.start()
+        self.addCleanup(credentials.stop)
+
+        self.bucket = f"media-{self.id().rsplit('.', 1)[-1].replace('_', '-')}"
+        self.s3 = boto3.client("s3", endpoint_url=self.endpoint)
+        self.s3.create_bucket(Bucket=self.bucket)
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def create_app(self, **config):
+        return create_app(UPLOAD_FOLDER=self.tmp.name, STORAGE_BACKEND="s3", S3_BUCKET=self.bucket,
+                          S3_ENDPOINT_URL=self.endpoint, **config)
+
+    def test_download_redirected_to_presigned_url(self):
+        """Test the stored URL redirects to a presigned URL that serves the object, keeping the attachment flag."""
+        import urllib.request
+
+        app = self.create_app()
+        url = upload(app)
+        self.assertEqual(url, "/uploads/properties/7/photo.png")
+
+        stored = self.s3.get_object(Bucket=self.bucket, Key="uploads/properties/7/photo.png")
+        self.assertEqual((stored["Body"].read(), stored["ContentType"]), (PNG, "image/png"))
+
+        client = app.test_client()
+        response = client.get(url)
+        self.assertEqual(response.status_code, 302)
+        with urllib.request.urlopen(response.headers["Location"]) as presigned:
+            self.assertEqual(presigned.read(), PNG)
+
+        response = client.get(url + "?download=true")
+        with urllib.request.urlopen(response.headers["Location"]) as presigned:
+            self.assertIn("attachment", presigned.headers["Content-Disposition"])
+
+    def test_public_url_and_streaming(self):
+        """Test S3_PUBLIC_URL redirects without signing, and S3_PRESIGN off streams the object through Flask."""
+        public = self.create_app(S3_PUBLIC_URL="https://cdn.example.com/")
+        url = upload(public)
+        response = public.test_client().get(url)
+        self.assertEqual(response.headers["Location"], "https://cdn.example.com/uploads/properties/7/photo.png")
+
+        proxied = self.create_app(S3_PRESIGN=False)
+        response = proxied.test_client().get(url)
+        self.assertEqual((response.status_code, response.data, response.mimetype), (200, PNG, "image/png"))
+        self.assertEqual(proxied.test_client().get("/uploads/properties/7/missing.png").status_code, 404)
+
+    def test_cache_headers(self):
+        """Test UUID names are stored with an immutable Cache-Control and their redirect is cached within the URL expiry."""
+        app = self.create_app(S3_URL_EXPIRY=600)
+        url = upload(app, UUID_NAME)
+        stored = self.s3.head_object(Bucket=self.bucket, Key="uploads/properties/7/" + UUID_NAME)
+        self.assertEqual(stored["CacheControl"], f"public, max-age={YEAR}, immutable")
+
+        response = app.test_client().get(url)
+        self.assertEqual((response.cache_control.private, response.cache_control.max_age), (True, 300))
+        self.assertIsNone(app.test_client().get(upload(app, "other.png")).cache_control.max_age)
+
+    def test_streaming_passes_ranges_and_etags(self):
+        """Test with S3_PRESIGN off a byte range answers 206 and a matching ETag 304, both from the store."""
+        app = self.create_app(S3_PRESIGN=False)
+        url = upload(app, UUID_NAME)
+        client = app.test_client()
+
+        response = client.get(url, headers={"Range": "bytes=8-15"})
+        self.assertEqual((response.status_code, response.data), (206, PNG[8:16]))
+        self.assertEqual(response.headers["Content-Range"], f"bytes 8-15/{len(PNG)}")
+
+        response = client.get(url)
+        self.assertTrue(response.cache_control.immutable)
+        etag = response.headers["ETag"]
+        response = client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual((response.status_code, response.headers["ETag"]), (304, etag))
+
+        # A store answering 304 without an ETag: the object's own, never the client's list
+        from botocore.exceptions import ClientError
+        with app.app_context():
+            target = storage.get_storage()
+        not_modified = ClientError({"Error": {"Code": "304", "Message": "Not Modified"}}, "GetObject")
+        with patch.object(target.client, "get_object", side_effect=not_modified):
+            response = client.get(url, headers={"If-None-Match": f'W/"other", {etag}'})
+        self.assertEqual((response.status_code, response.headers["ETag"]), (304, etag))
+
+    def test_sync_keeps_existing_urls(self):
+        """Test local uploads copied by sync resolve under their old URLs, and a rerun copies nothing."""
+        local = create_app(UPLOAD_FOLDER=self.tmp.name, STORAGE_BACKEND="local")
+        url = upload(local, "old.png")
+
+        app = self.create_app()
+        with app.app_context():
+            target = storage.get_storage()
+            self.assertEqual(storage.sync(self.tmp.name, target, log=lambda _: None), 1)
+            self.assertEqual(storage.sync(self.tmp.name, target, log=lambda _: None), 0)
+            self.assertTrue(target.exists(storage.key_for_url(url)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+import tempfile
+import sys
+import os
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import numpy as np
+from unittest.mock import patch
+from fixtures import create_test_app, write_model
+from database import db
+from models.property import Property, Residence
+from services import ai_service, property_service
+from services.model_registry import ModelRegistry
+from services.prediction_cache import PredictionCache
+
+
+class TestSuggestedPrices(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        write_model(os.path.join(self.tmp.name, "v1"), 1200)
+        for name, value in [("registry", ModelRegistry(self.tmp.name, check_interval=0)),
+                            ("prediction_cache", PredictionCache())]:
+            patcher = patch.object(ai_service, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.addCleanup(self.ctx.pop)
+        self.addCleanup(db.session.remove)
+
+        homes = [Residence(user_id=1, name=f"Home {i}", type="residence", status="listed",
+                           state="selangor", price=1000 + 50 * i, land_size=800) for i in range(5)]
+        db.session.add_all(homes)
+        db.session.commit()
+        self.ids = [home.id for home in homes]
+
+    def refresh(self, **kwargs):
+        with patch.object(ai_service, "predict_matrix", wraps=ai_service.predict_matrix) as model_calls:
+            priced = ai_service.refresh_suggested_prices(**kwargs)
+        db.session.expire_all()
+        return priced, model_calls.call_count
+
+    def test_new_rows_priced_in_batches(self):
+        """Test new residences are priced in batches and a second run has nothing to do."""
+        self.assertEqual(self.refresh(batch_size=2), (5, 3))
+
+        for home in Residence.query.all():
+            self.assertEqual(home.suggested_price, 1200.0)
+            self.assertEqual(home.suggested_price_model_version, "v1")
+            self.assertFalse(home.suggested_price_stale)
+
+        self.assertEqual(self.refresh(), (0, 0))
+
+    def test_only_feature_edits_are_recomputed(self):
+        """Test a feature edit marks just that row stale, and other edits do not."""
+        self.refresh()
+
+        Property.update(self.ids[0], title="Renovated")
+        Property.update(self.ids[1], num_bedrooms=4)
+        self.assertFalse(db.session.get(Residence, self.ids[0]).suggested_price_stale)
+        self.assertTrue(db.session.get(Residence, self.ids[1]).suggested_price_stale)
+
+        self.assertEqual(self.refresh(), (1, 1))
+
+    def test_new_model_version_recomputes_all(self):
+        """Test every row is repriced once another model version is active."""
+        self.refresh()
+        write_model(os.path.join(self.tmp.name, "v2"), 1300)
+
+        self.assertEqual(self.refresh(batch_size=3), (5, 2))
+        self.assertEqual({home.suggested_price for home in Residence.query.all()}, {1300.0})
+
+    def test_stops_when_lock_lost(self):
+        """Test a run stops between batches once its heartbeat reports the scheduler lock taken over."""
+        beats = iter([True, False])
+        self.assertEqual(self.refresh(batch_size=2, heartbeat=lambda: next(beats)), (2, 1))
+
+    def test_no_model_leaves_rows_stale(self):
+        """Test the job does nothing until a model is installed."""
+        with patch.object(ai_service, "registry", ModelRegistry(os.path.join(self.tmp.name, "none"))):
+            self.assertEqual(self.refresh(), (0, 0))
+        self.assertEqual(Residence.query.filter_by(suggested_price_stale=True).count(), 5)
+
+    def test_failed_batch_rolls_back(self):
+        """Test an error outside the model (e.g. the database) keeps the batch stale instead of clearing the flag."""
+        with patch.object(ai_service, "_predict_rows", side_effect=RuntimeError("broken")):
+            with self.assertRaises(RuntimeError):
+                ai_service.refresh_suggested_prices()
+        self.assertEqual(Residence.query.filter_by(suggested_price_stale=True).count(), 5)
+
+    def test_unpriceable_row_does_not_block_others(self):
+        """Test a row the model fails on is skipped for this version, and the rest of its batch is priced."""
+        predict = ai_service.predict_matrix
+        bad = self.ids[1]
+        Property.update(bad, land_size=None)
+
+        def fail_on_missing_size(bundle, matrix):
+            if np.isnan(matrix[:, 0]).any():
+                raise ValueError("Input contains NaN")
+            return predict(bundle, matrix)
+
+        with patch.object(ai_service, "predict_matrix", side_effect=fail_on_missing_size):
+            self.assertEqual(ai_service.refresh_suggested_prices(batch_size=3), 5)
+            db.session.expire_all()
+            self.assertEqual(ai_service.refresh_suggested_prices(), 0)
+
+        homes = {home.id: home for home in Residence.query.all()}
+        self.assertIsNone(homes[bad].suggested_price)
+        self.assertEqual((homes[bad].suggested_price_model_version, homes[bad].suggested_price_stale), ("v1", False))
+        self.assertEqual({homes[i].suggested_price for i in self.ids if i != bad}, {1200.0})
+
+        # Fixing the features queues the row again
+        Property.update(bad, land_size=900)
+        self.assertEqual(self.refresh(), (1, 1))
+
+    def test_listings_report_below_market(self):
+        """Test summaries and search carry the stored suggested price and the below-market flag."""
+        self.refresh()
+
+        summaries, _, _ = property_service.get_residence_summaries(user_id=None, page=1)
+        flags = {s["id"]: (s["suggested_price"], s["below_market"]) for s in summaries}
+        # 1000 and 1050 are at least 10% under 1200, 1100 is not
+        self.assertEqual(flags[self.ids[0]], (1200.0, True))
+        self.assertEqual(flags[self.ids[1]], (1200.0, True))
+        self.assertEqual(flags[self.ids[2]], (1200.0, False))
+
+        _, result = property_service.search_residences(state="selangor")
+        below = {r["id"] for r in result["results"] if r["below_market"]}
+        self.assertEqual(below, set(self.ids[:2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
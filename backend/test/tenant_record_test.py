@@ -0,0 +1,175 @@
+import unittest
+from unittest.mock import patch
+from datetime import date
+import sys
+import os
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from fixtures import create_test_app
+from database import db
+from models.user import User
+from models.property import Residence
+from models.channel import Channel
+from models.request import Request
+from models.lease import Lease
+from models.tenant_record import TenantRecord
+from services import tenant_record_service
+
+
+class TestProcessDailyTasks(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        owner = User(uid="owner", email="o@x", username="owner")
+        tenant = User(uid="tenant", email="t@x", username="tenant")
+        db.session.add_all([owner, tenant])
+        db.session.flush()
+        self.owner_id, self.tenant_id = owner.id, tenant.id
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def add_lease(self, start_date, end_date=None, status="active"):
+        prop = Residence(user_id=self.owner_id, name="Home", type="residence", status="rented")
+        db.session.add(prop)
+        db.session.flush()
+        channel = Channel(property_id=prop.id, tenant_id=self.tenant_id, type="lease")
+        request = Request(property_id=prop.id, tenant_id=self.tenant_id, status="completed",
+                          start_date=start_date, end_date=end_date or date(2099, 1, 1))
+        db.session.add_all([channel, request])
+        db.session.flush()
+        lease = Lease(property_id=prop.id, tenant_id=self.tenant_id, channel_id=channel.id,
+                      start_date=start_date, end_date=end_date, monthly_rent=1000, status=status)
+        db.session.add(lease)
+        db.session.commit()
+        return lease.id
+
+    def run_on(self, today):
+        with patch('services.tenant_record_service.datetime') as mock_datetime:
+            mock_datetime.now.return_value.date.return_value = today
+            return tenant_record_service.process_daily_tasks()
+
+    def records(self, lease_id):
+        return TenantRecord.query.filter_by(lease_id=lease_id).order_by(TenantRecord.start_date).all()
+
+    def test_generates_missing_cycles_after_date_jump(self):
+        """Test every missed billing cycle is created once, anchored to the lease start date."""
+        lease_id = self.add_lease(date(2024, 1, 31), end_date=date(2025, 1, 31))
+        pending_id = self.add_lease(date(2024, 1, 1), status="pending")
+
+        self.run_on(date(2024, 4, 15))
+        records = self.records(lease_id)
+        self.assertEqual([r.month for r in records], ["2024-01", "2024-02", "2024-03"])
+        self.assertEqual(records[1].start_date, date(2024, 2, 29))
+        self.assertEqual(records[1].due_date, date(2024, 3, 3))
+        self.assertEqual(self.records(pending_id), [])
+
+        # Running again on the same day creates nothing new
+        summary = self.run_on(date(2024, 4, 15))
+        self.assertEqual(summary["created"], 0)
+        self.assertEqual(len(self.records(lease_id)), 3)
+
+    def test_stops_at_end_date(self):
+        """Test no cycle starting on or after the end date is created."""
+        lease_id = self.add_lease(date(2024, 1, 1), end_date=date(2024, 3, 1))
+        self.run_on(date(2024, 6, 1))
+        self.assertEqual([r.month for r in self.records(lease_id)], ["2024-01", "2024-02"])
+
+    def test_mark_overdue(self):
+        """Test identifying and marking unpaid records as overdue."""
+        lease_id = self.add_lease(date(2024, 1, 1))
+        db.session.add_all([
+            TenantRecord(lease_id=lease_id, month="2024-01", start_date=date(2024, 1, 1),
+                         due_date=date(2024, 1, 4), status="unpaid"),
+            TenantRecord(lease_id=lease_id, month="2024-02", start_date=date(2024, 2, 1),
+                         due_date=date(2024, 2, 4), status="unpaid"),
+        ])
+        db.session.commit()
+
+        summary = self.run_on(date(2024, 2, 2))
+
+        self.assertEqual(summary["overdue"], 1)
+        self.assertEqual([r.status for r in self.records(lease_id)], ["overdue", "unpaid"])
+
+    def test_complete_lease_success(self):
+        """Test successfully completing a lease when it ends and has 0 balance."""
+        lease_id = self.add_lease(date(2024, 1, 1), end_date=date(2024, 2, 1))
+        db.session.add(TenantRecord(lease_id=lease_id, month="2024-01", start_date=date(2024, 1, 1),
+                                    due_date=date(2024, 1, 4), status="paid", amount_paid=1000))
+        db.session.commit()
+
+        summary = self.run_on(date(2024, 2, 15))
+
+        lease = db.session.get(Lease, lease_id)
+        self.assertEqual(summary["completed"], 1)
+        self.assertEqual(lease.status, "completed")
+        self.assertEqual(lease.channel.status, "closed")
+        self.assertEqual(lease.property.status, "unlisted")
+        self.assertEqual(Request.query.filter_by(property_id=lease.property_id).one().status, "archived")
+
+    def test_completion_blocked_by_debt(self):
+        """Test lease is NOT completed if there is outstanding debt."""
+        lease_id = self.add_lease(date(2024, 1, 1), end_date=date(2024, 2, 1))
+
+        self.run_on(date(2024, 2, 15))
+
+        lease = db.session.get(Lease, lease_id)
+        self.assertEqual(lease.status, "active")
+        self.assertEqual(lease.property.status, "rented")
+        self.assertEqual([r.status for r in self.records(lease_id)], ["overdue"])
+
+    def test_schedules_next_event_and_skips_leases_not_due(self):
+        """Test a lease is only processed again once its next event date has come."""
+        lease_id = self.add_lease(date(2024, 1, 10), end_date=date(2024, 12, 10))
+
+        summary = self.run_on(date(2024, 1, 10))
+        self.assertEqual(summary["processed"], 1)
+        # Next event: the 2024-01 record becomes overdue after its due date
+        self.assertEqual(db.session.get(Lease, lease_id).next_event_at, date(2024, 1, 14))
+
+        self.assertEqual(self.run_on(date(2024, 1, 13))["processed"], 0)
+
+        summary = self.run_on(date(2024, 1, 14))
+        self.assertEqual((summary["processed"], summary["overdue"]), (1, 1))
+        # Then the next billing cycle
+        self.assertEqual(db.session.get(Lease, lease_id).next_event_at, date(2024, 2, 10))
+
+    def test_payment_reschedules_ended_lease(self):
+        """Test an ended lease with debt waits for payment, then completes on the next run."""
+        from services import rent_service
+
+        lease_id = self.add_lease(date(2024, 1, 1), end_date=date(2024, 2, 1))
+        self.run_on(date(2024, 2, 15))
+        lease = db.session.get(Lease, lease_id)
+        self.assertEqual(lease.next_event_at, tenant_record_service.NO_EVENT)
+        self.assertEqual(self.run_on(date(2024, 2, 16))["processed"], 0)
+
+        record = self.records(lease_id)[0]
+        success, _ = rent_service.pay_rent(record.id, 1000)
+        self.assertTrue(success)
+
+        summary = self.run_on(date(2024, 2, 17))
+        self.assertEqual(summary["completed"], 1)
+        self.assertEqual(db.session.get(Lease, lease_id).status, "completed")
+
+    def test_exception_rolls_back(self):
+        """Test database rollback on exception."""
+        lease_id = self.add_lease(date(2024, 1, 1))
+
+        with patch.object(db.session, "commit", side_effect=Exception("DB Error")):
+            summary = self.run_on(date(2024, 3, 1))
+
+        self.assertIsNone(summary)
+        self.assertEqual(self.records(lease_id), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
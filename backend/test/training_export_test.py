@@ -0,0 +1,159 @@
+import unittest
+import tempfile
+import importlib.util
+import sys
+import os
+from datetime import date, datetime
+
+# Ensure backend directory is in sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from unittest.mock import patch
+from fixtures import create_test_app
+from database import db
+from models.lease import Lease
+from models.property import Property, Residence
+from services import training_export
+
+LATER = datetime(2100, 1, 1)
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+class TestTrainingExport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.addCleanup(self.ctx.pop)
+        self.addCleanup(db.session.remove)
+
+        homes = [Residence(user_id=1, name=f"Home {i}", type="residence", status="listed",
+                           state="Selangor", city="Ampang", price=1000 + 100 * i,
+                           land_size=800, num_bedrooms=2, num_bathrooms=1) for i in range(4)]
+        homes.append(Residence(user_id=1, name="Draft", type="residence", status="unlisted", price=900))
+        db.session.add_all(homes)
+        db.session.flush()
+        self.ids = [home.id for home in homes]
+
+        self.leases = [
+            Lease(property_id=self.ids[0], tenant_id=2, start_date=date(2026, 1, 1),
+                  monthly_rent=950, status="active"),
+            Lease(property_id=self.ids[1], tenant_id=3, start_date=date(2026, 2, 1),
+                  monthly_rent=1050, status="pending"),
+        ]
+        db.session.add_all(self.leases)
+        db.session.commit()
+
+    def export(self, **kwargs):
+        return training_export.export(self.tmp.name, until=kwargs.pop("until", LATER), **kwargs)
+
+    def read(self, dataset):
+        import pyarrow.parquet as pq
+        return pq.read_table(os.path.join(self.tmp.name, dataset)).to_pandas()
+
+    def test_full_then_incremental(self):
+        """Test the first run exports every signed lease and residence, the next only what changed."""
+        self.assertEqual(self.export(), {"leases": 1, "listings": 5})
+
+        leases = self.read("leases")
+        self.assertEqual(leases[["property_id", "monthly_rent", "listed_price", "num_bedrooms"]].values.tolist(),
+                         [[self.ids[0], 950.0, 1000.0, 2]])
+        self.assertEqual(sorted(self.read("listings")["property_id"]), self.ids)
+
+        self.assertEqual(self.export(), {"leases": 0, "listings": 0})
+
+        # A residence-only edit moves the property past the mark, as do delisting and a lease being signed
+        Property.update(self.ids[2], num_bedrooms=3)
+        Property.update(self.ids[3], status="unlisted")
+        self.leases[1].status = "active"
+        db.session.commit()
+
+        self.assertEqual(self.export(), {"leases": 1, "listings": 2})
+        listings = self.read("listings")
+        self.assertEqual(len(listings), 7)
+        latest = listings.sort_values("updated_at").drop_duplicates("property_id", keep="last").set_index("property_id")
+        self.assertEqual(latest.loc[self.ids[2], "num_bedrooms"], 3)
+        self.assertEqual(latest.loc[self.ids[3], "status"], "unlisted")
+        self.assertEqual(training_export.read_state(self.tmp.name)["leases"]["rows"], 2)
+
+    def test_daily_tasks_do_not_reexport_leases(self):
+        """Test the daily job rescheduling a lease, or a payment clearing its schedule, exports nothing new."""
+        from services import tenant_record_service
+
+        self.assertEqual(self.export(datasets=("leases",)), {"leases": 1})
+        before = self.leases[0].updated_at
+
+        summary = tenant_record_service.process_daily_tasks()
+        self.assertEqual(summary["processed"], 1)
+        db.session.expire_all()
+        self.assertIsNotNone(self.leases[0].next_event_at)
+        self.assertEqual(self.leases[0].updated_at, before)
+
+        self.leases[0].next_event_at = None
+        db.session.commit()
+
+        self.assertEqual(self.export(datasets=("leases",)), {"leases": 0})
+
+    def test_recent_changes_wait_for_next_run(self):
+        """Test rows changed within SETTLE_SECONDS are left for a later run."""
+        self.assertEqual(training_export.export(self.tmp.name), {"leases": 0, "listings": 0})
+        self.assertEqual(training_export.read_state(self.tmp.name), {})
+
+    def test_chunks_partitioned_by_month(self):
+        """Test rows stream in chunks into one file per month, each chunk a row group."""
+        import pyarrow.parquet as pq
+
+        properties = Property.__table__
+        for month, property_id in zip((1, 1, 1, 2, 2), self.ids):
+            db.session.execute(properties.update().where(properties.c.id == property_id)
+                               .values(updated_at=datetime(2026, month, 15)))
+        db.session.commit()
+
+        self.assertEqual(self.export(datasets=("listings",), chunk_size=2), {"listings": 5})
+
+        root = os.path.join(self.tmp.name, "listings")
+        self.assertEqual(sorted(os.listdir(root)), ["updated_month=2026-01", "updated_month=2026-02"])
+        [january] = os.listdir(os.path.join(root, "updated_month=2026-01"))
+        self.assertEqual(pq.ParquetFile(os.path.join(root, "updated_month=2026-01", january)).num_row_groups, 2)
+        self.assertEqual(sorted(self.read("listings")["updated_month"].astype(str)), ["2026-01"] * 3 + ["2026-02"] * 2)
+        self.assertEqual(self.read("listings").set_index("property_id").loc[self.ids[4], "status"], "unlisted")
+        self.assertEqual(training_export.read_state(self.tmp.name)["listings"]["id"], self.ids[4])
+
+    def test_failed_run_leaves_previous_export(self):
+        """Test a run failing midway publishes no files and keeps the mark, so the rerun exports everything."""
+        write = training_export.PartitionWriter.write
+        calls = []
+
+        def fail_second_chunk(writer, rows):
+            calls.append(rows)
+            if len(calls) == 2:
+                raise OSError("disk full")
+            write(writer, rows)
+
+        with patch.object(training_export.PartitionWriter, "write", fail_second_chunk):
+            with self.assertRaises(OSError):
+                self.export(datasets=("listings",), chunk_size=2)
+
+        files = [name for _, _, names in os.walk(self.tmp.name) for name in names]
+        self.assertEqual(files, [])
+
+        self.assertEqual(self.export(datasets=("listings",), chunk_size=2), {"listings": 5})
+
+    def test_export_plans_stream_in_mark_order(self):
+        """Test both queries walk the (updated_at, id) index, so rows stream without a sort."""
+        for name, index in (("leases", "ix_leases_updated_at"), ("listings", "ix_properties_updated_at")):
+            stmt = training_export.DATASETS[name].query((datetime(2026, 1, 1), 1), LATER)
+            compiled = stmt.compile(db.engine, compile_kwargs={"literal_binds": True})
+            plan = " ".join(row[-1] for row in db.session.execute(db.text(f"EXPLAIN QUERY PLAN {compiled}")))
+            self.assertIn(index, plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+
+if __name__ == '__main__':
+    unittest.main()
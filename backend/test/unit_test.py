@@ -171,111 +171,5 @@ class TestTenantRecordService(unittest.TestCase):
         
         mock_record_model.create.assert_called_once()
 
-
-    # --- process_daily_tasks Tests ---
-
-    @patch('services.tenant_record_service.Lease')
-    @patch('services.tenant_record_service.TenantRecord')
-    @patch('services.tenant_record_service.db')
-    @patch('services.tenant_record_service.generate_next_tenant_record')
-    @patch('services.tenant_record_service.datetime')
-    def test_process_daily_tasks_mark_overdue(self, mock_datetime, mock_generate_fn, mock_db, mock_record_model, mock_lease_model):
-        """Test identifying and marking unpaid records as overdue."""
-        mock_lease = MagicMock()
-        mock_lease.id = 1
-        mock_lease.end_date = None
-        mock_lease_model.query.filter_by.return_value.all.return_value = [mock_lease]
-
-        mock_generate_fn.return_value = None # Stop infinite loop
-
-        overdue_record = MagicMock()
-        overdue_record.status = 'unpaid'
-        overdue_record.due_date = date(2024, 1, 1)
-        
-        future_record = MagicMock()
-        future_record.status = 'unpaid'
-        future_record.due_date = date(2024, 3, 1)
-
-        mock_record_model.query.filter.return_value.all.return_value = [overdue_record, future_record]
-        mock_datetime.now.return_value.date.return_value = date(2024, 2, 1)
-
-        tenant_record_service.process_daily_tasks()
-
-        self.assertEqual(overdue_record.status, 'overdue')
-        self.assertEqual(future_record.status, 'unpaid')
-        mock_db.session.commit.assert_called()
-
-    @patch('services.tenant_record_service.Lease')
-    @patch('services.tenant_record_service.TenantRecord')
-    @patch('services.tenant_record_service.Request')
-    @patch('services.tenant_record_service.db')
-    @patch('services.tenant_record_service.generate_next_tenant_record')
-    @patch('services.tenant_record_service.datetime')
-    def test_process_daily_tasks_complete_lease_success(self, mock_datetime, mock_generate_fn, mock_db, mock_request_model, mock_record_model, mock_lease_model):
-        """Test successfully completing a lease when it ends and has 0 balance."""
-        mock_lease = MagicMock()
-        mock_lease.id = 1
-        mock_lease.end_date = date(2023, 12, 31)
-        mock_lease.status = 'active'
-        mock_lease_model.query.filter_by.return_value.all.return_value = [mock_lease]
-
-        mock_generate_fn.return_value = None
-        mock_datetime.now.return_value.date.return_value = date(2024, 1, 15)
-        mock_record_model.query.filter.return_value.count.return_value = 0 # No debt
-        
-        mock_req = MagicMock()
-        mock_request_model.query.filter.return_value.all.return_value = [mock_req]
-
-        tenant_record_service.process_daily_tasks()
-
-        self.assertEqual(mock_lease.status, 'completed')
-        self.assertEqual(mock_lease.channel.status, 'closed')
-        self.assertEqual(mock_lease.property.status, 'unlisted')
-        self.assertEqual(mock_req.status, 'archived')
-        mock_db.session.commit.assert_called()
-
-    @patch('services.tenant_record_service.Lease')
-    @patch('services.tenant_record_service.TenantRecord')
-    @patch('services.tenant_record_service.db')
-    @patch('services.tenant_record_service.generate_next_tenant_record')
-    @patch('services.tenant_record_service.datetime')
-    def test_process_daily_tasks_completion_blocked_by_debt(self, mock_datetime, mock_generate_fn, mock_db, mock_record_model, mock_lease_model):
-        """Test lease is NOT completed if there is outstanding debt."""
-        mock_lease = MagicMock()
-        mock_lease.id = 1
-        mock_lease.end_date = date(2023, 12, 31)
-        mock_lease.status = 'active'
-        mock_lease_model.query.filter_by.return_value.all.return_value = [mock_lease]
-
-        mock_generate_fn.return_value = None
-        mock_datetime.now.return_value.date.return_value = date(2024, 1, 1)
-
-        mock_record_model.query.filter.return_value.count.return_value = 1 # Debt exists
-
-        tenant_record_service.process_daily_tasks()
-
-        self.assertEqual(mock_lease.status, 'active') 
-
-
-    @patch('services.tenant_record_service.Lease')
-    @patch('services.tenant_record_service.TenantRecord') 
-    @patch('services.tenant_record_service.generate_next_tenant_record')
-    @patch('services.tenant_record_service.db')
-    def test_process_daily_tasks_exception_handling(self, mock_db, mock_generate_fn, mock_record_model, mock_lease_model):
-        """Test database rollback on exception."""
-
-        mock_db.session.commit.side_effect = Exception("DB Error")
-        
-        mock_lease = MagicMock()
-        mock_lease.id = 1
-        mock_lease.end_date = None
-        mock_lease_model.query.filter_by.return_value.all.return_value = [mock_lease]
-        
-        mock_generate_fn.return_value = None
-
-        tenant_record_service.process_daily_tasks()
-        
-        mock_db.session.rollback.assert_called_once()
-
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -92,13 +92,14 @@ class _ChatRecordPageState extends State<ChatRecordPage> {
     if (_isLoadingMore || messages.isEmpty || _channel == null) return;
     _isLoadingMore = true;
 
-    int offset = messages.length;
+    // Oldest loaded message; ids increase with time
+    int beforeId = messages.map((m) => m.id).reduce((a, b) => a < b ? a : b);
 
     try {
       List<Message> olderMessages = await ChatService.getMessages(
         channelId: _channel!.id,
         limit: 10,
-        offset: offset,
+        beforeId: beforeId,
       );
 
       if (olderMessages.isNotEmpty) {
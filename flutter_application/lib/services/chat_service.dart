@@ -118,12 +118,14 @@ class ChatService {
     required int channelId,
     int? limit,
     int? offset,
+    int? beforeId,
     }) async {
 
     final endpoint = "/chat/messages"
         "?channel_id=$channelId"
         "${limit != null ? "&limit=$limit" : ""}"
-        "${offset != null ? "&offset=$offset" : ""}";
+        "${offset != null ? "&offset=$offset" : ""}"
+        "${beforeId != null ? "&before_id=$beforeId" : ""}";
 
     final uri = ApiService.buildUri(endpoint);
 